@@ -0,0 +1,212 @@
+import argparse
+import datetime
+import itertools
+import json
+import random
+import subprocess
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+from database.core import ROOT_DIR
+from database.synthetic import generate
+
+from .runner import drive
+from .server import ServerProcess, prepare_database
+
+# صورة PNG بحجم 1x1 لاختبار /api/upload
+PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082'
+)
+
+
+class Payloads:
+    # أجسام الطلبات من المولّد الاصطناعي، بمعرّفات تبدأ بعد آخر صف موجود
+    def __init__(self, rows, seed_value):
+        self.rows = rows
+        self.seed = seed_value
+        self.lock = threading.Lock()
+        self.sources = {}
+
+    def next(self, table):
+        with self.lock:
+            if table not in self.sources:
+                self.sources[table] = generate(table, 10 ** 9, self.seed + 1, start=self.rows + 1)
+            return next(self.sources[table])
+
+
+def json_request(method, path, body=None):
+    if body is None:
+        return method, path, None, None
+    return method, path, json.dumps(body, ensure_ascii=False).encode(), {'Content-Type': 'application/json'}
+
+
+def upload_request():
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="bench.png"\r\n'
+        f'Content-Type: image/png\r\n\r\n'
+    ).encode() + PNG + f'\r\n--{boundary}--\r\n'.encode()
+    return 'POST', '/api/upload', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def build_routes(rows, seed_value):
+    # لكل مسار دالة تُنتج طلبًا واحدًا. التحديث يستهدف النصف الأدنى من المعرّفات
+    # والحذف يستهلك المعرّفات تنازليًا من الأعلى حتى لا يحذف صفًا مرتين
+    payloads = Payloads(rows, seed_value)
+    rng = random.Random(seed_value)
+    rng_lock = threading.Lock()
+
+    def existing_id():
+        with rng_lock:
+            return rng.randint(1, max(1, rows // 2))
+
+    def deletable(counter):
+        return max(0, rows - next(counter))
+
+    resources = [
+        # (المسار، الجدول)
+        ('packages', 'packages'),
+        ('packages-server', 'packages_server'),
+        ('projects', 'projects'),
+        ('services', 'services'),
+        ('reviews', 'reviews'),
+        ('team-members', 'team_members'),
+        ('faqs', 'faqs'),
+    ]
+    routes = {
+        'GET /api/packages': lambda: json_request('GET', '/api/packages'),
+        'GET /api/packages-server': lambda: json_request('GET', '/api/packages-server'),
+        'GET /api/projects': lambda: json_request('GET', '/api/projects'),
+        'GET /api/services': lambda: json_request('GET', '/api/services'),
+        'GET /api/reviews': lambda: json_request('GET', '/api/reviews'),
+        'GET /api/team-members': lambda: json_request('GET', '/api/team-members'),
+        'GET /api/team-members?activeOnly=true': lambda: json_request('GET', '/api/team-members?activeOnly=true'),
+        'GET /api/faqs': lambda: json_request('GET', '/api/faqs'),
+        'GET /api/faqs?category=general': lambda: json_request('GET', '/api/faqs?category=general'),
+        'GET /api/faq-categories': lambda: json_request('GET', '/api/faq-categories'),
+        'GET /api/homepage': lambda: json_request('GET', '/api/homepage'),
+        'GET /api/project-requests': lambda: json_request('GET', '/api/project-requests'),
+    }
+    for route, table in resources:
+        deletes = itertools.count()
+        routes[f'POST /api/{route}'] = lambda r=route, t=table: json_request('POST', f'/api/{r}', payloads.next(t))
+        routes[f'PUT /api/{route}/:id'] = lambda r=route, t=table: json_request(
+            'PUT', f'/api/{r}/{existing_id()}', payloads.next(t)
+        )
+        routes[f'DELETE /api/{route}/:id'] = lambda r=route, c=deletes: json_request(
+            'DELETE', f'/api/{r}/{deletable(c)}'
+        )
+
+    categories = itertools.count()
+    category_deletes = itertools.count()
+    request_deletes = itertools.count()
+    routes.update({
+        'POST /api/faq-categories': lambda: json_request(
+            'POST', '/api/faq-categories', {'key': f'bench_{next(categories)}', 'label': 'تصنيف'}
+        ),
+        'PUT /api/faq-categories/:key': lambda: json_request('PUT', '/api/faq-categories/general', {'label': 'عام'}),
+        'DELETE /api/faq-categories/:key': lambda: json_request(
+            'DELETE', f'/api/faq-categories/bench_{next(category_deletes)}'
+        ),
+        'POST /api/project-requests': lambda: json_request(
+            'POST', '/api/project-requests', payloads.next('project_requests')
+        ),
+        'POST /api/contact-requests': lambda: json_request(
+            'POST', '/api/contact-requests', payloads.next('contact_requests')
+        ),
+        'DELETE /api/project-requests/:id': lambda: json_request(
+            'DELETE', f'/api/project-requests/{deletable(request_deletes)}'
+        ),
+        'POST /api/upload': upload_request,
+    })
+    # القراءات أولًا ثم الكتابات ثم الحذف، حتى لا تتأثر القراءة بتغيّر حجم الجداول
+    order = {'GET': 0, 'POST': 1, 'PUT': 2, 'DELETE': 3}
+    return dict(sorted(routes.items(), key=lambda item: order[item[0].split()[0]]))
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    # مقارنة مع نتيجة سابقة: أي مسار زاد p95 فيه أو نقص معدل الطلبات بأكثر من threshold
+    regressions = []
+    for route, result in current['routes'].items():
+        before = baseline.get('routes', {}).get(route)
+        if not before:
+            continue
+        p95_before, p95_now = before['latency_ms']['p95'], result['latency_ms']['p95']
+        rps_before, rps_now = before['throughput_rps'], result['throughput_rps']
+        if p95_before and p95_now > p95_before * (1 + threshold):
+            regressions.append(f'{route}: p95 {p95_before}ms -> {p95_now}ms')
+        if rps_before and rps_now < rps_before * (1 - threshold):
+            regressions.append(f'{route}: throughput {rps_before} -> {rps_now} req/s')
+    return regressions
+
+
+def run(rows, concurrency, duration, seed_value=0, only=None, workdir=None, workers=None):
+    with tempfile.TemporaryDirectory(prefix='api-bench-') as tmp:
+        workdir = Path(workdir or tmp)
+        db_path = prepare_database(workdir / 'projects.db', rows, seed_value)
+        routes = build_routes(rows, seed_value)
+        if only:
+            routes = {name: make for name, make in routes.items() if any(o in name for o in only)}
+        results = {}
+        with ServerProcess(db_path, workdir, workers=workers) as server:
+            for name, make_request in routes.items():
+                results[name] = drive('127.0.0.1', server.port, make_request, concurrency, duration)
+                latency = results[name]['latency_ms']
+                print(f'{name:45} {results[name]["throughput_rps"]:>9} req/s  p50 {latency["p50"]:>8}ms  '
+                      f'p99 {latency["p99"]:>8}ms  errors {results[name]["error_rate"]:.1%}')
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'rows': rows,
+            'concurrency': concurrency,
+            'duration_s': duration,
+            'seed': seed_value,
+            'workers': workers,
+        },
+        'routes': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test every server.js route against a generated database')
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='synthetic rows per table (DELETE routes 404 once they have consumed them all)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per route')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--routes', nargs='+', help='only routes containing any of these substrings')
+    parser.add_argument('--workers', type=int, help='run cluster.js with this many workers instead of server.js')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed regression ratio (default 0.2)')
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.concurrency, args.duration, args.seed, args.routes, workers=args.workers)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'✅ results written to {args.out}')
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f'❌ {line}')
+        if regressions:
+            raise SystemExit(1)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from .api import Payloads, git_commit, json_request
+from .runner import drive
+from .server import ServerProcess, prepare_database
+
+# مقارنة مسار الإدخال القديم (معاملة وfsync لكل طلب) مع الإدخال المجمّع (group commit)
+# لنماذج الموقع العامة. بعد كل تشغيل نتحقق أن كل استجابة 201 تقابلها صف محفوظ فعلًا
+
+MODES = {
+    'per-request': {'INGEST_BATCH_SIZE': '1', 'INGEST_FLUSH_MS': '0'},
+    'group-commit': {},
+}
+
+ROUTES = {
+    'POST /api/project-requests': ('/api/project-requests', 'project_requests'),
+    'POST /api/contact-requests': ('/api/contact-requests', 'contact_requests'),
+}
+
+
+def row_count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run(rows, concurrency, duration, seed_value=0, group_env=None):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='ingest-bench-') as tmp:
+        tmp = Path(tmp)
+        template = prepare_database(tmp / 'template.db', rows, seed_value)
+        for mode, mode_env in MODES.items():
+            workdir = tmp / mode
+            workdir.mkdir()
+            db_path = workdir / 'projects.db'
+            shutil.copyfile(template, db_path)
+            payloads = Payloads(rows, seed_value)
+            if mode == 'group-commit':
+                mode_env = {**mode_env, **(group_env or {})}
+            with ServerProcess(db_path, workdir, env=mode_env) as server:
+                for name, (path, table) in ROUTES.items():
+                    before = row_count(db_path, table)
+                    result = drive(
+                        '127.0.0.1', server.port, lambda p=path, t=table: json_request('POST', p, payloads.next(t)),
+                        concurrency, duration,
+                    )
+                    result['rows_committed'] = row_count(db_path, table) - before
+                    results.setdefault(name, {})[mode] = result
+                    latency = result['latency_ms']
+                    print(f'{name:30} {mode:13} {result["throughput_rps"]:>9} req/s  p50 {latency["p50"]:>8}ms  '
+                          f'p99 {latency["p99"]:>8}ms  429s {result["status_codes"].get("429", 0)}')
+                    if result['rows_committed'] != result['status_codes'].get('201', 0):
+                        print(f'❌ {name} ({mode}): {result["status_codes"].get("201", 0)} acknowledged, '
+                              f'{result["rows_committed"]} committed')
+    for name, modes in results.items():
+        base, grouped = modes['per-request']['throughput_rps'], modes['group-commit']['throughput_rps']
+        if base:
+            print(f'✅ {name}: {grouped / base:.1f}x throughput with group commit')
+    return {
+        'meta': {'commit': git_commit(), 'rows': rows, 'concurrency': concurrency, 'duration_s': duration},
+        'routes': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare per-request commits with group commit for form submissions')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per route and mode')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', help='INGEST_BATCH_SIZE for the group-commit run')
+    parser.add_argument('--flush-ms', help='INGEST_FLUSH_MS for the group-commit run')
+    parser.add_argument('--out', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    group_env = {}
+    if args.batch_size:
+        group_env['INGEST_BATCH_SIZE'] = args.batch_size
+    if args.flush_ms:
+        group_env['INGEST_FLUSH_MS'] = args.flush_ms
+    report = run(args.rows, args.concurrency, args.duration, args.seed, group_env)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'✅ results written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
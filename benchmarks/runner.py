@@ -0,0 +1,87 @@
+import http.client
+import threading
+import time
+from collections import Counter
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, seconds, status, nbytes):
+        with self.lock:
+            self.latencies.append(seconds)
+            self.statuses[str(status)] += 1
+            self.bytes += nbytes
+            if status == 'error' or status >= 400:
+                self.errors += 1
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 1) if elapsed else 0.0,
+            'bytes': self.bytes,
+            'latency_ms': {
+                'p50': ms(percentile(values, 50)),
+                'p95': ms(percentile(values, 95)),
+                'p99': ms(percentile(values, 99)),
+                'mean': ms(sum(values) / count) if count else 0.0,
+                'max': ms(values[-1]) if values else 0.0,
+            },
+            'status_codes': dict(sorted(self.statuses.items())),
+        }
+
+
+def drive(host, port, make_request, concurrency=8, duration=5.0, max_requests=None):
+    # كل عامل (thread) يفتح اتصال keep-alive خاصًا به ويرسل الطلبات حتى انتهاء المدة
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    issued = iter(range(max_requests)) if max_requests else None
+    issued_lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        while time.perf_counter() < deadline:
+            if issued is not None:
+                with issued_lock:
+                    if next(issued, None) is None:
+                        break
+            method, path, body, headers = make_request()
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                payload = response.read()
+                recorder.add(time.perf_counter() - started, response.status, len(payload))
+            except (OSError, http.client.HTTPException):
+                recorder.add(time.perf_counter() - started, 'error', 0)
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        conn.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.perf_counter() - started)
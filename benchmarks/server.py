@@ -0,0 +1,80 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+from pathlib import Path
+
+from database.core import ROOT_DIR
+from database import fixtures
+from database.synthetic import GENERATORS, generate
+from database.bulk import load
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def prepare_database(path, rows, seed_value=0, batch_size=10000):
+    # قاعدة بديلة: المخطط من سكربتات البذر ثم بيانات اصطناعية بالحجم المطلوب
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+    fixtures.write(path)
+    for table in GENERATORS:
+        count = min(rows, 50) if table == 'faq_categories' else rows
+        load(generate(table, count, seed_value), table, path, batch_size, truncate=True)
+    return path
+
+
+class ServerProcess:
+    # يشغّل node server.js على قاعدة ومجلد رفع مؤقتين، وينتظر حتى يفتح المنفذ
+    def __init__(self, db_path, workdir, port=None, env=None, startup_timeout=15, workers=None):
+        # workers: تشغيل cluster.js بهذا العدد من العمليات بدل server.js
+        self.db_path = Path(db_path)
+        self.workers = workers
+        self.workdir = Path(workdir)
+        self.port = port or free_port()
+        self.env = env or {}
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    def __enter__(self):
+        uploads = self.workdir / 'uploads'
+        uploads.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ, DB_PATH=str(self.db_path), SERVER_PORT=str(self.port), UPLOADS_DIR=str(uploads))
+        if self.workers:
+            env['CLUSTER_WORKERS'] = str(self.workers)
+        env.update(self.env)
+        self.log = open(self.workdir / 'server.log', 'wb')
+        self.process = subprocess.Popen(
+            ['node', 'cluster.js' if self.workers else 'server.js'], cwd=ROOT_DIR, env=env, stdout=self.log,
+            stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'server.js exited with {self.process.returncode}, see {self.log.name}')
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=0.2):
+                    return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f'server.js did not open port {self.port} in {self.startup_timeout}s')
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+        return False
+
+
+def node_available():
+    return shutil.which('node') is not None
@@ -0,0 +1,18 @@
+// Cluster entry point: `node cluster.js` forks CLUSTER_WORKERS copies of server.js (default: one per
+// core) that share SERVER_PORT and the database (lib/cluster.js). `kill -HUP <pid>` replaces the
+// workers one at a time without closing the port; SIGTERM drains them all and exits.
+import 'dotenv/config';
+import os from 'os';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { Supervisor } from './lib/cluster.js';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+const supervisor = new Supervisor({
+    exec: path.join(__dirname, 'server.js'),
+    workers: parseInt(process.env.CLUSTER_WORKERS ?? String(os.availableParallelism()), 10),
+    drainMs: parseInt(process.env.CLUSTER_DRAIN_MS ?? '10000', 10)
+});
+supervisor.start();
+console.log(`Primary ${process.pid} started ${supervisor.workers} workers`);
@@ -0,0 +1,3 @@
+from .core import DB_PATH, ROOT_DIR, Table, connect, transaction
+
+__all__ = ['DB_PATH', 'ROOT_DIR', 'Table', 'connect', 'transaction']
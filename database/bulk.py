@@ -0,0 +1,212 @@
+import argparse
+import csv
+import itertools
+import json
+import re
+import time
+from pathlib import Path
+
+from . import changes
+from .core import DB_PATH, connect, quote, transaction
+from .migrations import migrate
+
+# إعدادات التحميل السريع: تُفعّل أثناء التحميل فقط ثم تُعاد كما كانت
+LOAD_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'OFF',
+    'cache_size': -256000,  # ~250MB
+    'temp_store': 'MEMORY',
+}
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def read_records(path, fmt=None):
+    fmt = fmt or Path(path).suffix.lstrip('.').lower()
+    if fmt in ('jsonl', 'ndjson', 'json'):
+        return read_jsonl(path)
+    if fmt == 'csv':
+        return read_csv(path)
+    raise ValueError(f'Unsupported fixture format: {fmt!r}')
+
+
+def encode(value):
+    # المصفوفات (features/skills/...) تُخزّن نصًا JSON كما في سكربتات البذر
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({quote(table)})')]
+
+
+def ensure_table(conn, table):
+    # الجدول غير موجود: نطبّق الترحيلات (المخطط + الفهارس) بدل إنشائه يدويًا
+    if not table_columns(conn, table):
+        migrate(conn)
+
+
+def apply_pragmas(conn, pragmas):
+    previous = {}
+    for name, value in pragmas.items():
+        previous[name] = conn.execute(f'PRAGMA {name}').fetchone()[0]
+        conn.execute(f'PRAGMA {name} = {value}')
+    return previous
+
+
+def drop_indexes(conn, table):
+    # نحذف الفهارس قبل التحميل ونعيد بناءها مرة واحدة بعده
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX {quote(name)}')
+    return [sql for _, sql in indexes]
+
+
+class LoadStats:
+    def __init__(self, table, batch_size):
+        self.table = table
+        self.batch_size = batch_size
+        self.rows = 0
+        self.batches = 0
+        self.load_seconds = 0.0
+        self.index_seconds = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.load_seconds if self.load_seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'table': self.table,
+            'batch_size': self.batch_size,
+            'rows': self.rows,
+            'batches': self.batches,
+            'load_seconds': round(self.load_seconds, 4),
+            'index_seconds': round(self.index_seconds, 4),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+class LoadError(Exception):
+    # فشل التحميل بعد التزام بعض الدفعات: الفهارس أعيد بناؤها، والصفوف الملتزمة باقية
+    def __init__(self, table, committed, cause):
+        super().__init__(f'{table}: load failed after {committed} rows were committed ({cause}); '
+                         f'fix the input and reload with --truncate')
+        self.table = table
+        self.committed = committed
+
+
+IF_NOT_EXISTS = re.compile(r'^CREATE (UNIQUE )?INDEX (?!IF NOT EXISTS)')
+
+
+def restore_indexes(conn, index_sql):
+    # IF NOT EXISTS: يعمل سواء فشل التحميل قبل إسقاط الفهارس أو بعده
+    with transaction(conn):
+        for statement in index_sql:
+            conn.execute(IF_NOT_EXISTS.sub(r'CREATE \1INDEX IF NOT EXISTS ', statement))
+
+
+def load(records, table, path=None, batch_size=5000, truncate=False, pragmas=None, progress=None):
+    # تحميل متدفق: السجلات تُقرأ بمولّد وتُدخل دفعة دفعة، كل دفعة في معاملة صريحة.
+    # لذلك فشل دفعة لا يتراجع عما قبلها (LoadError يذكر عدد الصفوف الملتزمة)، لكن الفهارس
+    # المُسقطة تُعاد دائمًا: schema_migrations لا يعرف أنها حُذفت فلن يعيدها migrate
+    conn = connect(path)
+    stats = LoadStats(table, batch_size)
+    try:
+        previous = apply_pragmas(conn, LOAD_PRAGMAS if pragmas is None else pragmas)
+        with transaction(conn):
+            ensure_table(conn, table)
+        # لا صف في change_log لكل سجل: إدخال reload واحد للجدول بعد التحميل (database/changes.py)
+        with changes.paused(conn, table):
+            with transaction(conn):
+                if truncate:
+                    conn.execute(f'DELETE FROM {quote(table)}')
+                index_sql = drop_indexes(conn, table)
+
+            try:
+                columns = table_columns(conn, table)
+                sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+                    quote(table), ', '.join(quote(c) for c in columns), ', '.join('?' for _ in columns)
+                )
+                started = time.perf_counter()
+                for chunk in batches(records, batch_size):
+                    rows = [tuple(encode(record.get(c)) for c in columns) for record in chunk]
+                    with transaction(conn):
+                        conn.executemany(sql, rows)
+                    stats.rows += len(rows)
+                    stats.batches += 1
+                    if progress:
+                        progress(stats.rows, time.perf_counter() - started)
+                stats.load_seconds = time.perf_counter() - started
+            except Exception as e:
+                raise LoadError(table, stats.rows, e) from e
+            finally:
+                started = time.perf_counter()
+                restore_indexes(conn, index_sql)
+                stats.index_seconds = time.perf_counter() - started
+
+        # journal_mode يبقى WAL (آمن مع server.js)، وبقية الإعدادات تعود لقيمها
+        previous.pop('journal_mode', None)
+        apply_pragmas(conn, previous)
+    finally:
+        conn.close()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream a JSONL/CSV fixture file into a projects.db table')
+    parser.add_argument('file')
+    parser.add_argument('--table', required=True)
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--format', choices=['jsonl', 'csv'])
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[5000],
+                        help='one or more batch sizes; several values reload the file once per size')
+    parser.add_argument('--truncate', action='store_true', help='delete existing rows first')
+    parser.add_argument('--json', action='store_true', help='print stats as JSON')
+    args = parser.parse_args(argv)
+
+    results = []
+    for i, size in enumerate(args.batch_size):
+        # عند مقارنة أحجام الدفعات نعيد التحميل من صفر في كل مرة
+        truncate = args.truncate or i > 0
+        try:
+            stats = load(read_records(args.file, args.format), args.table, args.db, size, truncate)
+        except LoadError as e:
+            raise SystemExit(f'❌ {e}')
+        results.append(stats.as_dict())
+        if not args.json:
+            print(f'✅ {stats.table}: {stats.rows} rows in {stats.batches} batches of {size} '
+                  f'({stats.rows_per_sec:,.0f} rows/s, indexes {stats.index_seconds * 1000:.0f} ms)')
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
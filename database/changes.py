@@ -0,0 +1,272 @@
+import argparse
+import datetime
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+from . import versions
+from .core import DB_PATH, connect, quote, transaction
+
+# سجل التغييرات (change data capture): كل إدخال/تعديل/حذف في الجداول المبذورة يضيف صفًا
+# (الجدول، rowid، العملية، إصدار الجدول، الوقت) إلى change_log. server.js يعرضه في /api/changes
+# (long-poll أو SSE) ومنه يحدّث المستهلكون (التصدير الثابت، الفهرسة، تفريغ CDN) ما تغيّر فقط
+#
+# المشغّل نفسه يزيد table_versions ثم يسجل التغيير، فالإصدار المسجل هو دائمًا الإصدار بعد التغيير
+# (لذلك يحل محل مشغّلات الترحيل 7). op تلميح فقط: بعد الضغط قد يبقى آخر تغيير للصف وحده،
+# فالمستهلك يعامل insert/update كـ upsert ويعيد قراءة الصف الحالي بالـ rowid
+#
+# التحميل الكبير (bulk.load، synthetic) لا يسجل صفًا لكل سجل: الترحيل 9 يضيف للمشغّلات شرط WHEN على
+# صف 'paused:<الجدول>' في change_log_state، وpaused() يضعه أثناء التحميل ثم يزيد الإصدار مرة واحدة
+# ويسجل إدخالًا واحدًا op='reload' (row_id = 0): أعد قراءة الجدول كله. compact يحذف ما سبقه لنفس الجدول
+
+TABLES = versions.TABLES
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tbl TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        op TEXT NOT NULL,  -- insert | update | delete
+        version INTEGER NOT NULL,
+        changed_at TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log (tbl, row_id, seq)',
+    'CREATE INDEX IF NOT EXISTS idx_change_log_time ON change_log (changed_at)',
+    # truncated_through: أكبر seq حذفه الاحتفاظ (retention)؛ من يطلب ما قبله عليه إعادة بناء كاملة
+    '''
+    CREATE TABLE IF NOT EXISTS change_log_state (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    ''',
+    "INSERT OR IGNORE INTO change_log_state (name, value) VALUES ('truncated_through', 0)",
+]
+
+
+RELOAD_ROW = 0
+
+
+def paused_key(table):
+    return f'paused:{table}'
+
+
+def trigger_sql(table, event, pausable=False):
+    row = 'OLD' if event == 'DELETE' else 'NEW'
+    when = f"WHEN NOT EXISTS (SELECT 1 FROM change_log_state WHERE name = '{paused_key(table)}') " if pausable else ''
+    return f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{event.lower()} AFTER {event} ON {quote(table)} {when}BEGIN
+                UPDATE table_versions SET version = version + 1, updated_at = {versions.NOW} WHERE name = '{table}';
+                INSERT INTO change_log (tbl, row_id, op, version, changed_at)
+                SELECT '{table}', {row}.rowid, '{event.lower()}', version, updated_at
+                FROM table_versions WHERE name = '{table}';
+            END'''
+
+
+def table_statements(table):
+    statements = []
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        statements += [f'DROP TRIGGER IF EXISTS trg_{table}_version_{event.lower()}', trigger_sql(table, event)]
+    return statements
+
+
+def statements():
+    return SCHEMA + [sql for table in TABLES for sql in table_statements(table)]
+
+
+def pausable_statements():
+    # الترحيل 9: نفس المشغّلات مع شرط الإيقاف المؤقت
+    statements = []
+    for table in TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            statements += [f'DROP TRIGGER IF EXISTS trg_{table}_changes_{event.lower()}',
+                           trigger_sql(table, event, pausable=True)]
+    return statements
+
+
+class paused:
+    # يوقف تسجيل التغييرات (وزيادة الإصدار) لجدول أثناء تحميل كبير يمتد على معاملات كثيرة، ثم
+    # يزيد الإصدار مرة ويسجل إدخال reload واحدًا حتى لو فشل التحميل في منتصفه (فقد تغيّر جزء منه).
+    # ما يكتبه server.js في الجدول أثناء التحميل لا يُسجل أيضًا، لكن reload اللاحق يغطيه
+    def __init__(self, conn, table):
+        self.conn = conn
+        self.table = table
+        self.enabled = table in TABLES and conn.execute(
+            "SELECT 1 FROM sqlite_schema WHERE name = 'change_log_state'"
+        ).fetchone() is not None
+
+    def __enter__(self):
+        if self.enabled:
+            with transaction(self.conn):
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO change_log_state (name, value) VALUES (?, 1)', (paused_key(self.table),)
+                )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.enabled:
+            with transaction(self.conn):
+                self.conn.execute('DELETE FROM change_log_state WHERE name = ?', (paused_key(self.table),))
+                self.conn.execute(
+                    f'UPDATE table_versions SET version = version + 1, updated_at = {versions.NOW} WHERE name = ?',
+                    (self.table,)
+                )
+                self.conn.execute('''
+                    INSERT INTO change_log (tbl, row_id, op, version, changed_at)
+                    SELECT name, ?, 'reload', version, updated_at FROM table_versions WHERE name = ?
+                ''', (RELOAD_ROW, self.table))
+        return False
+
+
+def compact(conn, keep_days=7, max_rows=100_000):
+    # 1) الضغط: يكفي آخر تغيير لكل صف، فتُحذف التغييرات التي تلاها تغيير آخر لنفس الصف
+    #    أو إدخال reload لنفس الجدول (بعد تحميل كبير)
+    # 2) الاحتفاظ: حذف الأقدم من keep_days ثم الأقدم فوق max_rows، مع تحديث truncated_through
+    with transaction(conn):
+        superseded = conn.execute('''
+            DELETE FROM change_log WHERE EXISTS (
+                SELECT 1 FROM change_log later
+                WHERE later.tbl = change_log.tbl AND later.row_id = change_log.row_id AND later.seq > change_log.seq
+            )
+        ''').rowcount
+        superseded += conn.execute('''
+            DELETE FROM change_log WHERE seq < (
+                SELECT MAX(seq) FROM change_log reload
+                WHERE reload.tbl = change_log.tbl AND reload.row_id = ? AND reload.op = 'reload'
+            )
+        ''', (RELOAD_ROW,)).rowcount
+        cutoff = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=keep_days))
+        cutoff = cutoff.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        through = conn.execute('SELECT MAX(seq) FROM change_log WHERE changed_at < ?', (cutoff,)).fetchone()[0] or 0
+        overflow = conn.execute(
+            'SELECT seq FROM change_log ORDER BY seq DESC LIMIT 1 OFFSET ?', (max_rows,)
+        ).fetchone()
+        through = max(through, overflow[0] if overflow else 0)
+        expired = conn.execute('DELETE FROM change_log WHERE seq <= ?', (through,)).rowcount
+        conn.execute(
+            "UPDATE change_log_state SET value = MAX(value, ?) WHERE name = 'truncated_through'", (through,)
+        )
+    return {'superseded': superseded, 'expired': expired, 'truncated_through': through}
+
+
+def changes_since(conn, since=0, limit=1000, tables=None):
+    sql = 'SELECT seq, tbl, row_id, op, version, changed_at FROM change_log WHERE seq > ?'
+    params = [since]
+    if tables:
+        sql += f' AND tbl IN ({", ".join("?" for _ in tables)})'
+        params += list(tables)
+    rows = conn.execute(sql + ' ORDER BY seq LIMIT ?', params + [limit]).fetchall()
+    return [
+        {'seq': seq, 'table': tbl, 'rowId': row_id, 'op': op, 'version': version, 'at': at}
+        for seq, tbl, row_id, op, version, at in rows
+    ]
+
+
+class ResetRequired(Exception):
+    # المؤشر أقدم من السجل المحتفظ به: أعد البناء كاملًا ثم تابع من oldest
+    def __init__(self, oldest):
+        super().__init__(f'change log truncated, resume from {oldest} after a full rebuild')
+        self.oldest = oldest
+
+
+class ChangeFeed:
+    # مستهلك /api/changes عبر long-poll، يحفظ المؤشر في ملف (إن وُجد) بعد كل دفعة تمت معالجتها
+    def __init__(self, base_url='http://localhost:3000', tables=None, cursor_file=None, wait=25, limit=500):
+        self.base_url = base_url.rstrip('/')
+        self.tables = list(tables or [])
+        self.cursor_file = Path(cursor_file) if cursor_file else None
+        self.wait = wait
+        self.limit = limit
+        self.since = self.load_cursor()
+
+    def load_cursor(self):
+        if self.cursor_file and self.cursor_file.exists():
+            return int(self.cursor_file.read_text().strip() or 0)
+        return 0
+
+    def save_cursor(self):
+        if self.cursor_file:
+            tmp = self.cursor_file.with_name(self.cursor_file.name + '.tmp')
+            tmp.write_text(str(self.since))
+            tmp.replace(self.cursor_file)
+
+    def poll(self):
+        query = {'since': self.since, 'wait': self.wait, 'limit': self.limit}
+        if self.tables:
+            query['tables'] = ','.join(self.tables)
+        url = f'{self.base_url}/api/changes?{urllib.parse.urlencode(query)}'
+        try:
+            with urllib.request.urlopen(url, timeout=self.wait + 10) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise ResetRequired(json.load(e)['oldest']) from None
+            raise
+
+    def batches(self):
+        # يولّد قوائم التغييرات؛ المؤشر يتقدم بعد أن يعيد المستدعي التحكم (أي بعد معالجة الدفعة)
+        while True:
+            body = self.poll()
+            if body['changes']:
+                yield body['changes']
+            self.since = body['next']
+            self.save_cursor()
+
+    def follow(self, handler, on_reset=None, retry=1.0):
+        while True:
+            try:
+                for changes in self.batches():
+                    handler(changes)
+            except ResetRequired as e:
+                if on_reset is None:
+                    raise
+                on_reset()
+                self.since = e.oldest
+                self.save_cursor()
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+                print(f'❌ change feed unavailable ({e}), retrying')
+                time.sleep(retry)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Change log maintenance and tailing')
+    sub = parser.add_subparsers(dest='command', required=True)
+    compact_cmd = sub.add_parser('compact', help='drop superseded entries and apply retention')
+    compact_cmd.add_argument('--db', default=str(DB_PATH))
+    compact_cmd.add_argument('--keep-days', type=float, default=7)
+    compact_cmd.add_argument('--max-rows', type=int, default=100_000)
+    tail_cmd = sub.add_parser('tail', help='print changes from a running server as JSON lines')
+    tail_cmd.add_argument('--url', default='http://localhost:3000')
+    tail_cmd.add_argument('--since', type=int, default=None)
+    tail_cmd.add_argument('--tables', help='comma-separated table names')
+    tail_cmd.add_argument('--cursor-file', help='persist the position here between runs')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compact':
+        conn = connect(args.db)
+        try:
+            result = compact(conn, args.keep_days, args.max_rows)
+        finally:
+            conn.close()
+        print(f'✅ {result["superseded"]} superseded and {result["expired"]} expired entries removed '
+              f'(truncated through {result["truncated_through"]})')
+        return
+
+    feed = ChangeFeed(args.url, args.tables.split(',') if args.tables else None, args.cursor_file)
+    if args.since is not None:
+        feed.since = args.since
+    def show(changes):
+        for change in changes:
+            print(json.dumps(change, ensure_ascii=False), flush=True)
+
+    try:
+        feed.follow(show)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,7 @@
-import sqlite3
-import json
+from .core import Table
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect("../projects.db")
-cursor = conn.cursor()
-
-# حذف الجدول إذا كان موجود مسبقًا (اختياري)
-cursor.execute("DROP TABLE IF EXISTS contact_requests")
-
-# إنشاء جدول اتصل بنا
-cursor.execute('''
+# جدول اتصل بنا (بدون بيانات أولية)
+SCHEMA = '''
     CREATE TABLE contact_requests (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL,
@@ -19,9 +11,12 @@ cursor.execute('''
         phone TEXT,
         email TEXT
     )
-''')
+'''
+
+TABLES = [Table('contact_requests', SCHEMA)]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء جدول اتصل بنا بنجاح.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول اتصل بنا بنجاح.")
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+from pathlib import Path
+
+# نفس المسار الذي يستخدمه server.js: DB_PATH أو path.resolve(__dirname, 'projects.db')
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DB_PATH = Path(os.environ['DB_PATH']).resolve() if os.environ.get('DB_PATH') else ROOT_DIR / 'projects.db'
+
+
+def connect(path=None, mode=None):
+    # نتحكم في المعاملات يدويًا (BEGIN/COMMIT) بدل الوضع التلقائي لمكتبة sqlite3.
+    # mode='rw' يفتح قاعدة موجودة فقط: مسار خاطئ يرفع OperationalError بدل إنشاء ملف فارغ
+    path = str(path or DB_PATH)
+    conn = sqlite3.connect(f'file:{path}?mode={mode}' if mode else path, uri=bool(mode), isolation_level=None)
+    conn.execute('PRAGMA foreign_keys = OFF')
+    return conn
+
+
+class transaction:
+    # معاملة واحدة: COMMIT عند النجاح و ROLLBACK عند أي خطأ
+    def __init__(self, conn, mode='IMMEDIATE'):
+        self.conn = conn
+        self.mode = mode
+
+    def __enter__(self):
+        self.conn.execute(f'BEGIN {self.mode}')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class Table:
+    # تعريف جدول واحد: اسمه، جملة الإنشاء، الأعمدة، والصفوف الجاهزة للإدخال
+    # rows=None تعني جدولًا يملؤه المستخدمون (طلبات/رسائل) فلا يُحذف عند إعادة البذر
+    def __init__(self, name, schema, columns=(), rows=None, key='id'):
+        self.name = name
+        self.schema = schema
+        self.columns = tuple(columns)
+        self.rows = rows
+        self.key = key
+
+    @property
+    def seeded(self):
+        return self.rows is not None
+
+    @property
+    def insert_sql(self):
+        cols = ', '.join(quote(c) for c in self.columns)
+        marks = ', '.join('?' for _ in self.columns)
+        return f'INSERT INTO {quote(self.name)} ({cols}) VALUES ({marks})'
+
+    def __repr__(self):
+        return f'<Table {self.name}>'
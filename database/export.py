@@ -0,0 +1,233 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import time
+from pathlib import Path
+
+from .changes import ChangeFeed
+from .core import DB_PATH, ROOT_DIR
+
+try:
+    import brotli
+except ImportError:  # اختياري: بدونه نستخدم zlib في Node (موجود دائمًا مع server.js)
+    brotli = None
+
+NODE_BROTLI = (
+    "const z = require('zlib');"
+    "process.stdout.write(z.brotliCompressSync(require('fs').readFileSync(0),"
+    " {params: {[z.constants.BROTLI_PARAM_QUALITY]: 11}}));"
+)
+
+# تصدير استجابات المسارات العامة (للقراءة فقط) إلى ملفات JSON ثابتة مضغوطة مسبقًا
+# الشكل مطابق حرفيًا لما يُرجعه server.js حتى يمكن تقديمها كملفات ثابتة بلا قاعدة بيانات
+
+OUT_DIR = ROOT_DIR / 'snapshots'
+
+
+def parse_list(value, strict=True):
+    # strict=False يطابق try/catch في مسارات الباقات (قيمة تالفة => [])
+    try:
+        return json.loads(value or '[]')
+    except ValueError:
+        if strict:
+            raise
+        return []
+
+
+def render_packages(rows):
+    return [
+        {**r, 'features': parse_list(r['features'], strict=False), 'is_active': r['is_active'] == 1}
+        for r in rows
+    ]
+
+
+def render_services(rows):
+    return [{**r, 'features': parse_list(r['features']), 'benefits': parse_list(r['benefits'])} for r in rows]
+
+
+def render_team_members(rows):
+    return [
+        {
+            **r,
+            'achievements': parse_list(r['achievements']),
+            'skills': parse_list(r['skills']),
+            'isActive': bool(r['isActive']),
+        }
+        for r in rows
+    ]
+
+
+# المسار -> (الملف، الجداول المصدر، الاستعلام كما في server.js، دالة التحويل)
+ENDPOINTS = {
+    '/api/packages': (
+        'packages.json', ('packages',),
+        'SELECT * FROM packages ORDER BY COALESCE(display_order, 999999), id', render_packages,
+    ),
+    '/api/packages-server': (
+        'packages-server.json', ('packages_server',),
+        'SELECT * FROM packages_server ORDER BY COALESCE(display_order, 999999), id', render_packages,
+    ),
+    '/api/services': (
+        'services.json', ('services',),
+        'SELECT * FROM services', render_services,
+    ),
+    '/api/team-members': (
+        'team-members.json', ('team_members',),
+        'SELECT * FROM team_members ORDER BY "order" ASC', render_team_members,
+    ),
+    '/api/team-members?activeOnly=true': (
+        'team-members.active.json', ('team_members',),
+        'SELECT * FROM team_members WHERE isActive = 1 ORDER BY "order" ASC', render_team_members,
+    ),
+}
+
+
+def js_number(value):
+    # JSON.stringify يكتب 4900 وليس 4900.0
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def to_json(payload):
+    def fix(obj):
+        if isinstance(obj, dict):
+            return {k: fix(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [fix(v) for v in obj]
+        return js_number(obj)
+    return json.dumps(fix(payload), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def brotli_compress(body):
+    if brotli is not None:
+        return brotli.compress(body, quality=11)
+    if shutil.which('node'):
+        return subprocess.run(['node', '-e', NODE_BROTLI], input=body, capture_output=True, check=True).stdout
+    return None
+
+
+def write_atomic(path, data):
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render(conn, route):
+    _, _, sql, transform = ENDPOINTS[route]
+    return to_json(transform([dict(row) for row in conn.execute(sql)]))
+
+
+def load_manifest(out_dir):
+    path = Path(out_dir) / 'manifest.json'
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))
+    return {'routes': {}}
+
+
+def export(path=None, out_dir=None, routes=None, force=False):
+    # يعيد كتابة الملفات فقط للمسارات التي تغيّر محتواها (ETag مختلف عن البيان السابق)
+    out_dir = Path(out_dir or OUT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    conn = sqlite3.connect(f'file:{path or DB_PATH}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    changed = []
+    try:
+        conn.execute('BEGIN')  # لقطة متسقة لكل المسارات
+        for route in routes or ENDPOINTS:
+            filename, tables, _, _ = ENDPOINTS[route]
+            body = render(conn, route)
+            tag = etag(body)
+            previous = manifest['routes'].get(route)
+            if not force and previous and previous['etag'] == tag and (out_dir / filename).exists():
+                continue
+            entry = {'file': filename, 'etag': tag, 'tables': list(tables), 'bytes': len(body)}
+            write_atomic(out_dir / filename, body)
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            write_atomic(out_dir / (filename + '.gz'), gz)
+            entry['gzip'] = {'file': filename + '.gz', 'bytes': len(gz)}
+            br = brotli_compress(body)
+            if br is not None:
+                write_atomic(out_dir / (filename + '.br'), br)
+                entry['br'] = {'file': filename + '.br', 'bytes': len(br)}
+            entry['generated_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            manifest['routes'][route] = entry
+            changed.append(route)
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+    if changed:
+        write_atomic(out_dir / 'manifest.json', json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+    return changed
+
+
+def watch(path=None, out_dir=None, interval=1.0):
+    # PRAGMA data_version يتغير عندما يكتب اتصال آخر (server.js) في القاعدة
+    conn = sqlite3.connect(f'file:{path or DB_PATH}?mode=ro', uri=True)
+    last = None
+    try:
+        while True:
+            version = conn.execute('PRAGMA data_version').fetchone()[0]
+            if version != last:
+                for route in export(path, out_dir):
+                    print(f'✅ {route} re-exported')
+                last = version
+            time.sleep(interval)
+    finally:
+        conn.close()
+
+
+def follow(path=None, out_dir=None, url='http://localhost:3000', cursor_file=None):
+    # عبر /api/changes: يعاد تصدير المسارات التي تقرأ من الجداول المتغيرة فقط
+    tables = sorted({t for _, sources, _, _ in ENDPOINTS.values() for t in sources})
+    feed = ChangeFeed(url, tables, cursor_file or Path(out_dir or OUT_DIR) / 'changes.cursor')
+
+    def apply(changes):
+        touched = {change['table'] for change in changes}
+        routes = [route for route, (_, sources, _, _) in ENDPOINTS.items() if touched & set(sources)]
+        for route in export(path, out_dir, routes):
+            print(f'✅ {route} re-exported')
+
+    def rebuild():
+        for route in export(path, out_dir):
+            print(f'✅ {route} re-exported (full rebuild)')
+
+    if feed.since == 0:
+        rebuild()
+    feed.follow(apply, on_reset=rebuild)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export read-only API responses as precompressed static JSON')
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--out', default=str(OUT_DIR))
+    parser.add_argument('--force', action='store_true', help='rewrite every file even if unchanged')
+    parser.add_argument('--watch', action='store_true', help='keep running and re-export when the database changes')
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--follow', metavar='URL', help='re-export from the change feed of the server at URL')
+    args = parser.parse_args(argv)
+
+    if args.follow:
+        follow(args.db, args.out, args.follow)
+        return
+    if args.watch:
+        watch(args.db, args.out, args.interval)
+        return
+    changed = export(args.db, args.out, force=args.force)
+    for route in changed:
+        print(f'✅ {route}')
+    print(f'✅ {len(changed)} of {len(ENDPOINTS)} snapshots updated in {args.out}')
+
+
+if __name__ == '__main__':
+    main()
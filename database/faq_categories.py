@@ -1,27 +1,23 @@
-import sqlite3
+from .core import Table
 
-# افتح (أو أنشئ) قاعدة البيانات
-conn = sqlite3.connect('projects.db')
-cursor = conn.cursor()
-
-# إنشاء جدول التصنيفات
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS faq_categories (
+# جدول التصنيفات
+CATEGORIES_SCHEMA = '''
+CREATE TABLE faq_categories (
     key TEXT PRIMARY KEY,
     label TEXT NOT NULL
 )
-''')
+'''
 
-# إنشاء جدول الأسئلة
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS faqs (
+# جدول الأسئلة
+FAQS_SCHEMA = '''
+CREATE TABLE faqs (
     id INTEGER PRIMARY KEY,
     category TEXT,
     question TEXT NOT NULL,
     answer TEXT NOT NULL,
     FOREIGN KEY(category) REFERENCES faq_categories(key)
 )
-''')
+'''
 
 # بيانات التصنيفات
 faq_categories = [
@@ -34,10 +30,6 @@ faq_categories = [
     { 'key': 'quality', 'label': 'معايير الجودة' }
 ]
 
-# إدخال التصنيفات
-for cat in faq_categories:
-    cursor.execute('INSERT OR IGNORE INTO faq_categories (key, label) VALUES (?, ?)', (cat['key'], cat['label']))
-
 # بيانات الأسئلة الكاملة (كما أرسلتها حرفياً)
 faqs = [
     {
@@ -138,15 +130,21 @@ faqs = [
     }
 ]
 
-# إدخال الأسئلة
-for faq in faqs:
-    cursor.execute('''
-    INSERT OR IGNORE INTO faqs (id, category, question, answer)
-    VALUES (?, ?, ?, ?)
-    ''', (faq['id'], faq['category'], faq['question'], faq['answer']))
+# التصنيفات قبل الأسئلة بسبب المفتاح الأجنبي
+TABLES = [
+    Table(
+        'faq_categories', CATEGORIES_SCHEMA, ('key', 'label'),
+        [(cat['key'], cat['label']) for cat in faq_categories],
+        key='key'
+    ),
+    Table(
+        'faqs', FAQS_SCHEMA, ('id', 'category', 'question', 'answer'),
+        [(faq['id'], faq['category'], faq['question'], faq['answer']) for faq in faqs]
+    ),
+]
 
-# حفظ وإغلاق
-conn.commit()
-conn.close()
 
-print("✅ تم إدخال جميع الأسئلة الشائعة بنجاح بدون نقص.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إدخال جميع الأسئلة الشائعة بنجاح بدون نقص.")
@@ -0,0 +1,71 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+from .core import connect, transaction
+from .registry import all_tables, get_tables
+from .seed import seed_tables
+
+# قواعد اختبار في الذاكرة: المخطط (كل الترحيلات) والبذر يُبنيان مرة واحدة في :memory: ويُحفظان
+# كبايتات (Connection.serialize)، ثم يأخذ كل اختبار نسخة مستقلة بـ deserialize في أجزاء من الملّي ثانية
+# بدل تشغيل سكربتات البذر على القرص. لـ server.js: write() يكتب النسخة إلى ملف مؤقت (DB_PATH)، أو
+# DB_PATH=:memory: مع DB_FIXTURE=<الملف> فيحمّلها الخادم في ذاكرته عند التشغيل
+
+_images = {}
+
+
+def image(tables=None):
+    # بايتات القاعدة المبذورة؛ تُبنى مرة لكل مجموعة جداول في العملية
+    names = tuple(table.name for table in tables) if tables is not None else None
+    if names not in _images:
+        conn = connect(':memory:')
+        try:
+            with transaction(conn):
+                seed_tables(conn, tables if tables is not None else all_tables())
+            _images[names] = conn.serialize()
+        finally:
+            conn.close()
+    return _images[names]
+
+
+def memory(tables=None):
+    # اتصال جديد بنسخة خاصة: ما يكتبه اختبار لا يراه غيره
+    conn = connect(':memory:')
+    conn.deserialize(image(tables))
+    return conn
+
+
+def write(path, tables=None):
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(image(tables))
+    os.replace(tmp, path)
+    for suffix in ('-wal', '-shm'):
+        Path(str(path) + suffix).unlink(missing_ok=True)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seeded database images for tests')
+    parser.add_argument('--only', nargs='+', metavar='TABLE', help='seed only these tables')
+    parser.add_argument('--out', help='write the image to this file (for DB_PATH or DB_FIXTURE)')
+    parser.add_argument('--copies', type=int, default=1000, help='in-memory copies to time')
+    args = parser.parse_args(argv)
+
+    tables = get_tables(args.only) if args.only else None
+    started = time.perf_counter()
+    size = len(image(tables))
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.copies):
+        memory(tables).close()
+    copy = (time.perf_counter() - started) / args.copies
+    print(f'✅ image of {size} bytes built in {built * 1000:.1f} ms; '
+          f'a fresh in-memory copy takes {copy * 1e6:.0f} µs')
+    if args.out:
+        print(f'✅ written to {write(args.out, tables)}')
+
+
+if __name__ == '__main__':
+    main()
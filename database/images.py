@@ -0,0 +1,235 @@
+import argparse
+import datetime
+import hashlib
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from .core import DB_PATH, ROOT_DIR, connect, transaction
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # اختياري: مطلوب فقط لتشغيل المعالج نفسه
+    Image = None
+
+# معالج صور الرفع: لكل صورة في uploads/projects نحسب بصمة المحتوى (sha256)، ونخزّن الأصل
+# مرة واحدة في مخزن بحسب البصمة، ونولّد نسخًا بعروض متعددة بصيغة WebP (و AVIF إن توفّرت)
+# مع نسخة احتياطية بالصيغة الأصلية. الملفات المكررة تصبح روابط صلبة لنفس الأصل
+
+UPLOADS_ROOT = Path(os.environ['UPLOADS_DIR']).resolve() if os.environ.get('UPLOADS_DIR') else ROOT_DIR / 'uploads'
+WIDTHS = (320, 640, 1024, 1600)
+EXTENSIONS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP', '.gif': 'GIF'}
+QUALITY = {'webp': 80, 'avif': 60, 'jpeg': 82}
+
+# تُطبّق كترحيل رقم 5 (انظر migrations.py)
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS image_assets (
+        hash TEXT PRIMARY KEY,          -- sha256 لمحتوى الملف الأصلي
+        path TEXT NOT NULL,             -- /uploads/store/ab/<hash>.<ext>
+        mime TEXT,
+        width INTEGER,
+        height INTEGER,
+        bytes INTEGER,
+        created_at TEXT
+    )''',
+    # كل مسار مرفوع (كما يُخزّن في projects.image وغيرها) يشير إلى أصل واحد
+    '''CREATE TABLE IF NOT EXISTS image_aliases (
+        path TEXT PRIMARY KEY,
+        hash TEXT NOT NULL REFERENCES image_assets(hash)
+    )''',
+    'CREATE INDEX IF NOT EXISTS idx_image_aliases_hash ON image_aliases (hash)',
+    '''CREATE TABLE IF NOT EXISTS image_variants (
+        hash TEXT NOT NULL REFERENCES image_assets(hash),
+        width INTEGER NOT NULL,
+        format TEXT NOT NULL,           -- webp / avif / jpeg / png
+        path TEXT NOT NULL,
+        height INTEGER,
+        bytes INTEGER,
+        PRIMARY KEY (hash, width, format)
+    ) WITHOUT ROWID''',
+    # للاستعلام مباشرة بقيمة عمود الصورة: WHERE source_path = projects.image
+    '''CREATE VIEW IF NOT EXISTS v_image_variants AS
+        SELECT a.path AS source_path, v.hash, v.width, v.height, v.format, v.path, v.bytes
+        FROM image_aliases a JOIN image_variants v ON v.hash = a.hash''',
+]
+
+
+def require_pillow():
+    if Image is None:
+        raise SystemExit('Pillow is required for image derivatives: pip install Pillow')
+
+
+def output_formats():
+    formats = ['webp']
+    if features.check('avif'):
+        formats.append('avif')
+    return formats
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def public_path(path):
+    return '/uploads/' + Path(path).relative_to(UPLOADS_ROOT).as_posix()
+
+
+def store_dir(digest):
+    return UPLOADS_ROOT / 'store' / digest[:2]
+
+
+def save_variant(image, path, fmt):
+    tmp = path.with_name(path.name + '.tmp')
+    options = {'quality': QUALITY[fmt]} if fmt in QUALITY else {'optimize': True}
+    image.save(tmp, format=fmt.upper(), **options)
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def make_variants(source, digest):
+    # لا نكبّر الصورة: العروض الأكبر من الأصل تُستبدل بعرض الأصل نفسه مرة واحدة
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        fallback = 'png' if image.mode in ('RGBA', 'LA', 'P') else 'jpeg'
+        if fallback == 'jpeg':
+            image = image.convert('RGB')
+        widths = sorted({min(w, image.width) for w in WIDTHS})
+        variants = []
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in output_formats() + [fallback]:
+                path = store_dir(digest) / f'{digest}-{width}.{fmt}'
+                size = path.stat().st_size if path.exists() else save_variant(resized, path, fmt)
+                variants.append((digest, width, fmt, public_path(path), height, size))
+        return image.width, image.height, Image.MIME.get(opened.format), variants
+
+
+def dedupe(upload, original):
+    # استبدال النسخة المكررة برابط صلب لنفس الأصل (المسار العام لا يتغير)
+    if upload.samefile(original):
+        return
+    tmp = upload.with_name(upload.name + '.link')
+    try:
+        os.link(original, tmp)
+        os.replace(tmp, upload)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def process(conn, upload):
+    upload = Path(upload).resolve()
+    alias = public_path(upload)
+    if conn.execute('SELECT 1 FROM image_aliases WHERE path = ?', (alias,)).fetchone():
+        return None
+    digest = file_hash(upload)
+    known = conn.execute('SELECT path FROM image_assets WHERE hash = ?', (digest,)).fetchone()
+    if known:
+        dedupe(upload, UPLOADS_ROOT / known[0][len('/uploads/'):])
+        with transaction(conn):
+            conn.execute('INSERT INTO image_aliases (path, hash) VALUES (?, ?)', (alias, digest))
+        return digest, 'duplicate'
+
+    # النسخ أولًا: الملف التالف يفشل هنا قبل أن يدخل المخزن
+    store_dir(digest).mkdir(parents=True, exist_ok=True)
+    width, height, mime, variants = make_variants(upload, digest)
+    original = store_dir(digest) / f'{digest}{upload.suffix.lower()}'
+    if not original.exists():
+        try:
+            os.link(upload, original)
+        except OSError:  # أنظمة ملفات مختلفة
+            shutil.copyfile(upload, original)
+    with transaction(conn):
+        conn.execute(
+            'INSERT INTO image_assets (hash, path, mime, width, height, bytes, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (digest, public_path(original), mime, width, height, original.stat().st_size,
+             datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'))
+        )
+        conn.executemany(
+            'INSERT OR REPLACE INTO image_variants (hash, width, format, path, height, bytes) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            variants
+        )
+        conn.execute('INSERT INTO image_aliases (path, hash) VALUES (?, ?)', (alias, digest))
+    return digest, f'{len(variants)} variants'
+
+
+def fingerprint(path):
+    # صورة فشلت تُعاد محاولتها إذا تغيّر الملف: multer يكتب الرفع مباشرة باسمه النهائي،
+    # فقد يقرأ المعالج ملفًا لم يكتمل بعد
+    stat = path.stat()
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def pending_uploads(conn, directory, failed=(), settle=0.0):
+    # settle: تجاهل ما عُدّل خلال آخر settle ثانية (رفع ما زال يُكتب)؛ يُلتقط في الدورة التالية
+    known = {row[0] for row in conn.execute('SELECT path FROM image_aliases')}
+    now = time.time()
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in EXTENSIONS or not path.is_file():
+            continue
+        try:
+            key = fingerprint(path)
+        except FileNotFoundError:  # حُذف بين القراءة والفحص
+            continue
+        if key in failed or now - key[1] / 1e9 < settle:
+            continue
+        if public_path(path.resolve()) not in known:
+            yield path
+
+
+def run(conn, paths, failed=None):
+    for path in paths:
+        try:
+            result = process(conn, path)
+        except Exception as e:  # صورة تالفة لا توقف المعالج؛ في وضع المراقبة تُعاد فقط إذا تغيّر الملف
+            print(f'❌ {path}: {e}', file=sys.stderr)
+            if failed is not None:
+                try:
+                    failed.add(fingerprint(path))
+                except FileNotFoundError:
+                    pass
+            continue
+        if result:
+            print(f'✅ {path.name}: {result[0][:12]} ({result[1]})')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate responsive WebP/AVIF derivatives for uploaded images')
+    parser.add_argument('files', nargs='*', help='process these files (use - to read paths from stdin)')
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--dir', default=str(UPLOADS_ROOT / 'projects'), help='upload directory to scan')
+    parser.add_argument('--watch', action='store_true', help='keep polling the upload directory')
+    parser.add_argument('--interval', type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    from .migrations import migrate  # migrations يستورد SCHEMA من هذه الوحدة
+
+    require_pillow()
+    conn = connect(args.db)
+    try:
+        migrate(conn)
+        if args.files == ['-']:
+            run(conn, (Path(line.strip()) for line in sys.stdin if line.strip()))
+        elif args.files:
+            run(conn, [Path(f) for f in args.files])
+        else:
+            failed = set()
+            settle = args.interval if args.watch else 0.0
+            run(conn, pending_uploads(conn, args.dir, failed, settle), failed)
+            while args.watch:
+                time.sleep(args.interval)
+                run(conn, pending_uploads(conn, args.dir, failed, settle), failed)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
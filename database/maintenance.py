@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from . import changes
+from .core import DB_PATH, connect, quote
+
+# صيانة دورية لـ projects.db: إحصاءات المخطِّط (sqlite_stat1)، إعادة الصفحات الحرة إلى النظام
+# (incremental_vacuum)، وتقرير بالحجم والتجزؤ لكل جدول وفهرس (dbstat) مع توصيات page_size/mmap_size.
+#
+# كل خطوة قصيرة وآمنة والخادم يعمل: PRAGMA optimize يحلل فقط ما تغيّر (analysis_limit يحد كلفته)،
+# وincremental_vacuum يُنفَّذ على دفعات صغيرة كل منها معاملة مستقلة فلا يُحجب الكاتب طويلًا.
+# تفعيل auto_vacuum أو تغيير page_size يتطلب VACUUM كاملًا مرة واحدة (الأمر vacuum)
+
+AUTO_VACUUM = {0: 'none', 1: 'full', 2: 'incremental'}
+ANALYSIS_LIMIT = 1000
+VACUUM_STEP = 256  # صفحات تُحرَّر في كل معاملة
+MIB = 1 << 20
+
+
+def pragma(conn, name):
+    return conn.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def objects(conn):
+    # لكل جدول/فهرس: الصفحات والبايتات ونسبة امتلاء الصفحات وصفحات الفيض (صفوف أكبر من الصفحة)
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_schema WHERE type IN ('table', 'index')"))
+    kinds.update({'sqlite_schema': 'table'})
+    rows = conn.execute('''
+        SELECT name, COUNT(*), SUM(pgsize), SUM(pgsize - unused), SUM(pagetype = 'overflow'), SUM(ncell)
+        FROM dbstat GROUP BY name ORDER BY SUM(pgsize) DESC
+    ''').fetchall()
+    return [
+        {
+            'name': name,
+            'type': kinds.get(name, 'table'),
+            'pages': pages,
+            'bytes': size,
+            'fill': round(used / size, 3) if size else 0,
+            'overflow_pages': overflow,
+            'cells': cells,
+        }
+        for name, pages, size, used, overflow, cells in rows
+    ]
+
+
+def has_stat1(conn):
+    return conn.execute("SELECT 1 FROM sqlite_schema WHERE name = 'sqlite_stat1'").fetchone() is not None
+
+
+def unanalyzed(conn):
+    # جداول غير فارغة لها فهارس بلا صف في sqlite_stat1: المخطِّط يختار بينها بالتخمين
+    # (ANALYZE لا يكتب شيئًا لجدول فارغ)
+    indexed = {
+        row[0] for row in conn.execute(
+            "SELECT DISTINCT tbl_name FROM sqlite_schema WHERE type = 'index' AND tbl_name NOT LIKE 'sqlite_%'"
+        )
+        if conn.execute(f'SELECT EXISTS (SELECT 1 FROM {quote(row[0])})').fetchone()[0]
+    }
+    analyzed = {row[0] for row in conn.execute('SELECT DISTINCT tbl FROM sqlite_stat1')} if has_stat1(conn) else set()
+    return sorted(indexed - analyzed)
+
+
+def recommend(report):
+    tips = []
+    free = report['freelist_pages'] / report['page_count'] if report['page_count'] else 0
+    if free > 0.1:
+        if report['auto_vacuum'] == 'incremental':
+            tips.append(f'{free:.0%} of the file is free pages: run `maintenance run` to release them')
+        else:
+            tips.append(f'{free:.0%} of the file is free pages and auto_vacuum is {report["auto_vacuum"]}: '
+                        f'run `maintenance vacuum` once to switch to incremental')
+    overflow = sum(o['overflow_pages'] for o in report['objects'])
+    if overflow and report['page_size'] < 16384:
+        size = 16384 if overflow > report['page_count'] // 10 else max(8192, report['page_size'] * 2)
+        tips.append(f'{overflow} overflow pages (rows larger than a {report["page_size"]}-byte page): '
+                    f'`maintenance vacuum --page-size {size}` with the server stopped')
+    sparse = [o['name'] for o in report['objects'] if o['pages'] >= 8 and o['fill'] < 0.5]
+    if sparse:
+        tips.append(f'pages under half full in {", ".join(sparse)}: `maintenance vacuum` rebuilds them')
+    # mmap يغطي الملف كله مع هامش للنمو: قراءات بلا نسخ من ذاكرة النظام إلى ذاكرة كل اتصال
+    mmap = max(64 * MIB, 1 << (report['bytes'] * 2 - 1).bit_length()) if report['bytes'] else 64 * MIB
+    report['mmap_size'] = mmap
+    tips.append(f'DB_MMAP_SIZE={mmap} ({mmap // MIB} MiB) maps the whole file with room to double')
+    if report['unanalyzed']:
+        tips.append(f'no planner statistics for {", ".join(report["unanalyzed"])}: run `maintenance run --analyze`')
+    return tips
+
+
+def report(conn, path=None):
+    path = path or DB_PATH
+    result = {
+        'bytes': file_size(path),
+        'wal_bytes': file_size(f'{path}-wal'),
+        'page_size': pragma(conn, 'page_size'),
+        'page_count': pragma(conn, 'page_count'),
+        'freelist_pages': pragma(conn, 'freelist_count'),
+        'auto_vacuum': AUTO_VACUUM[pragma(conn, 'auto_vacuum')],
+        'objects': objects(conn),
+        'unanalyzed': unanalyzed(conn),
+    }
+    result['recommendations'] = recommend(result)
+    return result
+
+
+def incremental_vacuum(conn, step=VACUUM_STEP, pause=0.01):
+    # دفعات صغيرة بدل incremental_vacuum واحد: بين الدفعات يأخذ server.js قفل الكتابة
+    freed = 0
+    while True:
+        before = pragma(conn, 'freelist_count')
+        if before == 0:
+            return freed
+        # execute() يخطو الجملة مرة واحدة فيحرر صفحة واحدة فقط؛ executescript يكملها
+        conn.executescript(f'PRAGMA incremental_vacuum({step})')
+        after = pragma(conn, 'freelist_count')
+        if after >= before:
+            return freed
+        freed += before - after
+        time.sleep(pause)
+
+
+def run(conn, analyze=False, compact_changes=False, step=VACUUM_STEP):
+    result = {}
+    started = time.perf_counter()
+    conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+    if analyze or not has_stat1(conn):
+        conn.execute('ANALYZE')
+    else:
+        # 0x10002: كل الجداول لا فقط ما استعمله هذا الاتصال؛ optimize يتجاهل الجداول الصغيرة جدًا
+        # ويحلل ما تغيّر عدد صفوفه كثيرًا منذ آخر ANALYZE
+        conn.execute('PRAGMA optimize = 0x10002').fetchall()
+    result['analyze_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    if compact_changes:
+        result['changes'] = changes.compact(conn)
+
+    if pragma(conn, 'auto_vacuum') == 2:
+        started = time.perf_counter()
+        result['freed_pages'] = incremental_vacuum(conn, step)
+        result['vacuum_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    # في وضع WAL لا يصغر الملف إلا بعد نقل الصفحات إليه؛ PASSIVE لا ينتظر القرّاء ولا الكاتب
+    busy, wal_pages, moved = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+    result['checkpoint'] = {'busy': bool(busy), 'wal_pages': wal_pages, 'checkpointed': moved}
+    return result
+
+
+def vacuum(conn, page_size=None):
+    # VACUUM كامل مرة واحدة يثبّت auto_vacuum=INCREMENTAL ويعيد بناء كل الصفحات ممتلئة.
+    # تغيير page_size غير ممكن في وضع WAL، فنخرج منه مؤقتًا (يتطلب ألا يكون اتصال آخر مفتوحًا)
+    journal = pragma(conn, 'journal_mode')
+    if page_size:
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.execute(f'PRAGMA page_size = {int(page_size)}')
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    if page_size and journal == 'wal':
+        conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('ANALYZE')
+
+
+def print_report(result, path):
+    print(f'{path}: {result["bytes"] / MIB:.1f} MiB (+{result["wal_bytes"] / MIB:.1f} MiB WAL), '
+          f'{result["page_count"]} pages of {result["page_size"]} bytes, '
+          f'{result["freelist_pages"]} free, auto_vacuum {result["auto_vacuum"]}')
+    print(f'{"name":<40} {"type":<6} {"pages":>7} {"KiB":>9} {"fill":>6} {"overflow":>8}')
+    for o in result['objects']:
+        print(f'{o["name"]:<40} {o["type"]:<6} {o["pages"]:>7} {o["bytes"] / 1024:>9.1f} '
+              f'{o["fill"]:>6.0%} {o["overflow_pages"]:>8}')
+    for tip in result['recommendations']:
+        print(f'💡 {tip}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Planner statistics, vacuuming and size reports for projects.db')
+    parser.add_argument('--db', default=str(DB_PATH), help='an existing database (default: the one server.js uses)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    report_cmd = sub.add_parser('report', help='freelist, page fill and size per table and index (dbstat)')
+    report_cmd.add_argument('--json', action='store_true')
+    run_cmd = sub.add_parser('run', help='PRAGMA optimize, incremental vacuum and a WAL checkpoint')
+    run_cmd.add_argument('--analyze', action='store_true',
+                         help='ANALYZE every table instead of PRAGMA optimize (done anyway on the first run)')
+    run_cmd.add_argument('--compact-changes', action='store_true', help='also compact change_log (7 days)')
+    run_cmd.add_argument('--step', type=int, default=VACUUM_STEP, help='pages freed per transaction')
+    run_cmd.add_argument('--every', type=float, help='keep running, once every this many seconds')
+    vacuum_cmd = sub.add_parser('vacuum', help='one full VACUUM that enables incremental auto_vacuum')
+    vacuum_cmd.add_argument('--page-size', type=int, choices=[1024, 2048, 4096, 8192, 16384, 32768, 65536],
+                            help='rebuild with this page size (server must be stopped)')
+    args = parser.parse_args(argv)
+
+    try:
+        conn = connect(args.db, mode='rw')
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f'❌ cannot open {args.db}: {e}')
+    try:
+        if args.command == 'report':
+            result = report(conn, args.db)
+            if args.json:
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+            else:
+                print_report(result, args.db)
+        elif args.command == 'vacuum':
+            before = file_size(args.db)
+            started = time.perf_counter()
+            vacuum(conn, args.page_size)
+            print(f'✅ vacuumed in {time.perf_counter() - started:.2f}s: {before / MIB:.2f} → '
+                  f'{file_size(args.db) / MIB:.2f} MiB, page_size {pragma(conn, "page_size")}, auto_vacuum incremental')
+        else:
+            while True:
+                result = run(conn, args.analyze, args.compact_changes, args.step)
+                print(f'✅ {json.dumps(result, ensure_ascii=False)}', flush=True)
+                if not args.every:
+                    break
+                time.sleep(args.every)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
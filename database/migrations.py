@@ -0,0 +1,184 @@
+import argparse
+import datetime
+import json
+
+from . import changes, images, normalized, search, versions
+from .core import DB_PATH, connect, transaction
+from .registry import all_tables
+
+# ترحيلات مرقّمة تملك مخطط projects.db بالكامل. كل ترحيل يُطبّق مرة واحدة في مكانه
+# (بدون DROP) ويُسجّل في schema_migrations مع خطة التنفيذ قبل وبعد لاستعلامات server.js
+
+
+class Migration:
+    def __init__(self, version, name, statements, queries=()):
+        self.version = version
+        self.name = name
+        self.statements = statements
+        self.queries = tuple(queries)
+
+    def sql(self):
+        return self.statements() if callable(self.statements) else list(self.statements)
+
+
+def baseline_statements():
+    # الجداول كما تعرّفها سكربتات البذر؛ IF NOT EXISTS يجعلها تتبنّى قاعدة قائمة دون فقد بيانات
+    return [table.schema.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1) for table in all_tables()]
+
+
+# أشكال الاستعلامات كما يرسلها server.js حرفيًا
+FAQS_BY_CATEGORY = 'SELECT * FROM faqs WHERE category = ? ORDER BY id'
+TEAM_ACTIVE = 'SELECT * FROM team_members WHERE isActive = 1 ORDER BY "order" ASC'
+TEAM_ALL = 'SELECT * FROM team_members ORDER BY "order" ASC'
+REVIEWS_ORDERED = 'SELECT * FROM reviews ORDER BY ordering ASC'
+PACKAGES_ORDERED = 'SELECT * FROM packages ORDER BY COALESCE(display_order, 999999), id'
+PACKAGES_SERVER_ORDERED = 'SELECT * FROM packages_server ORDER BY COALESCE(display_order, 999999), id'
+SERVICES_ORDERED = 'SELECT * FROM services ORDER BY COALESCE(display_order, 999999), id'
+FAQ_CATEGORY_COUNT = 'SELECT COUNT(*) as count FROM faqs WHERE category = ?'
+PACKAGES_BY_FEATURE = 'SELECT parent_id FROM packages_features WHERE value = ?'
+TEAM_BY_SKILL = 'SELECT parent_id FROM team_members_skills WHERE value = ?'
+FAQS_SEARCH = 'SELECT rowid FROM fts_faqs WHERE fts_faqs MATCH ? ORDER BY rank'
+# صفحات keyset (lib/pagination.js): شرط المؤشر + نفس مفتاح الترتيب + LIMIT
+REVIEWS_PAGE = (
+    'SELECT * FROM reviews WHERE COALESCE(ordering, 999999) >= ? AND (COALESCE(ordering, 999999), id) > (?, ?) '
+    'ORDER BY COALESCE(ordering, 999999) ASC, id ASC LIMIT 51'
+)
+FAQS_PAGE = 'SELECT * FROM faqs WHERE category = ? AND (id) > (?) ORDER BY id ASC LIMIT 51'
+PROJECTS_PAGE = 'SELECT * FROM projects WHERE (rowid) > (?) ORDER BY rowid ASC LIMIT 51'
+PROJECT_REQUESTS_PAGE = 'SELECT * FROM project_requests WHERE (id) < (?) ORDER BY id DESC LIMIT 51'
+CHANGES_SINCE = 'SELECT * FROM change_log WHERE seq > ? AND tbl IN (?, ?) ORDER BY seq LIMIT 500'
+
+MIGRATIONS = [
+    Migration(1, 'baseline schema', baseline_statements),
+    Migration(2, 'indexes for list endpoints', [
+        'CREATE INDEX IF NOT EXISTS idx_faqs_category ON faqs (category, id)',
+        'CREATE INDEX IF NOT EXISTS idx_team_members_active_order ON team_members (isActive, "order")',
+        'CREATE INDEX IF NOT EXISTS idx_team_members_order ON team_members ("order")',
+        'CREATE INDEX IF NOT EXISTS idx_reviews_ordering ON reviews (ordering)',
+        'CREATE INDEX IF NOT EXISTS idx_packages_display_order ON packages (COALESCE(display_order, 999999), id)',
+        'CREATE INDEX IF NOT EXISTS idx_packages_server_display_order '
+        'ON packages_server (COALESCE(display_order, 999999), id)',
+        'CREATE INDEX IF NOT EXISTS idx_services_display_order ON services (COALESCE(display_order, 999999), id)',
+    ], [
+        FAQS_BY_CATEGORY, FAQ_CATEGORY_COUNT, TEAM_ACTIVE, TEAM_ALL, REVIEWS_ORDERED, PACKAGES_ORDERED,
+        PACKAGES_SERVER_ORDERED, SERVICES_ORDERED,
+    ]),
+    Migration(3, 'normalized array columns', normalized.statements, [PACKAGES_BY_FEATURE, TEAM_BY_SKILL]),
+    Migration(4, 'full-text search', search.statements, [FAQS_SEARCH]),
+    Migration(5, 'image derivatives', images.SCHEMA),
+    # بقية مفاتيح الصفحات هي rowid أو فهارس الترحيل 2
+    Migration(6, 'keyset pagination', [
+        'CREATE INDEX IF NOT EXISTS idx_reviews_page ON reviews (COALESCE(ordering, 999999), id)',
+    ], [REVIEWS_PAGE, FAQS_PAGE, PROJECTS_PAGE, PROJECT_REQUESTS_PAGE]),
+    Migration(7, 'table versions for conditional GET', versions.statements),
+    Migration(8, 'change log', changes.statements, [CHANGES_SINCE]),
+    Migration(9, 'bulk loads pause the change log', changes.pausable_statements),
+]
+
+
+def ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL,
+            plan_before TEXT,  -- JSON: {query: [EXPLAIN QUERY PLAN details]}
+            plan_after TEXT
+        )
+    ''')
+
+
+def current_version(conn):
+    ensure_version_table(conn)
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations').fetchone()[0]
+
+
+def explain(conn, sql):
+    params = (None,) * sql.count('?')
+    try:
+        return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+    except Exception as e:  # الجدول قد لا يكون موجودًا بعد
+        return [f'error: {e}']
+
+
+def query_plans(conn, queries):
+    return {sql: explain(conn, sql) for sql in queries}
+
+
+def apply(conn, migration):
+    before = query_plans(conn, migration.queries)
+    for statement in migration.sql():
+        conn.execute(statement)
+    after = query_plans(conn, migration.queries)
+    conn.execute(
+        'INSERT INTO schema_migrations (version, name, applied_at, plan_before, plan_after) VALUES (?, ?, ?, ?, ?)',
+        (
+            migration.version,
+            migration.name,
+            datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            json.dumps(before, ensure_ascii=False),
+            json.dumps(after, ensure_ascii=False),
+        )
+    )
+    return before, after
+
+
+def pending(conn, target=None):
+    version = current_version(conn)
+    return [m for m in MIGRATIONS if m.version > version and (target is None or m.version <= target)]
+
+
+def migrate(conn, target=None):
+    # داخل معاملة قائمة نطبّق مباشرة، وإلا فكل ترحيل في معاملته الخاصة
+    applied = []
+    for migration in pending(conn, target):
+        if conn.in_transaction:
+            apply(conn, migration)
+        else:
+            with transaction(conn):
+                apply(conn, migration)
+        applied.append(migration)
+    return applied
+
+
+def history(conn):
+    ensure_version_table(conn)
+    return conn.execute(
+        'SELECT version, name, applied_at, plan_before, plan_after FROM schema_migrations ORDER BY version'
+    ).fetchall()
+
+
+def print_plans(before, after):
+    for sql in after:
+        print(f'  {sql}')
+        print(f'    before: {" | ".join(before.get(sql, []))}')
+        print(f'    after:  {" | ".join(after[sql])}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply schema migrations to projects.db in place')
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--to', type=int, help='stop at this version')
+    parser.add_argument('--status', action='store_true', help='show applied migrations and their query plans')
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    try:
+        if args.status:
+            for version, name, applied_at, before, after in history(conn):
+                print(f'✅ {version:03d} {name} ({applied_at})')
+                print_plans(json.loads(before or '{}'), json.loads(after or '{}'))
+            for migration in pending(conn):
+                print(f'⏳ {migration.version:03d} {migration.name}')
+            return
+        applied = migrate(conn, args.to)
+        for migration in applied:
+            print(f'✅ {migration.version:03d} {migration.name}')
+        if not applied:
+            print(f'✅ already at version {current_version(conn)}')
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from .core import quote
+from .registry import get_tables
+
+# أعمدة المصفوفات (نص JSON) وجداولها الفرعية المطبّعة: (parent_id, position, value)
+# العمود الأصلي يبقى مصدر الكتابة لـ server.js، والمشغّلات (triggers) تُبقي الجدول الفرعي متزامنًا
+# فتصبح القراءة والتصفية حسب القيمة بحثًا في فهرس بدل تحليل JSON لكل صف
+ARRAY_COLUMNS = [
+    ('services', 'features'),
+    ('services', 'benefits'),
+    ('packages', 'features'),
+    ('packages_server', 'features'),
+    ('team_members', 'achievements'),
+    ('team_members', 'skills'),
+]
+
+# النوع المناسب لمعرّف الأب في كل جدول
+PARENT_ID_TYPES = {'services': 'INTEGER', 'packages': 'INTEGER', 'packages_server': 'INTEGER', 'team_members': 'TEXT'}
+
+
+def child_table(table, column):
+    return f'{table}_{column}'
+
+
+def array_source(expr):
+    # القيم التالفة أو غير المصفوفة تُعامل كمصفوفة فارغة (CASE لا يقيّم الفرع الآخر)
+    return (
+        f"CASE WHEN json_valid({expr}) THEN "
+        f"CASE WHEN json_type({expr}) = 'array' THEN {expr} ELSE '[]' END ELSE '[]' END"
+    )
+
+
+def column_statements(table, column):
+    child = child_table(table, column)
+    col = quote(column)
+    fill = (
+        f'INSERT INTO {child} (parent_id, position, value) '
+        f'SELECT NEW.id, key, value FROM json_each({array_source("NEW." + col)});'
+    )
+    return [
+        f'''CREATE TABLE IF NOT EXISTS {child} (
+            parent_id {PARENT_ID_TYPES[table]} NOT NULL,
+            position INTEGER NOT NULL,
+            value TEXT,
+            PRIMARY KEY (parent_id, position)
+        ) WITHOUT ROWID''',
+        f'CREATE INDEX IF NOT EXISTS idx_{child}_value ON {child} (value, parent_id)',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{child}_insert AFTER INSERT ON {table} BEGIN
+            {fill}
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{child}_update AFTER UPDATE OF {col}, id ON {table} BEGIN
+            DELETE FROM {child} WHERE parent_id = OLD.id;
+            {fill}
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{child}_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {child} WHERE parent_id = OLD.id;
+        END''',
+        # تحويل البيانات الموجودة
+        f'DELETE FROM {child}',
+        f'INSERT INTO {child} (parent_id, position, value) '
+        f'SELECT p.id, j.key, j.value FROM {table} p, json_each({array_source("p." + col)}) j',
+    ]
+
+
+def aggregated(table, column):
+    child = child_table(table, column)
+    return (
+        f'(SELECT json_group_array(value) FROM '
+        f'(SELECT value FROM {child} c WHERE c.parent_id = p.id ORDER BY c.position)) AS {quote(column)}'
+    )
+
+
+def view_statement(table):
+    # عرض متوافق: نفس الأعمدة ونفس الترتيب، والمصفوفات تُجمع من الجداول الفرعية
+    arrays = {column for t, column in ARRAY_COLUMNS if t == table}
+    (definition,) = get_tables([table])
+    select = ', '.join(aggregated(table, c) if c in arrays else f'p.{quote(c)}' for c in definition.columns)
+    return f'CREATE VIEW IF NOT EXISTS v_{table} AS SELECT {select} FROM {table} p'
+
+
+def statements():
+    result = []
+    for table, column in ARRAY_COLUMNS:
+        result += column_statements(table, column)
+    for table in dict.fromkeys(table for table, _ in ARRAY_COLUMNS):
+        result.append(view_statement(table))
+    return result
+
+
+def values(conn, table, column, parent_id):
+    child = child_table(table, column)
+    return [row[0] for row in conn.execute(
+        f'SELECT value FROM {child} WHERE parent_id = ? ORDER BY position', (parent_id,)
+    )]
+
+
+def find(conn, table, column, value):
+    # "كل الباقات التي تحتوي الميزة X" عبر فهرس idx_<child>_value
+    child = child_table(table, column)
+    return conn.execute(
+        f'SELECT * FROM v_{table} WHERE id IN (SELECT parent_id FROM {child} WHERE value = ?)', (value,)
+    ).fetchall()
@@ -1,15 +1,9 @@
-import sqlite3
 import json
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect("../projects.db")
-cursor = conn.cursor()
+from .core import Table
 
-# حذف الجدول إذا كان موجود مسبقاً
-cursor.execute("DROP TABLE IF EXISTS packages")
-
-# إنشاء جدول الباقات
-cursor.execute('''
+# جدول الباقات
+SCHEMA = '''
     CREATE TABLE packages (
         id INTEGER PRIMARY KEY,
         title TEXT,
@@ -21,7 +15,11 @@ cursor.execute('''
         is_active BOOLEAN,
         display_order INTEGER
     )
-''')
+'''
+
+COLUMNS = (
+    'id', 'title', 'description', 'price', 'delivery_time', 'features', 'category', 'is_active', 'display_order'
+)
 
 # بيانات الباقات
 packages = [
@@ -102,13 +100,8 @@ packages = [
     }
 ]
 
-# إدخال البيانات
-for pkg in packages:
-    cursor.execute('''
-        INSERT INTO packages (
-            id, title, description, price, delivery_time, features, category, is_active, display_order
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+def row(pkg):
+    return (
         pkg['id'],
         pkg['title'],
         pkg['description'],
@@ -118,9 +111,13 @@ for pkg in packages:
         pkg['category'],
         int(pkg['is_active']),
         pkg['order']
-    ))
+    )
+
+
+TABLES = [Table('packages', SCHEMA, COLUMNS, [row(pkg) for pkg in packages])]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء جدول الباقات وإدخال البيانات بنجاح.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول الباقات وإدخال البيانات بنجاح.")
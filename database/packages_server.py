@@ -1,15 +1,9 @@
-import sqlite3
 import json
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect("../projects.db")
-cursor = conn.cursor()
+from .core import Table
 
-# حذف الجدول إذا كان موجود مسبقاً
-cursor.execute("DROP TABLE IF EXISTS packages_server")
-
-# إنشاء جدول الباقات مع حقل لتخزين الكود الكامل للأيقونة
-cursor.execute('''
+# جدول الباقات مع حقل لتخزين الكود الكامل للأيقونة
+SCHEMA = '''
     CREATE TABLE packages_server (
         id INTEGER PRIMARY KEY,
         title TEXT,
@@ -22,7 +16,12 @@ cursor.execute('''
         display_order INTEGER,
         icon_html TEXT
     )
-''')
+'''
+
+COLUMNS = (
+    'id', 'title', 'description', 'price', 'delivery_time', 'features', 'category', 'is_active', 'display_order',
+    'icon_html'
+)
 
 # بيانات الباقات مع أيقونات HTML جاهزة للعرض
 packages_server = [
@@ -140,13 +139,8 @@ packages_server = [
     }
 ]
 
-# إدخال البيانات في قاعدة البيانات
-for pkg in packages_server:
-    cursor.execute('''
-        INSERT INTO packages_server (
-            id, title, description, price, delivery_time, features, category, is_active, display_order, icon_html
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+def row(pkg):
+    return (
         pkg['id'],
         pkg['title'],
         pkg['description'],
@@ -157,9 +151,13 @@ for pkg in packages_server:
         int(pkg['is_active']),
         pkg['order'],
         pkg['icon_html']
-    ))
+    )
+
+
+TABLES = [Table('packages_server', SCHEMA, COLUMNS, [row(pkg) for pkg in packages_server])]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء جدول الباقات وإدخال البيانات بنجاح.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول الباقات وإدخال البيانات بنجاح.")
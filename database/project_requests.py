@@ -0,0 +1,21 @@
+from .core import Table
+
+# جدول طلبات المشاريع (عروض الأسعار) - يُملأ من POST /api/project-requests
+SCHEMA = '''
+    CREATE TABLE project_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        company_name TEXT,
+        requested_services TEXT,  -- يمكن تخزينها كنص JSON أو مفصولة بفواصل
+        phone TEXT,
+        email TEXT
+    )
+'''
+
+TABLES = [Table('project_requests', SCHEMA)]
+
+
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول طلبات المشاريع بنجاح.")
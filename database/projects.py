@@ -1,13 +1,7 @@
-import sqlite3
+from .core import Table
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect('projects.db')
-cursor = conn.cursor()
-
-cursor.execute("DROP TABLE IF EXISTS projects")
-
-# إنشاء جدول المشاريع
-cursor.execute('''
+# جدول المشاريع
+SCHEMA = '''
 CREATE TABLE projects (
     id TEXT PRIMARY KEY,
     title TEXT NOT NULL,
@@ -23,7 +17,12 @@ CREATE TABLE projects (
     startDate TEXT,
     endDate TEXT
 )
-''')
+'''
+
+COLUMNS = (
+    'id', 'title', 'description', 'category', 'status', 'completion',
+    'value', 'duration', 'location', 'client', 'image', 'startDate', 'endDate'
+)
 
 # إضافة البيانات
 projects = [
@@ -122,15 +121,10 @@ projects = [
 
 ]
 
-for p in projects:
-    cursor.execute('''
-        INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        p['id'], p['title'], p['description'], p['category'], p['status'], p['completion'],
-        p['value'], p['duration'], p['location'], p['client'], p['image'], p['startDate'], p['endDate']
-    ))
+TABLES = [Table('projects', SCHEMA, COLUMNS, [tuple(p[c] for c in COLUMNS) for p in projects])]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء قاعدة البيانات وإضافة المشاريع.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء قاعدة البيانات وإضافة المشاريع.")
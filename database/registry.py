@@ -0,0 +1,25 @@
+from . import (
+    contact_requests, faq_categories, packages, packages_server, project_requests, projects, reviews, servise,
+    team_members
+)
+
+# كل الجداول التي يقرأها server.js (التصنيفات قبل الأسئلة بسبب المفتاح الأجنبي)
+MODULES = [
+    projects, servise, packages, packages_server, reviews, team_members, faq_categories, contact_requests,
+    project_requests
+]
+
+
+def all_tables():
+    return [table for module in MODULES for table in module.TABLES]
+
+
+def get_tables(names=None):
+    tables = all_tables()
+    if not names:
+        return tables
+    by_name = {table.name: table for table in tables}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise KeyError(f'Unknown table(s): {", ".join(unknown)}')
+    return [by_name[name] for name in names]
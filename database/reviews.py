@@ -1,16 +1,8 @@
-import sqlite3
+from .core import Table
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect('projects.db')
-cursor = conn.cursor()
-
-# حذف الجدول إذا كان موجودًا مسبقًا (اختياري لإعادة التشغيل)
-cursor.execute("DROP TABLE IF EXISTS reviews")
-
-
-# إنشاء الجدول
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS reviews (
+# جدول آراء العملاء
+SCHEMA = '''
+CREATE TABLE reviews (
     id TEXT PRIMARY KEY,
     name TEXT,
     position TEXT,
@@ -28,7 +20,13 @@ CREATE TABLE IF NOT EXISTS reviews (
     ordering INTEGER,
     joinDate TEXT
 )
-''')
+'''
+
+COLUMNS = (
+    'id', 'name', 'position', 'department', 'bio', 'email', 'phone',
+    'linkedin', 'image', 'experience', 'specialty', 'achievements',
+    'skills', 'isActive', 'ordering', 'joinDate'
+)
 
 # البيانات المضافة مع النصوص الكاملة في حقل bio
 reviews_data = [
@@ -106,22 +104,10 @@ reviews_data = [
     }
 ]
 
-# إدخال البيانات في الجدول
-for item in reviews_data:
-    cursor.execute('''
-    INSERT OR IGNORE INTO reviews (
-        id, name, position, department, bio, email, phone,
-        linkedin, image, experience, specialty, achievements,
-        skills, isActive, ordering, joinDate
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        item['id'], item['name'], item['position'], item['department'],
-        item['bio'], item['email'], item['phone'], item['linkedin'],
-        item['image'], item['experience'], item['specialty'],
-        item['achievements'], item['skills'], item['isActive'],
-        item['ordering'], item['joinDate']
-    ))
+TABLES = [Table('reviews', SCHEMA, COLUMNS, [tuple(item[c] for c in COLUMNS) for item in reviews_data])]
+
 
-print("✅ تمت إضافة جميع البيانات بنجاح.")
-conn.commit()
-conn.close()
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تمت إضافة جميع البيانات بنجاح.")
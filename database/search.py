@@ -0,0 +1,126 @@
+import argparse
+import json
+import re
+import sqlite3
+
+from .core import DB_PATH
+
+# فهرس بحث نصي كامل (FTS5) لكل جدول مصدر، rowid في الفهرس = rowid الصف الأصلي
+# النص يُخزّن مطبّعًا (توحيد الألف/الهمزة والتاء المربوطة وحذف التشكيل) بدوال replace في SQL،
+# فتعمل المشغّلات مع أي كاتب (server.js أو سكربتات بايثون) دون tokenizer مخصص
+
+# (الجدول، الأعمدة المفهرسة، عمود العنوان المعروض)
+SOURCES = {
+    'faqs': (('question', 'answer'), 'question'),
+    'services': (('title', 'description'), 'title'),
+    'projects': (('title', 'description', 'location', 'client'), 'title'),
+    'team_members': (('bio', 'specialty'), 'name'),
+}
+
+FOLDS = [
+    ('أ', 'ا'), ('إ', 'ا'), ('آ', 'ا'), ('ٱ', 'ا'),
+    ('ة', 'ه'), ('ى', 'ي'), ('ؤ', 'و'), ('ئ', 'ي'),
+]
+# الحركات (فتحتان..سكون)، الألف الخنجرية، والتطويل
+STRIPPED = [chr(c) for c in range(0x064B, 0x0653)] + ['ٰ', 'ـ']
+
+_TRANSLATION = str.maketrans({**dict(FOLDS), **{c: None for c in STRIPPED}})
+
+
+def normalize(text):
+    return (text or '').translate(_TRANSLATION)
+
+
+def normalize_sql(expr):
+    # نفس normalize() لكن كتعبير SQL متداخل
+    for old, new in FOLDS + [(c, '') for c in STRIPPED]:
+        expr = f"replace({expr}, '{old}', '{new}')"
+    return expr
+
+
+def fts_table(table):
+    return f'fts_{table}'
+
+
+def source_statements(table):
+    columns, _ = SOURCES[table]
+    fts = fts_table(table)
+    cols = ', '.join(columns)
+    new_values = ', '.join(normalize_sql(f'NEW.{c}') for c in columns)
+    insert = f'INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.rowid, {new_values});'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, tokenize = 'unicode61 remove_diacritics 2')",
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN
+            {insert}
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table} BEGIN
+            DELETE FROM {fts} WHERE rowid = OLD.rowid;
+            {insert}
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {fts} WHERE rowid = OLD.rowid;
+        END''',
+        f'DELETE FROM {fts}',
+        f'INSERT INTO {fts} (rowid, {cols}) SELECT rowid, '
+        + ', '.join(normalize_sql(c) for c in columns) + f' FROM {table}',
+    ]
+
+
+def statements():
+    return [sql for table in SOURCES for sql in source_statements(table)]
+
+
+def match_query(query):
+    # كل كلمة تُطابق كبادئة، والكلمات مربوطة بـ AND ضمنيًا
+    terms = re.findall(r'\w+', normalize(query))
+    return ' '.join('"' + term + '"*' for term in terms)
+
+
+def search(conn, query, sources=None, limit=20):
+    # نتائج مرتبة حسب bm25 عبر كل المصادر؛ highlight على النص المطبّع فقط
+    expression = match_query(query)
+    if not expression:
+        return []
+    results = []
+    for table in sources or SOURCES:
+        _, title = SOURCES[table]
+        fts = fts_table(table)
+        rows = conn.execute(
+            f'SELECT s.id, s.{title}, bm25({fts}), snippet({fts}, -1, \'[\', \']\', \'…\', 12) '
+            f'FROM {fts} JOIN {table} s ON s.rowid = {fts}.rowid '
+            f'WHERE {fts} MATCH ? ORDER BY rank LIMIT ?',
+            (expression, limit)
+        )
+        results += [
+            {'source': table, 'id': id_, 'title': text, 'score': round(-score, 4), 'snippet': snippet}
+            for id_, text, score, snippet in rows
+        ]
+    results.sort(key=lambda r: -r['score'])
+    return results[:limit]
+
+
+def rebuild(conn):
+    # إعادة بناء كاملة (مثلًا بعد تحميل جماعي) ثم دمج مقاطع الفهرس
+    for table in SOURCES:
+        for sql in source_statements(table)[-2:]:
+            conn.execute(sql)
+        conn.execute(f"INSERT INTO {fts_table(table)} ({fts_table(table)}) VALUES ('optimize')")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ranked full-text search over FAQs, services, projects and team')
+    parser.add_argument('query')
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--sources', nargs='+', choices=sorted(SOURCES))
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(f'file:{args.db}?mode=ro', uri=True)
+    try:
+        print(json.dumps(search(conn, args.query, args.sources, args.limit), ensure_ascii=False, indent=2))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import hashlib
+import json
+import time
+
+from .core import DB_PATH, connect, quote
+from .migrations import migrate
+from .registry import all_tables, get_tables
+
+# البذر يكتب الفرق فقط: لكل سجل (صف بمفتاحه) بصمة ثابتة لقيمه، تُقارن ببصمة الصف المخزّن حاليًا،
+# ثم أقل مجموعة INSERT/UPDATE/DELETE تجعل الجدول مطابقًا لبيانات البذر. الصف غير المتغير لا يُلمس،
+# فلا تعمل مشغّلاته ولا يتغير إصدار جدوله (ETag، الكاش، سجل التغييرات) ولا يكبر WAL.
+# البصمة تُحسب من الصف المخزّن نفسه لا من جدول بصمات جانبي، فالتعديل من لوحة الإدارة يُكتشف ويُعاد
+
+
+def canonical(value):
+    # القيمة كما يقارنها SQLite: True تُخزَّن 1، و4900 في عمود REAL تُقرأ 4900.0، فلا يُعد أي منهما تغييرًا
+    if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+        value = int(value)
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def row_hash(values):
+    return hashlib.sha256('\x1f'.join(canonical(value) for value in values).encode()).hexdigest()
+
+
+class TableDiff:
+    def __init__(self, table, full=False):
+        self.table = table
+        self.full = full  # كل الصفوف أُعيدت كتابتها (--full)
+        self.inserts = []  # صفوف كاملة
+        self.updates = []  # (المفتاح، {العمود: (القديم، الجديد)})
+        self.deletes = []  # مفاتيح
+        self.unchanged = 0
+
+    @property
+    def changed(self):
+        return bool(self.inserts or self.updates or self.deletes)
+
+    def summary(self):
+        if self.full:
+            return f'{len(self.inserts)} rows rewritten'
+        return f'+{len(self.inserts)} ~{len(self.updates)} -{len(self.deletes)} ({self.unchanged} unchanged)'
+
+
+def diff_table(conn, table):
+    diff = TableDiff(table)
+    key = table.columns.index(table.key)
+    cols = ', '.join(quote(c) for c in table.columns)
+    current = {row[key]: row for row in conn.execute(f'SELECT {cols} FROM {quote(table.name)}')}
+    for row in table.rows:
+        row = tuple(row)
+        old = current.pop(row[key], None)
+        if old is None:
+            diff.inserts.append(row)
+        elif row_hash(old) == row_hash(row):
+            diff.unchanged += 1
+        else:
+            diff.updates.append((row[key], {
+                column: (before, after)
+                for column, before, after in zip(table.columns, old, row) if canonical(before) != canonical(after)
+            }))
+    diff.deletes = list(current)
+    return diff
+
+
+def apply_diff(conn, diff):
+    table = diff.table
+    name = quote(table.name)
+    where = f'WHERE {quote(table.key)} = ?'
+    if diff.deletes:
+        conn.executemany(f'DELETE FROM {name} {where}', [(key,) for key in diff.deletes])
+    for key, changes in diff.updates:
+        # الأعمدة المتغيرة فقط: مشغّلات AFTER UPDATE OF <عمود> (الجداول المطبّعة) لا تعمل بلا داعٍ
+        assignments = ', '.join(f'{quote(column)} = ?' for column in changes)
+        conn.execute(f'UPDATE {name} SET {assignments} {where}', [after for _, after in changes.values()] + [key])
+    if diff.inserts:
+        conn.executemany(table.insert_sql, diff.inserts)
+
+
+def seed_tables(conn, tables, full=False, dry_run=False):
+    # المخطط والفهارس تملكها الترحيلات؛ هنا نطابق البيانات فقط داخل معاملة مفتوحة مسبقًا
+    # جداول بيانات المستخدمين (طلبات/رسائل) لا تُمس. full=True يعيد كتابة كل الصفوف كما كان سابقًا
+    migrate(conn)
+    diffs = {}
+    for table in tables:
+        if not table.seeded:
+            continue
+        if full:
+            diff = TableDiff(table, full=True)
+            diff.inserts = [tuple(row) for row in table.rows]
+            conn.execute(f'DELETE FROM {quote(table.name)}')
+            if diff.inserts:
+                conn.executemany(table.insert_sql, diff.inserts)
+        else:
+            diff = diff_table(conn, table)
+            if not dry_run:
+                apply_diff(conn, diff)
+        diffs[table.name] = diff
+    return diffs
+
+
+def seed(path=None, tables=None, full=False, dry_run=False):
+    # كل الجداول في معاملة واحدة: إما أن تُبنى القاعدة كاملة أو لا يتغير شيء.
+    # التشغيل التجريبي يحسب الفرق ثم يتراجع (قد تكون الترحيلات طُبّقت داخله أيضًا)
+    conn = connect(path)
+    try:
+        conn.execute('BEGIN EXCLUSIVE')
+        try:
+            diffs = seed_tables(conn, tables if tables is not None else all_tables(), full, dry_run)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('ROLLBACK' if dry_run else 'COMMIT')
+        return diffs
+    finally:
+        conn.close()
+
+
+def shorten(value, width=60):
+    text = json.dumps(value, ensure_ascii=False) if not isinstance(value, str) else value
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def print_diff(diff):
+    for row in diff.inserts:
+        print(f'    + {diff.table.key}={row[diff.table.columns.index(diff.table.key)]!r}')
+    for key, changes in diff.updates:
+        print(f'    ~ {diff.table.key}={key!r}')
+        for column, (before, after) in changes.items():
+            print(f'        {column}: {shorten(before)} → {shorten(after)}')
+    for key in diff.deletes:
+        print(f'    - {diff.table.key}={key!r}')
+
+
+def main(tables=None, argv=None):
+    parser = argparse.ArgumentParser(description='Bring projects.db in line with the seed data in database/')
+    parser.add_argument('--db', default=str(DB_PATH), help='database file (default: the one server.js uses)')
+    if tables is None:
+        parser.add_argument('--only', nargs='+', metavar='TABLE', help='seed only these tables')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true', help='print the rows that would change, write nothing')
+    mode.add_argument('--full', action='store_true', help='rewrite every row instead of only the changed ones')
+    args = parser.parse_args(argv)
+
+    if tables is None:
+        tables = get_tables(args.only)
+    started = time.perf_counter()
+    diffs = seed(args.db, tables, args.full, args.dry_run)
+    elapsed = time.perf_counter() - started
+    for name, diff in diffs.items():
+        print(f'  {name}: {diff.summary()}')
+        if args.dry_run:
+            print_diff(diff)
+    changed = sum(diff.changed for diff in diffs.values())
+    if args.dry_run:
+        print(f'✅ dry run: {changed} of {len(diffs)} tables would change in {args.db} ({elapsed * 1000:.1f} ms)')
+    else:
+        print(f'✅ {changed} of {len(diffs)} tables changed in {args.db} in {elapsed * 1000:.1f} ms')
+    return diffs
@@ -1,15 +1,9 @@
-import sqlite3
 import json
 
-# الاتصال أو إنشاء قاعدة البيانات
-conn = sqlite3.connect("projects.db")
-cursor = conn.cursor()
+from .core import Table
 
-# حذف الجدول إذا كان موجودًا مسبقًا (اختياري لإعادة التشغيل)
-cursor.execute("DROP TABLE IF EXISTS services")
-
-# إنشاء جدول الخدمات
-cursor.execute('''
+# جدول الخدمات
+SCHEMA = '''
     CREATE TABLE services (
         id INTEGER PRIMARY KEY,
         title TEXT,
@@ -23,7 +17,12 @@ cursor.execute('''
         is_active BOOLEAN,
         display_order INTEGER
     )
-''')
+'''
+
+COLUMNS = (
+    'id', 'title', 'description', 'short_description', 'icon', 'image', 'features', 'benefits', 'category',
+    'is_active', 'display_order'
+)
 
 # بيانات الإدخال
 services = [
@@ -96,13 +95,8 @@ services = [
     }
 ]
 
-# إدخال البيانات
-for service in services:
-    cursor.execute('''
-        INSERT INTO services (
-            id, title, description, short_description, icon, image, features, benefits, category, is_active, display_order
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+def row(service):
+    return (
         service['id'],
         service['title'],
         service['description'],
@@ -114,9 +108,13 @@ for service in services:
         service['category'],
         int(service['isActive']),
         service['order']
-    ))
+    )
+
+
+TABLES = [Table('services', SCHEMA, COLUMNS, [row(service) for service in services])]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء جدول الخدمات وإدخال البيانات بنجاح.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول الخدمات وإدخال البيانات بنجاح.")
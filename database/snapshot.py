@@ -0,0 +1,318 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from . import versions
+from .core import DB_PATH, ROOT_DIR, transaction
+
+# لقطات متسقة لقاعدة حية عبر SQLite backup API: ننسخ عددًا محدودًا من الصفحات في كل خطوة
+# ونترك القفل بين الخطوات، فلا يُحجب الكاتب (server.js) إلا لمدة خطوة واحدة على الأكثر.
+# إن كتب اتصال آخر أثناء النسخ يعيد SQLite النسخ من البداية، فاللقطة دائمًا لحظة واحدة متسقة
+#
+# الاستعادة الافتراضية تتم أيضًا بالـ backup API لكن في خطوة واحدة داخل القاعدة الحية: كل الاتصالات
+# (ومنها server.js) ترى القاعدة القديمة أو الجديدة كاملة، ولا يبقى WAL قديم يُطبّق على ملف جديد.
+# --replace-file يستبدل الملف نفسه (os.replace) وهو آمن فقط والخادم متوقف
+#
+# في الحالتين لا تعود العدادات إلى الوراء: table_versions تُرفع فوق قيمها الحية (وإلا طابق ETag قديم
+# محتوى مختلفًا)، وchange_log يُعلَّم مقطوعًا حتى آخر seq حي فيتلقى كل مستهلك 410 ويعيد البناء
+
+BACKUP_DIR = ROOT_DIR / 'backups'
+CHUNK = 1 << 20
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def scalar(conn, sql, default=None):
+    try:
+        row = conn.execute(sql).fetchone()
+    except sqlite3.OperationalError:  # الجدول غير موجود (قاعدة لم تُرحَّل)
+        return default
+    return row[0] if row and row[0] is not None else default
+
+
+class WriterProbe(threading.Thread):
+    # يقيس كم ينتظر كاتب آخر أثناء النسخ: BEGIN IMMEDIATE ثم ROLLBACK كل interval (لا يغيّر شيئًا)
+    def __init__(self, path, interval=0.01):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30)
+        try:
+            while not self.stopped.is_set():
+                started = time.perf_counter()
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('ROLLBACK')
+                self.samples.append(time.perf_counter() - started)
+                self.stopped.wait(self.interval)
+        finally:
+            conn.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'samples': 0}
+        return {
+            'samples': len(ordered),
+            'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+            'max_ms': round(ordered[-1] * 1000, 3),
+        }
+
+
+class TooManyRestarts(Exception):
+    pass
+
+
+def backup(src, dst, pages=256, sleep=0.005, max_restarts=3):
+    # يعيد إحصاءات النسخ؛ زيادة remaining بين خطوتين تعني أن كاتبًا غيّر المصدر فأُعيد النسخ.
+    # تحت كتابة مستمرة قد لا ينتهي النسخ المتدرج أبدًا، فبعد max_restarts ننسخ الباقي في خطوة واحدة
+    # (في وضع WAL تحجز الخطوة معاملة قراءة فقط فلا تحجب الكتّاب)
+    stats = {'steps': 0, 'restarts': 0, 'max_step_ms': 0.0, 'single_step_fallback': False}
+    state = {'mark': time.perf_counter(), 'remaining': None}
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        stats['steps'] += 1
+        stats['max_step_ms'] = max(stats['max_step_ms'], (now - state['mark']) * 1000)
+        if state['remaining'] is not None and remaining > state['remaining']:
+            stats['restarts'] += 1
+            if stats['restarts'] > max_restarts:
+                raise TooManyRestarts()
+        state['remaining'] = remaining
+        stats['pages'] = total
+        state['mark'] = now + sleep  # الخطوة التالية تبدأ بعد النوم
+
+    started = time.perf_counter()
+    try:
+        src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+    except TooManyRestarts:
+        stats['single_step_fallback'] = True
+        step = time.perf_counter()
+        src.backup(dst)
+        stats['steps'] += 1
+        stats['max_step_ms'] = max(stats['max_step_ms'], (time.perf_counter() - step) * 1000)
+    stats['seconds'] = time.perf_counter() - started
+    stats['max_step_ms'] = round(stats['max_step_ms'], 3)
+    return stats
+
+
+def create(path=None, out_dir=None, pages=256, sleep=0.005, probe=False, check=True, max_restarts=3):
+    source = Path(path or DB_PATH)
+    out_dir = Path(out_dir or BACKUP_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    created = datetime.datetime.now(datetime.timezone.utc)
+    target = out_dir / f'{source.stem}-{created.strftime("%Y%m%dT%H%M%S%fZ")}.db'
+    tmp = target.with_name(target.name + '.tmp')
+
+    writer_probe = WriterProbe(source) if probe else None
+    src = sqlite3.connect(f'file:{source}?mode=ro', uri=True)
+    dst = sqlite3.connect(str(tmp))
+    try:
+        if writer_probe:
+            writer_probe.start()
+        stats = backup(src, dst, pages, sleep, max_restarts)
+        if writer_probe:
+            stats['writer_wait'] = writer_probe.stop()
+        dst.execute('PRAGMA journal_mode = DELETE')  # ملف واحد مكتفٍ بذاته، بلا -wal/-shm
+        integrity = dst.execute('PRAGMA quick_check').fetchone()[0] if check else 'skipped'
+        if integrity not in ('ok', 'skipped'):
+            raise RuntimeError(f'snapshot failed quick_check: {integrity}')
+        meta = {
+            'page_size': dst.execute('PRAGMA page_size').fetchone()[0],
+            'schema_version': scalar(dst, 'SELECT MAX(version) FROM schema_migrations', 0),
+            # آخر تغيير في change_log داخل اللقطة: نقطة الزمن التي تمثلها
+            'change_seq': scalar(dst, "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'", 0),
+        }
+    finally:
+        dst.close()
+        src.close()
+        if writer_probe and writer_probe.is_alive():
+            writer_probe.stop()
+
+    fsync_path(tmp)
+    size = tmp.stat().st_size
+    manifest = {
+        'file': target.name,
+        'source': str(source),
+        'created_at': created.isoformat(timespec='milliseconds'),
+        'sha256': sha256_file(tmp),
+        'bytes': size,
+        'integrity': integrity,
+        **meta,
+        'backup': {
+            **stats,
+            'seconds': round(stats['seconds'], 3),
+            'mb_per_s': round(size / (1 << 20) / stats['seconds'], 1) if stats['seconds'] else None,
+            'pages_per_step': pages,
+            'sleep_ms': sleep * 1000,
+        },
+    }
+    os.replace(tmp, target)
+    target.with_suffix('.json').write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    return target, manifest
+
+
+def load_manifest(snapshot):
+    return json.loads(Path(snapshot).with_suffix('.json').read_text(encoding='utf-8'))
+
+
+def verify(snapshot):
+    manifest = load_manifest(snapshot)
+    actual = sha256_file(snapshot)
+    if actual != manifest['sha256']:
+        raise RuntimeError(f'{snapshot}: checksum mismatch ({actual} != {manifest["sha256"]})')
+    return manifest
+
+
+def live_counters(path):
+    # إصدارات الجداول وآخر seq في القاعدة التي ستُستبدل (فارغة إن لم توجد أو لم تُرحَّل)
+    if not Path(path).exists():
+        return {}, 0
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        try:
+            table_versions = dict(conn.execute('SELECT name, version FROM table_versions'))
+        except sqlite3.OperationalError:
+            table_versions = {}
+        head = max(
+            scalar(conn, "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'", 0),
+            scalar(conn, "SELECT value FROM change_log_state WHERE name = 'truncated_through'", 0),
+        )
+    finally:
+        conn.close()
+    return table_versions, head
+
+
+def carry_forward(conn, table_versions, head):
+    # يطبَّق على النسخة المؤقتة قبل أن تحل محل القاعدة، فلا يرى أحد العدادات القديمة
+    with transaction(conn):
+        if scalar(conn, 'SELECT COUNT(*) FROM table_versions', None) is None:
+            table_versions = {}  # لقطة من قبل الترحيل 7
+        for name, version in table_versions.items():
+            conn.execute(
+                f'UPDATE table_versions SET version = MAX(version, ?) + 1, updated_at = {versions.NOW} WHERE name = ?',
+                (version, name),
+            )
+        if head and scalar(conn, 'SELECT COUNT(*) FROM change_log_state', None) is not None:
+            through = head + 1  # أي مؤشر حي (حتى head نفسه) أصغر منه فيُجاب 410
+            conn.execute('DELETE FROM change_log WHERE seq <= ?', (through,))
+            conn.execute("UPDATE change_log_state SET value = MAX(value, ?) WHERE name = 'truncated_through'", (through,))
+            if conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'change_log'", (through,)).rowcount == 0:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (through,))
+
+
+def restore(snapshot, path=None, replace_file=False):
+    snapshot = Path(snapshot)
+    target = Path(path or DB_PATH)
+    manifest = verify(snapshot)
+    started = time.perf_counter()
+    # نعمل على نسخة بجانب الهدف: اللقطة نفسها تبقى مطابقة لـ sha256
+    tmp = target.with_name(target.name + '.restore-tmp')
+    with open(snapshot, 'rb') as src, open(tmp, 'wb') as dst:
+        for block in iter(lambda: src.read(CHUNK), b''):
+            dst.write(block)
+    try:
+        conn = sqlite3.connect(str(tmp), isolation_level=None)
+        try:
+            carry_forward(conn, *live_counters(target))
+        finally:
+            conn.close()
+        if replace_file:
+            # الخادم متوقف: os.replace ثم حذف WAL/SHM القديمين
+            fsync_path(tmp)
+            if target.exists():
+                old = sqlite3.connect(str(target), isolation_level=None)
+                old.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                old.close()
+            os.replace(tmp, target)
+            for suffix in ('-wal', '-shm'):
+                Path(str(target) + suffix).unlink(missing_ok=True)
+        else:
+            src = sqlite3.connect(f'file:{tmp}?mode=ro', uri=True)
+            dst = sqlite3.connect(str(target), timeout=30)
+            try:
+                src.backup(dst)  # خطوة واحدة: القاعدة الحية تتبدل كاملة تحت قفل الكتابة
+            finally:
+                dst.close()
+                src.close()
+    finally:
+        tmp.unlink(missing_ok=True)
+    return manifest, time.perf_counter() - started
+
+
+def list_snapshots(out_dir=None):
+    return sorted(Path(out_dir or BACKUP_DIR).glob('*.json'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Online snapshots and restores of projects.db (SQLite backup API)')
+    parser.add_argument('--db', default=str(DB_PATH), help='database to snapshot or restore into (create, restore)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    create_cmd = sub.add_parser('create', help='take a consistent snapshot of the live database')
+    create_cmd.add_argument('--out', default=str(BACKUP_DIR))
+    create_cmd.add_argument('--pages', type=int, default=256, help='pages copied per step (-1: all at once)')
+    create_cmd.add_argument('--sleep-ms', type=float, default=5, help='pause between steps, writers run here')
+    create_cmd.add_argument('--max-restarts', type=int, default=3,
+                            help='restarts caused by writers before copying the rest in one step')
+    create_cmd.add_argument('--probe', action='store_true', help='measure how long a writer waits during the copy')
+    create_cmd.add_argument('--no-check', action='store_true', help='skip PRAGMA quick_check on the snapshot')
+    list_cmd = sub.add_parser('list', help='list snapshots')
+    list_cmd.add_argument('--out', default=str(BACKUP_DIR))
+    verify_cmd = sub.add_parser('verify', help='check a snapshot against its sha256')
+    verify_cmd.add_argument('snapshot')
+    restore_cmd = sub.add_parser('restore', help='restore a snapshot into the database')
+    restore_cmd.add_argument('snapshot')
+    restore_cmd.add_argument('--replace-file', action='store_true', help='swap the file itself (server stopped)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'create':
+        target, manifest = create(
+            args.db, args.out, args.pages, args.sleep_ms / 1000, args.probe, not args.no_check, args.max_restarts
+        )
+        stats = manifest['backup']
+        print(f'✅ {target} ({manifest["bytes"]} bytes, sha256 {manifest["sha256"][:16]}…)')
+        print(f'   {stats["pages"]} pages in {stats["steps"]} steps, {stats["seconds"]}s ({stats["mb_per_s"]} MB/s), '
+              f'longest step {stats["max_step_ms"]}ms, restarts {stats["restarts"]}'
+              + (' (finished in one step)' if stats['single_step_fallback'] else ''))
+        if 'writer_wait' in stats:
+            print(f'   writer wait: {stats["writer_wait"]}')
+    elif args.command == 'list':
+        for path in list_snapshots(args.out):
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+            print(f'{manifest["file"]}  {manifest["created_at"]}  {manifest["bytes"]:>10} bytes  '
+                  f'schema {manifest["schema_version"]}  change_seq {manifest["change_seq"]}')
+    elif args.command == 'verify':
+        manifest = verify(args.snapshot)
+        print(f'✅ {args.snapshot} matches sha256 {manifest["sha256"][:16]}…')
+    else:
+        manifest, seconds = restore(args.snapshot, args.db, args.replace_file)
+        print(f'✅ {manifest["file"]} restored into {args.db} in {seconds * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
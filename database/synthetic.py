@@ -0,0 +1,270 @@
+import argparse
+import datetime
+import json
+import random
+import re
+import time
+import zlib
+from pathlib import Path
+
+from . import faq_categories, projects, reviews, servise, team_members
+from .bulk import load
+from .core import DB_PATH
+
+# مولّد بيانات اصطناعية حتمية لاختبارات السعة: نفس البذرة = نفس الصفوف دائمًا
+# كل جدول مولّد (generator) يُنتج سجلًا واحدًا في كل مرة، فالذاكرة ثابتة مهما كبر العدد
+
+CITIES = ['الرياض', 'جدة', 'الدمام', 'مكة المكرمة', 'المدينة المنورة', 'الخبر', 'أبها', 'تبوك']
+PROJECT_CATEGORIES = ['commercial', 'residential', 'industrial']
+PROJECT_STATUSES = ['completed', 'in-progress', 'planned']
+SERVICE_ICONS = ['Building', 'Home', 'Factory', 'Wrench', 'Truck', 'Hammer']
+PACKAGE_CATEGORIES = ['web_dev', 'ecommerce', 'design', 'marketing', 'optimization', 'support']
+FIRST_NAMES = ['عبدالله', 'أحمد', 'محمد', 'فاطمة', 'سارة', 'خالد', 'نورة', 'يوسف', 'ريم', 'عمر', 'ليلى', 'فهد']
+LAST_NAMES = ['المحمود', 'العمري', 'الزهراء', 'القحطاني', 'الغامدي', 'الحربي', 'الشهري', 'العتيبي', 'الدوسري']
+ICON_HTML = '''
+<div className="w-14 h-14 bg-gradient-to-br from-{color}-500 to-{color}-600 rounded-xl flex items-center justify-center mb-6">
+    <{icon} className="w-7 h-7 text-white" />
+</div>
+'''
+
+_words = None
+
+
+def words():
+    # مفردات عربية حقيقية مأخوذة من نصوص البذر نفسها
+    global _words
+    if _words is None:
+        texts = [p['description'] for p in projects.projects]
+        texts += [s['description'] for s in servise.services]
+        texts += [f['answer'] for f in faq_categories.faqs]
+        texts += [m['bio'] for m in team_members.team_members]
+        texts += [r['bio'] for r in reviews.reviews_data]
+        found = re.findall(r'[ء-ي]{2,}', ' '.join(texts))
+        _words = sorted(set(found))
+    return _words
+
+
+def text(rng, low, high, end='.'):
+    pool = words()
+    return ' '.join(rng.choice(pool) for _ in range(rng.randint(low, high))) + end
+
+
+def phrases(rng, low, high):
+    return [text(rng, 2, 6, end='') for _ in range(rng.randint(low, high))]
+
+
+def person(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def date(rng, start=2018, end=2026):
+    day = datetime.date(start, 1, 1) + datetime.timedelta(days=rng.randint(0, (end - start) * 365))
+    return day.isoformat()
+
+
+def display_order(rng, i):
+    # معظم الصفوف مرتبة تسلسليًا، وبعضها بلا ترتيب (NULL) كما يسمح server.js
+    return None if rng.random() < 0.05 else i
+
+
+def gen_projects(rng, count, start=1):
+    for i in range(start, start + count):
+        status = rng.choices(PROJECT_STATUSES, weights=[6, 3, 1])[0]
+        begin = date(rng, 2015, 2024)
+        yield {
+            'id': str(i),
+            'title': text(rng, 2, 5, end=''),
+            'description': text(rng, 15, 40),
+            'category': rng.choice(PROJECT_CATEGORIES),
+            'status': status,
+            'completion': 100 if status == 'completed' else rng.randint(0, 95),
+            'value': f'{rng.randint(5, 300)} مليون دولار',
+            'duration': f'{rng.randint(6, 48)} شهراً',
+            'location': f'{rng.choice(CITIES)}، المملكة العربية السعودية',
+            'client': 'شركة ' + text(rng, 1, 3, end=''),
+            'image': f'/uploads/projects/{i}.jpg',
+            'startDate': begin,
+            'endDate': date(rng, int(begin[:4]), 2027),
+        }
+
+
+def gen_services(rng, count, start=1):
+    for i in range(start, start + count):
+        yield {
+            'id': i,
+            'title': text(rng, 2, 4, end=''),
+            'description': text(rng, 15, 35),
+            'short_description': text(rng, 3, 6, end=''),
+            'icon': rng.choice(SERVICE_ICONS),
+            'image': f'/uploads/projects/service_{i}.jpg',
+            'features': phrases(rng, 3, 8),
+            'benefits': phrases(rng, 3, 6),
+            'category': 'construction',
+            'is_active': rng.random() < 0.9,
+            'display_order': display_order(rng, i),
+        }
+
+
+def gen_packages(rng, count, start=1):
+    for i in range(start, start + count):
+        yield {
+            'id': i,
+            'title': 'الباقة ' + text(rng, 1, 2, end=''),
+            'description': text(rng, 5, 15),
+            'price': rng.choice([None, rng.randrange(500, 10000, 100)]),
+            'delivery_time': f'{rng.randint(1, 4)}-{rng.randint(5, 8)} أسابيع',
+            'features': phrases(rng, 4, 10),
+            'category': rng.choice(PACKAGE_CATEGORIES),
+            'is_active': rng.random() < 0.9,
+            'display_order': display_order(rng, i),
+        }
+
+
+def gen_packages_server(rng, count, start=1):
+    colors = ['amber', 'purple', 'green', 'blue']
+    for record in gen_packages(rng, count, start):
+        record['icon_html'] = ICON_HTML.format(color=rng.choice(colors), icon=rng.choice(SERVICE_ICONS))
+        yield record
+
+
+def gen_people(rng, count, start, order_column):
+    for i in range(start, start + count):
+        yield {
+            'id': str(i),
+            'name': person(rng),
+            'position': text(rng, 2, 4, end=''),
+            'department': text(rng, 2, 5, end=''),
+            'bio': text(rng, 25, 60),
+            'email': f'user{i}@example.com',
+            'phone': f'+9665{rng.randint(0, 99999999):08d}',
+            'linkedin': f'https://www.linkedin.com/in/user-{i}',
+            'image': f'/uploads/{i}.jpg',
+            'experience': f'{rng.randint(1, 25)} سنوات',
+            'specialty': text(rng, 4, 12, end=''),
+            'isActive': int(rng.random() < 0.85),
+            order_column: i,
+            'joinDate': date(rng),
+        }
+
+
+def gen_team_members(rng, count, start=1):
+    for record in gen_people(rng, count, start, 'order'):
+        record['achievements'] = phrases(rng, 2, 5)
+        record['skills'] = phrases(rng, 2, 6)
+        yield record
+
+
+def gen_reviews(rng, count, start=1):
+    # في جدول reviews الحقلان نص مفصول بفواصل وليس JSON
+    for record in gen_people(rng, count, start, 'ordering'):
+        record['achievements'] = ', '.join(phrases(rng, 1, 3))
+        record['skills'] = ', '.join(phrases(rng, 2, 4))
+        yield record
+
+
+def gen_faq_categories(rng, count, start=1):
+    for category in faq_categories.faq_categories[:count]:
+        yield dict(category)
+    for i in range(len(faq_categories.faq_categories), count):
+        yield {'key': f'category_{i}', 'label': text(rng, 1, 3, end='')}
+
+
+def gen_faqs(rng, count, start=1):
+    # توزيع غير متساوٍ على التصنيفات الحقيقية (عام هو الأكثر)
+    keys = [c['key'] for c in faq_categories.faq_categories if c['key'] != 'all']
+    weights = [len(keys) - n for n in range(len(keys))]
+    for i in range(start, start + count):
+        yield {
+            'id': i,
+            'category': rng.choices(keys, weights=weights)[0],
+            'question': text(rng, 6, 16, end='؟'),
+            'answer': text(rng, 25, 80),
+        }
+
+
+def gen_contact_requests(rng, count, start=1):
+    reasons = ['استفسار عام', 'طلب عرض سعر', 'دعم فني', 'سبب آخر']
+    for i in range(start, start + count):
+        reason = rng.choice(reasons)
+        yield {
+            'id': i,
+            'name': person(rng),
+            'reason': reason,
+            'other_reason': text(rng, 2, 6, end='') if reason == 'سبب آخر' else None,
+            'message': text(rng, 10, 50),
+            'phone': f'+9665{rng.randint(0, 99999999):08d}',
+            'email': f'contact{i}@example.com',
+        }
+
+
+def gen_project_requests(rng, count, start=1):
+    for i in range(start, start + count):
+        yield {
+            'id': i,
+            'name': person(rng),
+            'company_name': 'شركة ' + text(rng, 1, 3, end=''),
+            'requested_services': [s['title'] for s in rng.sample(servise.services, rng.randint(1, 3))],
+            'phone': f'+9665{rng.randint(0, 99999999):08d}',
+            'email': f'request{i}@example.com',
+        }
+
+
+GENERATORS = {
+    'projects': gen_projects,
+    'services': gen_services,
+    'packages': gen_packages,
+    'packages_server': gen_packages_server,
+    'reviews': gen_reviews,
+    'team_members': gen_team_members,
+    'faq_categories': gen_faq_categories,
+    'faqs': gen_faqs,
+    'contact_requests': gen_contact_requests,
+    'project_requests': gen_project_requests,
+}
+
+
+def generate(table, count, seed=0, start=1):
+    # بذرة مستقلة لكل جدول حتى لا يتأثر جدول بعدد صفوف جدول آخر
+    rng = random.Random(seed * 1000003 + zlib.crc32(table.encode()))
+    return GENERATORS[table](rng, count, start)
+
+
+def write_jsonl(records, path):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate deterministic synthetic rows for projects.db tables')
+    parser.add_argument('--rows', type=int, default=10000, help='rows per table')
+    parser.add_argument('--tables', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--db', help=f'load straight into this database (e.g. {DB_PATH})')
+    target.add_argument('--jsonl', metavar='DIR', help='write one <table>.jsonl fixture per table')
+    args = parser.parse_args(argv)
+
+    if not args.db and not args.jsonl:
+        parser.error('one of --db or --jsonl is required')
+    for table in args.tables:
+        # التصنيفات محدودة بطبيعتها؛ لا معنى لملايين التصنيفات
+        count = min(args.rows, 50) if table == 'faq_categories' else args.rows
+        records = generate(table, count, args.seed)
+        started = time.perf_counter()
+        if args.db:
+            stats = load(records, table, args.db, args.batch_size, truncate=True)
+            print(f'✅ {table}: {stats.rows} rows ({stats.rows_per_sec:,.0f} rows/s)')
+        else:
+            Path(args.jsonl).mkdir(parents=True, exist_ok=True)
+            written = write_jsonl(records, Path(args.jsonl) / f'{table}.jsonl')
+            print(f'✅ {table}: {written} rows in {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
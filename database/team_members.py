@@ -1,13 +1,10 @@
-import sqlite3
 import json
 
-# فتح أو إنشاء قاعدة البيانات
-conn = sqlite3.connect('../projects.db')
-cursor = conn.cursor()
+from .core import Table
 
-# إنشاء جدول الفريق
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS team_members (
+# جدول الفريق
+SCHEMA = '''
+CREATE TABLE team_members (
     id TEXT PRIMARY KEY,
     name TEXT NOT NULL,
     position TEXT,
@@ -25,7 +22,13 @@ CREATE TABLE IF NOT EXISTS team_members (
     "order" INTEGER,
     joinDate TEXT
 )
-''')
+'''
+
+COLUMNS = (
+    'id', 'name', 'position', 'department', 'bio', 'email', 'phone', 'linkedin',
+    'image', 'experience', 'specialty', 'achievements', 'skills',
+    'isActive', 'order', 'joinDate'
+)
 
 # البيانات (منسقة ومطابقة لما أرسلته حرفياً)
 team_members = [
@@ -119,15 +122,8 @@ team_members = [
 ]
 
 
-# إدخال البيانات إلى الجدول
-for member in team_members:
-    cursor.execute('''
-    INSERT OR REPLACE INTO team_members (
-        id, name, position, department, bio, email, phone, linkedin,
-        image, experience, specialty, achievements, skills,
-        isActive, "order", joinDate
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+def row(member):
+    return (
         member['id'],
         member['name'],
         member['position'],
@@ -144,9 +140,13 @@ for member in team_members:
         int(member['isActive']),
         member['order'],
         member['joinDate']
-    ))
+    )
+
+
+TABLES = [Table('team_members', SCHEMA, COLUMNS, [row(member) for member in team_members])]
 
-conn.commit()
-conn.close()
 
-print("✅ تم إنشاء جدول الفريق وإدخال البيانات بنجاح.")
+if __name__ == '__main__':
+    from .seed import main
+    main(TABLES)
+    print("✅ تم إنشاء جدول الفريق وإدخال البيانات بنجاح.")
@@ -0,0 +1,39 @@
+from .core import quote
+
+# عدّاد إصدار لكل جدول عام تزيده المشغّلات مع كل إدخال/تعديل/حذف، أيًّا كان الكاتب
+# (server.js أو سكربتات بايثون). server.js يشتق منه ETag و Last-Modified للطلبات الشرطية
+TABLES = [
+    'packages', 'packages_server', 'services', 'reviews', 'team_members', 'faqs', 'faq_categories', 'projects',
+]
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL  -- ISO-8601 UTC لآخر تغيير
+    )
+'''
+
+NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+
+def table_statements(table):
+    bump = f"UPDATE table_versions SET version = version + 1, updated_at = {NOW} WHERE name = '{table}';"
+    statements = [
+        f"INSERT OR IGNORE INTO table_versions (name, version, updated_at) VALUES ('{table}', 1, {NOW})",
+    ]
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        statements.append(
+            f'CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} AFTER {event} ON {quote(table)} '
+            f'BEGIN {bump} END'
+        )
+    return statements
+
+
+def statements():
+    return [SCHEMA] + [sql for table in TABLES for sql in table_statements(table)]
+
+
+def versions(conn, tables=None):
+    rows = conn.execute('SELECT name, version, updated_at FROM table_versions').fetchall()
+    return {name: (version, updated_at) for name, version, updated_at in rows if tables is None or name in tables}
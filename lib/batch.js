@@ -0,0 +1,132 @@
+// Batch mutations: many create/update/delete operations on one resource in a single transaction.
+//
+// A batch spec describes one resource:
+//   table         - target table
+//   insert        - INSERT statement, params from createParams(data, id)
+//   update        - UPDATE ... WHERE id = ?, params from updateParams(data, id)
+//   remove        - DELETE ... WHERE id = ?
+//   reorder       - UPDATE <table> SET <order column> = ? WHERE id = ?
+//   newId         - optional () => id for tables whose ids are not assigned by SQLite
+//
+// The request body is { operations: [...] } where each operation is one of
+//   { op: 'create', data }  { op: 'update', id, data }  { op: 'delete', id }  { op: 'reorder', ids }
+// reorder gives the listed ids positions 1..n in that order. Every operation gets a result
+// ({ index, op, status, id?, error? }, statuses as the single-row routes would answer). A failed
+// operation does not stop the others unless the batch is sent with ?atomic=true, in which case
+// any failure rolls the whole batch back and the response is 409.
+
+export const MAX_OPERATIONS = 1000;
+
+export class BatchError extends Error {}
+
+const hasId = (id) => (typeof id === 'string' && id !== '') || Number.isInteger(id);
+const isObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+export function parseOperations(body) {
+    const operations = body?.operations;
+    if (!Array.isArray(operations) || operations.length === 0) {
+        throw new BatchError('operations must be a non-empty array');
+    }
+    if (operations.length > MAX_OPERATIONS) throw new BatchError(`At most ${MAX_OPERATIONS} operations per batch`);
+    operations.forEach((operation, index) => {
+        const fail = (message) => { throw new BatchError(`operations[${index}]: ${message}`); };
+        if (!isObject(operation)) fail('must be an object');
+        switch (operation.op) {
+            case 'create':
+                if (!isObject(operation.data)) fail('data must be an object');
+                break;
+            case 'update':
+                if (!hasId(operation.id)) fail('id is required');
+                if (!isObject(operation.data)) fail('data must be an object');
+                break;
+            case 'delete':
+                if (!hasId(operation.id)) fail('id is required');
+                break;
+            case 'reorder':
+                if (!Array.isArray(operation.ids) || !operation.ids.every(hasId)) fail('ids must be an array of ids');
+                if (new Set(operation.ids.map(String)).size !== operation.ids.length) fail('ids must not repeat');
+                break;
+            default:
+                fail(`unknown op ${JSON.stringify(operation.op)}`);
+        }
+    });
+    return operations;
+}
+
+// Runs one operation inside the transaction and reports its result
+function runOperation(tx, spec, operation, index, callback) {
+    const result = { index, op: operation.op };
+    const failed = (err) => callback({ ...result, status: 500, error: err.message });
+    switch (operation.op) {
+        case 'create': {
+            const id = spec.newId ? spec.newId() : null;
+            return tx.run(spec.insert, spec.createParams(operation.data, id), function (err) {
+                if (err) return failed(err);
+                callback({ ...result, status: 201, id: id ?? this.lastID });
+            });
+        }
+        case 'update':
+            return tx.run(spec.update, spec.updateParams(operation.data, operation.id), function (err) {
+                if (err) return failed(err);
+                callback({ ...result, id: operation.id, status: this.changes ? 200 : 404 });
+            });
+        case 'delete':
+            return tx.run(spec.remove, [operation.id], function (err) {
+                if (err) return failed(err);
+                callback({ ...result, id: operation.id, status: this.changes ? 200 : 404 });
+            });
+        case 'reorder': {
+            const missing = [];
+            const step = (position) => {
+                if (position === operation.ids.length) {
+                    return callback(missing.length
+                        ? { ...result, status: 404, error: 'Unknown ids', missing }
+                        : { ...result, status: 200, updated: operation.ids.length });
+                }
+                const id = operation.ids[position];
+                tx.run(spec.reorder, [position + 1, id], function (err) {
+                    if (err) return failed(err);
+                    if (!this.changes) missing.push(id);
+                    step(position + 1);
+                });
+            };
+            return step(0);
+        }
+    }
+}
+
+export function runBatch(db, spec, operations, { atomic = false } = {}, callback) {
+    let results = [];
+    db.transaction((tx, done) => {
+        results = [];
+        const next = (index) => {
+            if (index === operations.length) {
+                const ok = results.every(r => r.status < 300);
+                return done(atomic && !ok ? new BatchError('Batch rolled back') : null);
+            }
+            runOperation(tx, spec, operations[index], index, (result) => {
+                results.push(result);
+                next(index + 1);
+            });
+        };
+        next(0);
+    }, (err) => {
+        if (err && !(err instanceof BatchError)) return callback(err);
+        callback(null, { committed: !err, results });
+    });
+}
+
+// Express handler for POST /api/<resource>/batch
+export const batchRoute = (db, spec) => (req, res) => {
+    let operations;
+    try {
+        operations = parseOperations(req.body);
+    } catch (err) {
+        if (err instanceof BatchError) return res.status(400).json({ error: err.message });
+        throw err;
+    }
+    runBatch(db, spec, operations, { atomic: req.query.atomic === 'true' }, (err, outcome) => {
+        if (err) return res.status(500).json({ error: err.message });
+        res.status(outcome.committed ? 200 : 409).json(outcome);
+    });
+};
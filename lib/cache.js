@@ -0,0 +1,166 @@
+// Read-through cache for public GET responses.
+//
+// Entries are keyed by path plus sorted query string and tagged with the tables they were built from.
+// Mutation routes invalidate their table before running and again once the response is sent;
+// a per-table version taken at miss time stops a read that overlapped a write from storing stale data.
+// Entries also remember the ETag set by lib/conditional.js, so once table_versions exists a write made
+// outside server.js (e.g. reseeding from Python) turns the next lookup into a miss; without it server.js
+// must be the only writer, or reseeding needs a restart (or cache size 0).
+//
+// `onInvalidate(tables)`, when set, is told about every invalidation that did not come from
+// elsewhere (lib/cluster.js relays them to the other workers).
+//
+// Bodies of at least `compressMinBytes` are sent gzip- or brotli-encoded when the client accepts it;
+// each encoding is produced once per entry and kept alongside the plain body.
+
+import zlib from 'zlib';
+
+export const cacheKey = (req) => {
+    const query = new URLSearchParams(req.originalUrl.split('?')[1] || '');
+    query.sort();
+    const search = query.toString();
+    return search ? `${req.path}?${search}` : req.path;
+};
+
+export class ResponseCache {
+    constructor({ maxEntries = 500, maxBytes = 32 * 1024 * 1024, compressMinBytes = 1024 } = {}) {
+        this.maxEntries = maxEntries;
+        this.maxBytes = maxBytes;
+        this.compressMinBytes = compressMinBytes;
+        this.entries = new Map();   // key -> { body, tables, etag, size, br?, gzip? }, oldest first (LRU)
+        this.byTable = new Map();   // table -> Set of keys
+        this.versions = new Map();  // table -> write counter
+        this.bytes = 0;
+        this.hits = 0;
+        this.misses = 0;
+        this.evictions = 0;
+        this.invalidations = 0;
+        this.compressions = 0;
+        this.onInvalidate = null;
+    }
+
+    version(tables) {
+        return tables.map(t => this.versions.get(t) || 0).join(',');
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return null;
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry;
+    }
+
+    // Returns the stored entry, or null when the body is stale or too large to keep
+    set(key, tables, version, body, etag) {
+        if (this.version(tables) !== version || body.length > this.maxBytes) return null;
+        this.delete(key);
+        const entry = { body, tables, etag, size: body.length };
+        this.entries.set(key, entry);
+        this.bytes += body.length;
+        for (const table of tables) {
+            if (!this.byTable.has(table)) this.byTable.set(table, new Set());
+            this.byTable.get(table).add(key);
+        }
+        this.trim();
+        return entry;
+    }
+
+    trim() {
+        while (this.entries.size > this.maxEntries || this.bytes > this.maxBytes) {
+            this.delete(this.entries.keys().next().value);
+            this.evictions++;
+        }
+    }
+
+    delete(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return;
+        this.entries.delete(key);
+        this.bytes -= entry.size;
+        for (const table of entry.tables) this.byTable.get(table)?.delete(key);
+    }
+
+    invalidate(tables, { remote = false } = {}) {
+        for (const table of tables) {
+            this.versions.set(table, (this.versions.get(table) || 0) + 1);
+            for (const key of this.byTable.get(table) || []) {
+                this.delete(key);
+                this.invalidations++;
+            }
+        }
+        if (!remote && this.onInvalidate) this.onInvalidate(tables);
+    }
+
+    // Plain or encoded body for this client; encodings are computed on first use and kept on the entry
+    send(req, res, entry) {
+        res.type('application/json');
+        if (entry.body.length < this.compressMinBytes) return res.send(entry.body);
+        res.vary('Accept-Encoding');
+        const encoding = req.acceptsEncodings('br', 'gzip', 'identity');
+        if (encoding !== 'br' && encoding !== 'gzip') return res.send(entry.body);
+        if (!entry[encoding]) {
+            entry[encoding] = encoding === 'br'
+                ? zlib.brotliCompressSync(entry.body, { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 5 } })
+                : zlib.gzipSync(entry.body);
+            this.compressions++;
+            if (this.entries.get(cacheKey(req)) === entry) {
+                entry.size += entry[encoding].length;
+                this.bytes += entry[encoding].length;
+                this.trim();
+            }
+        }
+        res.set('Content-Encoding', encoding);
+        return res.send(entry[encoding]);
+    }
+
+    // Middleware for GET routes built from `tables`; caches 200 responses sent with res.json
+    cached(...tables) {
+        return (req, res, next) => {
+            if (this.maxEntries <= 0) return next();
+            const key = cacheKey(req);
+            const etag = res.get('ETag');
+            const hit = this.get(key);
+            if (hit && hit.etag === etag) {
+                this.hits++;
+                res.set('X-Cache', 'HIT');
+                return this.send(req, res, hit);
+            }
+            this.misses++;
+            const version = this.version(tables);
+            const json = res.json.bind(res);
+            res.json = (payload) => {
+                if (res.statusCode !== 200) return json(payload);
+                const body = Buffer.from(JSON.stringify(payload));
+                res.set('X-Cache', 'MISS');
+                return this.send(req, res, this.set(key, tables, version, body, etag) || { body });
+            };
+            next();
+        };
+    }
+
+    // Middleware for POST/PUT/DELETE routes that write `tables`
+    invalidates(...tables) {
+        return (req, res, next) => {
+            this.invalidate(tables);
+            res.on('finish', () => this.invalidate(tables));
+            next();
+        };
+    }
+
+    stats() {
+        const lookups = this.hits + this.misses;
+        return {
+            entries: this.entries.size,
+            bytes: this.bytes,
+            maxEntries: this.maxEntries,
+            maxBytes: this.maxBytes,
+            hits: this.hits,
+            misses: this.misses,
+            hitRate: lookups ? this.hits / lookups : 0,
+            evictions: this.evictions,
+            invalidations: this.invalidations,
+            compressions: this.compressions
+        };
+    }
+}
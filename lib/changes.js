@@ -0,0 +1,196 @@
+// Change feed over the change_log table (database/changes.py, migration 8).
+//
+// GET /api/changes?since=<seq> returns the changes after `since` as { changes, next }. With wait=<s>
+// an empty result is held open until something changes (long-poll); with Accept: text/event-stream
+// the connection stays open and every change is sent as an SSE event whose id is its seq, so
+// EventSource resumes from Last-Event-ID on its own. A `since` older than what retention kept
+// answers 410 with { oldest }: the consumer rebuilds fully and continues from there.
+// A bulk load logs one { op: 'reload', rowId: 0 } per table instead of a change per row (migration 9):
+// the consumer re-reads that whole table.
+//
+// Writers may be other processes, so one shared poll of MAX(seq) every `pollMs` runs while anyone
+// is waiting, and wakes the waiters; each then reads its own range.
+
+export const MAX_LIMIT = 1000;
+export const MAX_WAIT_S = 60;
+
+const LATEST = 'SELECT COALESCE(MAX(seq), 0) AS seq FROM change_log';
+const TRUNCATED = "SELECT value FROM change_log_state WHERE name = 'truncated_through'";
+
+export class ChangeFeedError extends Error {
+    constructor(status, message, extra = {}) {
+        super(message);
+        this.status = status;
+        this.extra = extra;
+    }
+}
+
+const rangeSql = (tables) => 'SELECT seq, tbl, row_id, op, version, changed_at FROM change_log WHERE seq > ?'
+    + (tables.length ? ` AND tbl IN (${tables.map(() => '?').join(', ')})` : '')
+    + ' ORDER BY seq LIMIT ?';
+
+const toChange = (row) => ({
+    seq: row.seq, table: row.tbl, rowId: row.row_id, op: row.op, version: row.version, at: row.changed_at
+});
+
+export class ChangeFeed {
+    constructor(db, { pollMs = 250, heartbeatMs = 15000 } = {}) {
+        this.db = db;
+        this.pollMs = pollMs;
+        this.heartbeatMs = heartbeatMs;
+        this.head = null;
+        this.waiters = new Set();
+        this.timer = null;
+        this.counters = { polls: 0, wakeups: 0, streams: 0 };
+    }
+
+    // SQL run by the feed, for prepared()
+    static statements() {
+        return [LATEST, TRUNCATED, rangeSql([])];
+    }
+
+    // Resolves the current head so the first waiter is not woken by old changes
+    start(callback = () => {}) {
+        this.db.get(LATEST, [], (err, row) => {
+            if (!err) this.head = row.seq;
+            callback(err || null);
+        });
+    }
+
+    subscribe(fn) {
+        this.waiters.add(fn);
+        if (!this.timer) this.timer = setTimeout(() => this.poll(), this.pollMs);
+        return () => this.waiters.delete(fn);
+    }
+
+    poll() {
+        this.timer = null;
+        if (this.waiters.size === 0) return;
+        this.counters.polls++;
+        this.db.get(LATEST, [], (err, row) => {
+            if (!err && row.seq !== this.head) {
+                this.head = row.seq;
+                this.counters.wakeups++;
+                [...this.waiters].forEach(fn => fn(row.seq));
+            }
+            if (this.waiters.size && !this.timer) this.timer = setTimeout(() => this.poll(), this.pollMs);
+        });
+    }
+
+    read(since, { limit, tables }, callback) {
+        this.db.get(TRUNCATED, [], (err, state) => {
+            if (err) return callback(err);
+            if (since < state.value) {
+                return callback(new ChangeFeedError(410, 'Change log truncated, rebuild and resume from oldest', {
+                    oldest: state.value
+                }));
+            }
+            this.db.all(rangeSql(tables), [since, ...tables, limit], (err, rows) => {
+                if (err) return callback(err);
+                const changes = rows.map(toChange);
+                callback(null, { changes, next: changes.length ? changes[changes.length - 1].seq : since });
+            });
+        });
+    }
+
+    static parse(req) {
+        const since = Number(req.get('Last-Event-ID') ?? req.query.since ?? 0);
+        const limit = req.query.limit === undefined ? 500 : Number(req.query.limit);
+        const wait = req.query.wait === undefined ? 0 : Number(req.query.wait);
+        if (!Number.isInteger(since) || since < 0) throw new ChangeFeedError(400, 'since must be a non-negative integer');
+        if (!Number.isInteger(limit) || limit < 1) throw new ChangeFeedError(400, 'limit must be a positive integer');
+        if (!(wait >= 0)) throw new ChangeFeedError(400, 'wait must be a number of seconds');
+        const tables = req.query.tables ? String(req.query.tables).split(',').filter(Boolean) : [];
+        return { since, limit: Math.min(limit, MAX_LIMIT), wait: Math.min(wait, MAX_WAIT_S), tables };
+    }
+
+    // Express handler for GET /api/changes
+    route() {
+        return (req, res) => {
+            let options;
+            try {
+                options = ChangeFeed.parse(req);
+            } catch (err) {
+                return res.status(err.status).json({ error: err.message });
+            }
+            if (req.accepts(['json', 'text/event-stream']) === 'text/event-stream') return this.stream(req, res, options);
+            this.longPoll(req, res, options);
+        };
+    }
+
+    fail(res, err) {
+        if (err instanceof ChangeFeedError) return res.status(err.status).json({ error: err.message, ...err.extra });
+        res.status(500).json({ error: err.message });
+    }
+
+    longPoll(req, res, { since, limit, wait, tables }) {
+        let unsubscribe = null;
+        let timer = null;
+        const finish = (err, body) => {
+            if (unsubscribe) unsubscribe();
+            clearTimeout(timer);
+            if (res.headersSent || res.destroyed) return;
+            if (err) return this.fail(res, err);
+            res.set('Cache-Control', 'no-store').json(body);
+        };
+        // Subscribe before the first read so a change landing in between still wakes this request
+        if (wait > 0) {
+            unsubscribe = this.subscribe(() => this.read(since, { limit, tables }, (err, body) => {
+                if (err || body.changes.length) finish(err, body);
+            }));
+            timer = setTimeout(() => this.read(since, { limit, tables }, finish), wait * 1000);
+            res.on('close', () => finish());
+        }
+        this.read(since, { limit, tables }, (err, body) => {
+            if (err || body.changes.length || wait === 0) finish(err, body);
+        });
+    }
+
+    stream(req, res, { since, limit, tables }) {
+        this.counters.streams++;
+        res.set({ 'Content-Type': 'text/event-stream', 'Cache-Control': 'no-store', Connection: 'keep-alive' });
+        res.flushHeaders();
+        let cursor = since;
+        let reading = false;
+        let again = false;
+        let closed = false;
+
+        const send = () => {
+            if (closed) return;
+            if (reading) {
+                again = true;
+                return;
+            }
+            reading = true;
+            this.read(cursor, { limit, tables }, (err, body) => {
+                reading = false;
+                if (closed) return;
+                if (err) {
+                    const data = err instanceof ChangeFeedError ? { error: err.message, ...err.extra } : { error: err.message };
+                    res.end(`event: error\ndata: ${JSON.stringify(data)}\n\n`);
+                    return;
+                }
+                const events = body.changes.map(c => `id: ${c.seq}\ndata: ${JSON.stringify(c)}\n\n`).join('');
+                cursor = body.next;
+                const drained = events ? res.write(events) : true;
+                // A full page means more is waiting; otherwise wait for the next wakeup
+                const more = again || body.changes.length === limit;
+                again = false;
+                if (more) drained ? send() : res.once('drain', send);
+            });
+        };
+
+        const unsubscribe = this.subscribe(send);
+        const heartbeat = setInterval(() => res.write(': ping\n\n'), this.heartbeatMs);
+        res.on('close', () => {
+            closed = true;
+            unsubscribe();
+            clearInterval(heartbeat);
+        });
+        send();
+    }
+
+    stats() {
+        return { head: this.head, waiters: this.waiters.size, pollMs: this.pollMs, ...this.counters };
+    }
+}
@@ -0,0 +1,139 @@
+// Cluster mode: N server.js workers behind one port, all on the same WAL-mode database.
+//
+// Every worker is a full server.js with its own reader pool and writer connection. Writes from
+// different workers meet in SQLite's write lock; transactions start with BEGIN IMMEDIATE and
+// SQLITE_BUSY is retried (lib/db.js), exactly as with the Python tools writing the same file.
+// Response-cache invalidations are relayed through the primary to the other workers. Entries
+// are also checked against the table_versions ETag, so the relay only frees memory early on a
+// migrated database, and is what keeps other workers fresh on an older one.
+//
+// Each worker gets a slot (0..slots-1, unique among live workers) through CLUSTER_SLOT/CLUSTER_SLOTS.
+// server.js uses it for ids that must not collide across processes and to run periodic
+// jobs once. SIGHUP replaces the workers one at a time: the replacement has to be listening before
+// the old worker is asked to drain, so the port is never left without a listener.
+
+import cluster from 'cluster';
+
+const INVALIDATE = 'cache:invalidate';
+const SHUTDOWN = 'shutdown';
+
+export const workerSlot = () => ({
+    slot: parseInt(process.env.CLUSTER_SLOT ?? '0', 10),
+    slots: parseInt(process.env.CLUSTER_SLOTS ?? '1', 10)
+});
+
+// Worker side: forwards local invalidations to the primary and applies the ones from other workers
+export function shareInvalidations(cache) {
+    if (!cluster.isWorker) return;
+    cache.onInvalidate = (tables) => process.connected && process.send({ type: INVALIDATE, tables });
+    process.on('message', (message) => {
+        if (message?.type === INVALIDATE) cache.invalidate(message.tables, { remote: true });
+    });
+}
+
+// Worker side: runs `shutdown` when the primary asks for a drain (rolling restart) or on SIGTERM/SIGINT
+export function onShutdown(shutdown) {
+    let started = false;
+    const once = () => {
+        if (started) return;
+        started = true;
+        shutdown();
+    };
+    process.on('message', message => message?.type === SHUTDOWN && once());
+    process.on('SIGTERM', once);
+    process.on('SIGINT', once);
+}
+
+export class Supervisor {
+    constructor({ exec, workers, drainMs = 10000, respawnMs = 1000 }) {
+        this.workers = workers;
+        this.drainMs = drainMs;
+        this.respawnMs = respawnMs;
+        this.slots = new Map();     // worker id -> slot
+        this.stopping = false;
+        this.restarting = false;
+        cluster.setupPrimary({ exec });
+    }
+
+    start() {
+        for (let i = 0; i < this.workers; i++) this.fork();
+        process.on('SIGHUP', () => this.rollingRestart());
+        process.on('SIGTERM', () => this.stop());
+        process.on('SIGINT', () => this.stop());
+    }
+
+    // Lowest slot no live worker holds; 2N slots leave room for a replacement next to a draining worker
+    freeSlot() {
+        const used = new Set(this.slots.values());
+        let slot = 0;
+        while (used.has(slot)) slot++;
+        return slot;
+    }
+
+    fork() {
+        const slot = this.freeSlot();
+        const worker = cluster.fork({ CLUSTER_SLOT: String(slot), CLUSTER_SLOTS: String(this.workers * 2) });
+        this.slots.set(worker.id, slot);
+        worker.on('message', (message) => {
+            if (message?.type !== INVALIDATE) return;
+            for (const other of Object.values(cluster.workers)) {
+                if (other !== worker && other.isConnected()) other.send(message);
+            }
+        });
+        worker.on('exit', (code, signal) => {
+            this.slots.delete(worker.id);
+            if (this.stopping || worker.draining) return;
+            console.error(`Worker ${worker.process.pid} exited (${signal || code}), starting a new one`);
+            setTimeout(() => this.stopping || this.fork(), this.respawnMs);
+        });
+        return worker;
+    }
+
+    // Asks a worker to finish in-flight requests and exit; kills it after drainMs
+    drain(worker) {
+        return new Promise((resolve) => {
+            if (worker.isDead()) return resolve();
+            worker.draining = true;
+            const timer = setTimeout(() => worker.process.kill('SIGKILL'), this.drainMs);
+            worker.once('exit', () => {
+                clearTimeout(timer);
+                resolve();
+            });
+            worker.send({ type: SHUTDOWN });
+        });
+    }
+
+    async rollingRestart() {
+        if (this.restarting || this.stopping) return;
+        this.restarting = true;
+        const old = Object.values(cluster.workers);
+        console.log(`Rolling restart of ${old.length} workers`);
+        for (const worker of old) {
+            const replacement = this.fork();
+            // Not respawned until it is listening: a replacement that cannot start (e.g. a broken
+            // deploy) must not crash-loop, and must not come back later next to the worker it replaces
+            replacement.draining = true;
+            const listening = await new Promise((resolve) => {
+                replacement.once('listening', () => resolve(true));
+                replacement.once('exit', () => resolve(false));
+            });
+            if (!listening) {
+                this.restarting = false;
+                console.error(`Rolling restart aborted: a new worker exited before listening, ` +
+                              `${Object.keys(cluster.workers).length} old workers keep serving`);
+                return;
+            }
+            replacement.draining = false;
+            await this.drain(worker);
+        }
+        this.restarting = false;
+        console.log('Rolling restart done');
+    }
+
+    async stop() {
+        if (this.stopping) return;
+        this.stopping = true;
+        await Promise.all(Object.values(cluster.workers).map(worker => this.drain(worker)));
+        process.exit(0);
+    }
+}
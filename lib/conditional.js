@@ -0,0 +1,105 @@
+// Conditional GET (ETag / Last-Modified / 304) from per-table version counters.
+//
+// table_versions holds a counter and a timestamp per public table, bumped by triggers on every
+// insert/update/delete whoever the writer is (database/versions.py, migration 7). A route's ETag
+// is derived from the URL and the versions of the tables it reads, so a request whose
+// If-None-Match still matches is answered 304 after one lookup in that small table, without
+// running the route's query. Databases migrated before version 7 get no ETag from here (Express
+// still hashes the body).
+//
+// Cache-Control is set per route: `policies` maps a route path ('/api/packages') to a header value,
+// anything else gets `defaultPolicy`.
+
+import { createHash } from 'crypto';
+import { cacheKey } from './cache.js';
+
+export const TABLE_VERSIONS = 'SELECT name, version, updated_at FROM table_versions';
+
+// Last-Modified has one-second resolution: it is only sent once the second of the last change
+// is over, otherwise a later write in the same second would look unmodified to If-Modified-Since
+const httpDate = (iso) => {
+    const time = Date.parse(iso);
+    if (Number.isNaN(time) || Math.floor(time / 1000) >= Math.floor(Date.now() / 1000)) return null;
+    return new Date(time).toUTCString();
+};
+
+// RFC 9110: If-None-Match uses weak comparison and may list several tags or '*'
+const matchesTag = (header, etag) => {
+    if (!header) return false;
+    if (header.trim() === '*') return true;
+    const bare = etag.replace(/^W\//, '');
+    return header.split(',').some(tag => tag.trim().replace(/^W\//, '') === bare);
+};
+
+export class ConditionalGet {
+    constructor(db, { policies = {}, defaultPolicy = 'no-cache' } = {}) {
+        this.db = db;
+        this.policies = policies;
+        this.defaultPolicy = defaultPolicy;
+        this.counters = { notModified: 0, validated: 0, unavailable: 0 };
+    }
+
+    policy(req) {
+        return this.policies[`${req.baseUrl}${req.route ? req.route.path : req.path}`] ?? this.defaultPolicy;
+    }
+
+    versions(tables, callback) {
+        this.db.all(TABLE_VERSIONS, [], (err, rows) => {
+            if (err) return callback(err);
+            const wanted = new Map(rows.filter(r => tables.includes(r.name)).map(r => [r.name, r]));
+            if (wanted.size !== tables.length) return callback(new Error('table_versions is missing a table'));
+            callback(null, tables.map(t => wanted.get(t)));
+        });
+    }
+
+    // Middleware for GET routes built from `tables`
+    conditional(...tables) {
+        return (req, res, next) => {
+            const cacheControl = this.policy(req);
+            if (cacheControl) res.set('Cache-Control', cacheControl);
+            this.versions(tables, (err, rows) => {
+                if (err) {
+                    this.counters.unavailable++;
+                    return next();
+                }
+                const digest = createHash('sha1')
+                    .update(cacheKey(req))
+                    .update(rows.map(r => `${r.name}:${r.version}`).join(','))
+                    .digest('base64url')
+                    .slice(0, 22);
+                const etag = `W/"${digest}"`;
+                const lastModified = rows.map(r => r.updated_at).sort().pop();
+
+                res.set('ETag', etag);
+                const modified = httpDate(lastModified);
+                if (modified) res.set('Last-Modified', modified);
+
+                const ifNoneMatch = req.get('If-None-Match');
+                const ifModifiedSince = Date.parse(req.get('If-Modified-Since'));
+                const fresh = ifNoneMatch
+                    ? matchesTag(ifNoneMatch, etag)
+                    : modified && !Number.isNaN(ifModifiedSince) && Date.parse(modified) <= ifModifiedSince;
+                if (fresh) {
+                    this.counters.notModified++;
+                    return res.status(304).end();
+                }
+                this.counters.validated++;
+
+                // Errors must not carry the validators of the representation they replace
+                const writeHead = res.writeHead;
+                res.writeHead = function (...args) {
+                    if (res.statusCode !== 200 && res.statusCode !== 304) {
+                        res.removeHeader('ETag');
+                        res.removeHeader('Last-Modified');
+                    }
+                    return writeHead.apply(this, args);
+                };
+                next();
+            });
+        };
+    }
+
+    stats() {
+        return { ...this.counters, defaultPolicy: this.defaultPolicy, policies: this.policies };
+    }
+}
@@ -0,0 +1,365 @@
+// Data-access layer: a pool of read-only connections plus one serialized writer.
+//
+// The database is switched to WAL so readers never wait for the writer (or for Python scripts
+// writing the same file). Reads go to the least busy reader; each connection runs on its own
+// libuv thread, so set UV_THREADPOOL_SIZE >= readers + 1 to let them run in parallel.
+// Writes (run/exec/transaction) go through a FIFO queue one at a time; SQLITE_BUSY after busy_timeout
+// is retried with exponential backoff.
+// The callback API matches sqlite3.Database, including `this.lastID` / `this.changes` in run().
+//
+// Statements are prepared once per connection and reused: SQL registered through bootstrap()
+// stays prepared for the life of the connection, any other SQL text (built per request, e.g.
+// pagination) is kept in a small per-connection LRU.
+//
+// `loadFrom` copies a database file into `file` (normally ':memory:') with the backup API before
+// anything else runs, e.g. a seeded image from database/fixtures.py for tests.
+//
+// `mmapSize` (bytes, 0 = SQLite's default) memory-maps that much of the file on every connection, so
+// reads come straight from the OS page cache instead of a per-connection copy.
+//
+// Callbacks are bound to the caller's async context (sqlite3 does not propagate it), and an optional
+// `observer` ({ begin(sql, method, params) => (err, rows) => void }) sees every statement execution.
+
+import { AsyncResource } from 'async_hooks';
+import { access, constants } from 'fs';
+import sqlite3 from 'sqlite3';
+
+const BUSY_CODES = new Set(['SQLITE_BUSY', 'SQLITE_LOCKED']);
+
+const STATEMENT_CACHE_SIZE = 100;
+
+const isReadOnly = (sql) => /^\s*(SELECT|WITH)\b/i.test(sql);
+
+const isMemory = (file) => file === ':memory:' || String(file).startsWith('file::memory:');
+
+function splitArgs(args) {
+    const callback = AsyncResource.bind(typeof args[args.length - 1] === 'function' ? args.pop() : () => {});
+    const params = args.length === 1 ? args[0] : args;
+    return { params, callback };
+}
+
+export class DataStore {
+    constructor(file, { readers = 4, busyTimeout = 5000, busyRetries = 5, busyBackoff = 25, mmapSize = 0, loadFrom = null } = {}, callback = () => {}) {
+        this.file = file;
+        this.mmapSize = mmapSize;
+        this.busyTimeout = busyTimeout;
+        this.busyRetries = busyRetries;
+        this.busyBackoff = busyBackoff;
+        this.readers = [];
+        this.queue = [];
+        this.writing = false;
+        this.ready = false;
+        this.waiting = [];
+        this.openError = null;
+        this.registered = new Set();
+        this.observer = null;
+        this.counters = { reads: 0, writes: 0, busyRetries: 0, maxWriteQueueDepth: 0, readWaitMs: 0 };
+
+        const done = (err) => {
+            this.openError = err || null;
+            if (!err) {
+                this.ready = true;
+                this.waiting.splice(0).forEach(fn => fn());
+                this.drain();
+            }
+            callback(err || null);
+        };
+        this.writer = new sqlite3.Database(file, (err) => {
+            this.writer.statements = new Map();
+            if (err) return done(err);
+            this.writer.configure('busyTimeout', busyTimeout);
+            // In-memory databases are private to one connection: everything goes through the writer
+            const poolSize = isMemory(file) ? 0 : readers;
+            this.load(loadFrom, (err) => {
+                if (err) return done(err);
+                this.writer.exec(`PRAGMA journal_mode = WAL;${this.connectionPragmas()}`, (err) => {
+                    if (err) return done(err);
+                    this.openReaders(poolSize, done);
+                });
+            });
+        });
+    }
+
+    load(source, callback) {
+        if (!source) return callback();
+        // Opening a missing source would silently create an empty file
+        access(source, constants.R_OK, (err) => {
+            if (err) return callback(err);
+            const backup = this.writer.backup(source, 'main', 'main', false, (err) => {
+                if (err) return callback(err);
+                backup.step(-1, (err) => {
+                    backup.finish();
+                    callback(err || null);
+                });
+            });
+        });
+    }
+
+    connectionPragmas() {
+        return this.mmapSize > 0 ? `PRAGMA mmap_size = ${Math.floor(this.mmapSize)};` : '';
+    }
+
+    openReaders(count, done) {
+        if (count <= 0) return done();
+        let opened = 0;
+        let failed = false;
+        for (let i = 0; i < count; i++) {
+            const reader = new sqlite3.Database(this.file, sqlite3.OPEN_READONLY, (err) => {
+                if (failed) return;
+                if (err) {
+                    failed = true;
+                    return done(err);
+                }
+                reader.configure('busyTimeout', this.busyTimeout);
+                reader.exec(this.connectionPragmas(), (err) => {
+                    if (failed) return;
+                    if (err) {
+                        failed = true;
+                        return done(err);
+                    }
+                    if (++opened === count) done();
+                });
+            });
+            reader.statements = new Map();
+            reader.inflight = 0;
+            reader.reads = 0;
+            this.readers.push(reader);
+        }
+    }
+
+    // Calls back with the connection's prepared statement for `sql`, preparing it on first use.
+    // sqlite3 never answers calls queued on a statement whose prepare failed, so callers wait
+    // for the prepare and a failed statement is dropped (and retried on the next call).
+    statement(conn, sql, callback) {
+        let stmt = conn.statements.get(sql);
+        if (stmt) {
+            if (!this.registered.has(sql)) {
+                conn.statements.delete(sql);
+                conn.statements.set(sql, stmt);
+            }
+            if (stmt.waiting) stmt.waiting.push(callback);
+            else callback(null, stmt);
+            return;
+        }
+        stmt = conn.prepare(sql, (err) => {
+            const waiting = stmt.waiting;
+            stmt.waiting = null;
+            if (err && conn.statements.get(sql) === stmt) conn.statements.delete(sql);
+            waiting.forEach(fn => (err ? fn(err) : fn(null, stmt)));
+        });
+        stmt.waiting = [callback];
+        conn.statements.set(sql, stmt);
+        if (conn.statements.size > this.registered.size + STATEMENT_CACHE_SIZE) {
+            for (const [key, old] of conn.statements) {
+                if (this.registered.has(key) || old.waiting) continue;
+                conn.statements.delete(key);
+                old.finalize();
+                break;
+            }
+        }
+    }
+
+    // Same as conn[method](sql, params, callback) but through the connection's prepared statement
+    call(conn, method, sql, params, callback) {
+        const observed = this.observer ? this.observer.begin(sql, method, params) : null;
+        this.statement(conn, sql, (prepareErr, stmt) => {
+            const finish = function (err, result) {
+                if (observed) {
+                    observed(err, method === 'all' ? result?.length ?? 0 : method === 'get' ? (result ? 1 : 0) : this.changes);
+                }
+                // A statement that stops working (e.g. its table was dropped) is dropped and re-prepared
+                if (err && stmt && err.code === 'SQLITE_ERROR' && conn.statements.get(sql) === stmt) {
+                    conn.statements.delete(sql);
+                    stmt.finalize();
+                }
+                callback.call(this, err, result);
+            };
+            if (prepareErr) return finish.call({ changes: 0 }, prepareErr);
+            if (method === 'get') {
+                // get() stops after one row; reset so the statement does not pin a read snapshot
+                stmt.get(params, function (err, row) {
+                    stmt.reset();
+                    finish.call(this, err, row);
+                });
+            } else {
+                stmt[method](params, finish);
+            }
+        });
+    }
+
+    whenReady(fn) {
+        if (this.ready) fn();
+        else this.waiting.push(fn);
+    }
+
+    read(method, sql, args) {
+        const { params, callback } = splitArgs(args);
+        this.whenReady(() => {
+            const reader = this.readers.reduce((best, r) => (r.inflight < best.inflight ? r : best), this.readers[0]);
+            if (!reader) return this.enqueue({ method, sql, params, callback });
+            const started = Date.now();
+            reader.inflight++;
+            this.call(reader, method, sql, params, (err, result) => {
+                reader.inflight--;
+                reader.reads++;
+                this.counters.reads++;
+                this.counters.readWaitMs += Date.now() - started;
+                callback(err, result);
+            });
+        });
+    }
+
+    all(sql, ...args) {
+        this.read('all', sql, args);
+    }
+
+    get(sql, ...args) {
+        this.read('get', sql, args);
+    }
+
+    run(sql, ...args) {
+        const { params, callback } = splitArgs(args);
+        this.enqueue({ method: 'run', sql, params, callback });
+    }
+
+    exec(sql, callback = () => {}) {
+        this.enqueue({ method: 'exec', sql, callback: AsyncResource.bind(callback) });
+    }
+
+    // Runs work(tx, done) inside BEGIN IMMEDIATE on the writer. The write queue is held until
+    // done(err, result) is called, so nothing else interleaves; an error rolls the whole unit back.
+    // tx.run/get/all have the sqlite3 signatures and go straight to the writer connection.
+    transaction(work, callback = () => {}) {
+        this.enqueue({ method: 'transaction', work: AsyncResource.bind(work), callback: AsyncResource.bind(callback) });
+    }
+
+    runTransaction(work, finish) {
+        const writer = this.writer;
+        writer.run('BEGIN IMMEDIATE', (err) => {
+            if (err) return finish(err);
+            const tx = {};
+            for (const method of ['run', 'get', 'all']) {
+                tx[method] = (sql, ...args) => {
+                    const { params, callback } = splitArgs(args);
+                    this.call(writer, method, sql, params, callback);
+                };
+            }
+            work(tx, (workErr, result) => {
+                if (workErr) return writer.run('ROLLBACK', () => finish(workErr));
+                writer.run('COMMIT', (commitErr) => {
+                    if (commitErr) return writer.run('ROLLBACK', () => finish(commitErr));
+                    finish(null, result);
+                });
+            });
+        });
+    }
+
+    enqueue(job) {
+        this.queue.push({ ...job, attempts: 0 });
+        this.counters.maxWriteQueueDepth = Math.max(this.counters.maxWriteQueueDepth, this.queue.length);
+        this.drain();
+    }
+
+    drain() {
+        if (!this.ready || this.writing || this.queue.length === 0) return;
+        this.writing = true;
+        this.execute(this.queue.shift());
+    }
+
+    execute(job) {
+        const store = this;
+        const finish = function (err, result) {
+            if (err && BUSY_CODES.has(err.code) && job.attempts < store.busyRetries) {
+                store.counters.busyRetries++;
+                const delay = store.busyBackoff * 2 ** job.attempts++;
+                setTimeout(() => store.execute(job), delay);
+                return;
+            }
+            store.writing = false;
+            store.counters.writes++;
+            job.callback.call(this, err, result);
+            store.drain();
+        };
+        if (job.method === 'transaction') this.runTransaction(job.work, finish);
+        else if (job.method === 'exec') this.writer.exec(job.sql, finish);
+        else this.call(this.writer, job.method, job.sql, job.params, finish);
+    }
+
+    // Refreshes planner statistics (sqlite_stat1) for tables whose data changed enough to matter;
+    // cheap when nothing did, and analysis_limit bounds it on large tables. Goes through the write queue.
+    optimize(callback = () => {}) {
+        this.exec('PRAGMA analysis_limit = 1000; PRAGMA optimize = 0x10002', callback);
+    }
+
+    // Startup phase, resolved before the server listens: applies `schema` on the writer, prepares
+    // every SQL string in `statements` on the connections that will run it, then runs the `warm`
+    // queries once on every reader so their page caches hold the hot tables. Statements that do
+    // not prepare (e.g. tables not migrated yet) are returned in `failed` instead of aborting.
+    async bootstrap({ schema = [], statements = [], warm = [] } = {}) {
+        await new Promise((resolve, reject) => {
+            if (this.openError) return reject(this.openError);
+            this.whenReady(resolve);
+        });
+        const started = Date.now();
+        if (schema.length) {
+            await new Promise((resolve, reject) => {
+                this.exec(schema.join(';\n'), err => (err ? reject(err) : resolve()));
+            });
+        }
+
+        const readers = this.readers.length ? this.readers : [this.writer];
+        const failed = new Map();
+        const preparing = [];
+        for (const sql of new Set(statements)) {
+            this.registered.add(sql);
+            for (const conn of isReadOnly(sql) ? readers : [this.writer]) {
+                preparing.push(new Promise((resolve) => {
+                    this.statement(conn, sql, (err) => {
+                        if (err) failed.set(sql, err.message);
+                        resolve();
+                    });
+                }));
+            }
+        }
+        await Promise.all(preparing);
+        failed.forEach((_, sql) => this.registered.delete(sql));
+
+        const warming = warm.filter(sql => !failed.has(sql));
+        await Promise.all(readers.flatMap(conn => warming.map(sql => new Promise((resolve) => {
+            this.call(conn, 'all', sql, [], () => resolve());
+        }))));
+        return {
+            statements: this.registered.size,
+            warmed: warming.length,
+            failed: [...failed].map(([sql, error]) => ({ sql: sql.replace(/\s+/g, ' '), error })),
+            ms: Date.now() - started
+        };
+    }
+
+    metrics() {
+        return {
+            readers: this.readers.length,
+            readersInflight: this.readers.map(r => r.inflight),
+            readsPerReader: this.readers.map(r => r.reads),
+            reads: this.counters.reads,
+            avgReadMs: this.counters.reads ? this.counters.readWaitMs / this.counters.reads : 0,
+            writes: this.counters.writes,
+            writeQueueDepth: this.queue.length + (this.writing ? 1 : 0),
+            maxWriteQueueDepth: this.counters.maxWriteQueueDepth,
+            busyRetries: this.counters.busyRetries,
+            preparedStatements: this.registered.size,
+            busyTimeout: this.busyTimeout
+        };
+    }
+
+    close(callback = () => {}) {
+        const handles = [this.writer, ...this.readers];
+        handles.forEach(handle => handle.statements?.forEach(stmt => !stmt.waiting && stmt.finalize()));
+        let pending = handles.length;
+        let firstError = null;
+        handles.forEach(handle => handle.close((err) => {
+            firstError = firstError || err;
+            if (--pending === 0) callback(firstError);
+        }));
+    }
+}
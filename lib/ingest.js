@@ -0,0 +1,87 @@
+// Group commit for public form submissions.
+//
+// Rows are queued and flushed as one transaction every `maxBatch` rows or `maxDelayMs`
+// milliseconds, whichever comes first, so one fsync covers the whole batch. Each submitter's
+// callback runs only after its batch has committed. push() returns false when `maxQueue` rows
+// are already waiting or being written; callers answer 429.
+// A row whose INSERT fails (e.g. a constraint) gets its own error without aborting the batch.
+
+export class GroupCommitQueue {
+    constructor(db, { table, columns, maxBatch = 100, maxDelayMs = 10, maxQueue = 5000 }) {
+        this.db = db;
+        this.table = table;
+        this.sql = `INSERT INTO ${table} (${columns.join(', ')}) VALUES (${columns.map(() => '?').join(', ')})`;
+        this.maxBatch = Math.max(1, maxBatch);
+        this.maxDelayMs = maxDelayMs;
+        this.maxQueue = maxQueue;
+        this.pending = [];
+        this.writing = 0;
+        this.flushing = false;
+        this.timer = null;
+        this.counters = { accepted: 0, rejected: 0, committed: 0, failed: 0, batches: 0, maxBatchSeen: 0 };
+    }
+
+    get depth() {
+        return this.pending.length + this.writing;
+    }
+
+    push(values, callback) {
+        if (this.depth >= this.maxQueue) {
+            this.counters.rejected++;
+            return false;
+        }
+        this.counters.accepted++;
+        this.pending.push({ values, callback });
+        if (this.pending.length >= this.maxBatch) this.flush();
+        else if (!this.timer) this.timer = setTimeout(() => this.flush(), this.maxDelayMs);
+        return true;
+    }
+
+    // One batch in flight at a time: rows arriving during a commit join the next batch
+    flush() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.flushing || this.pending.length === 0) return;
+        const batch = this.pending.splice(0, this.maxBatch);
+        this.flushing = true;
+        this.writing = batch.length;
+
+        this.db.transaction((tx, done) => {
+            const results = new Array(batch.length);
+            const insert = (i) => {
+                if (i === batch.length) return done(null, results);
+                tx.run(this.sql, batch[i].values, function (err) {
+                    results[i] = err ? { err } : { id: this.lastID };
+                    insert(i + 1);
+                });
+            };
+            insert(0);
+        }, (err, results) => {
+            this.flushing = false;
+            this.writing = 0;
+            this.counters.batches++;
+            this.counters.maxBatchSeen = Math.max(this.counters.maxBatchSeen, batch.length);
+            batch.forEach((item, i) => {
+                const result = err ? { err } : results[i];
+                if (result.err) this.counters.failed++;
+                else this.counters.committed++;
+                item.callback(result.err || null, result.id);
+            });
+            // Rows that arrived during the commit have already waited long enough
+            this.flush();
+        });
+    }
+
+    metrics() {
+        const { batches, committed, failed } = this.counters;
+        return {
+            table: this.table,
+            depth: this.depth,
+            maxQueue: this.maxQueue,
+            maxBatch: this.maxBatch,
+            maxDelayMs: this.maxDelayMs,
+            ...this.counters,
+            avgBatchSize: batches ? (committed + failed) / batches : 0
+        };
+    }
+}
@@ -0,0 +1,207 @@
+// In-process metrics in the Prometheus text format (no client library needed).
+//
+// httpMetrics() times every request by matched route, method and status, and tracks response
+// bytes and in-flight requests. sqlObserver() plugs into DataStore and times every statement,
+// counting rows returned/changed; with a slow-query threshold it also logs the statement, the
+// route that issued it and its EXPLAIN QUERY PLAN as one JSON line on stderr.
+
+import { AsyncLocalStorage } from 'async_hooks';
+
+export const DURATION_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatLabels = (labels) => {
+    const pairs = Object.entries(labels).map(([k, v]) => `${k}="${escapeLabel(v)}"`);
+    return pairs.length ? `{${pairs.join(',')}}` : '';
+};
+
+const labelKey = (labels) => JSON.stringify(Object.entries(labels));
+
+class Counter {
+    constructor(name, help, type = 'counter') {
+        this.name = name;
+        this.help = help;
+        this.type = type;
+        this.values = new Map();
+    }
+
+    inc(labels = {}, value = 1) {
+        const key = labelKey(labels);
+        const entry = this.values.get(key) || { labels, value: 0 };
+        entry.value += value;
+        this.values.set(key, entry);
+    }
+
+    set(labels, value) {
+        this.values.set(labelKey(labels), { labels, value });
+    }
+
+    render() {
+        const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} ${this.type}`];
+        for (const { labels, value } of this.values.values()) lines.push(`${this.name}${formatLabels(labels)} ${value}`);
+        return lines.join('\n');
+    }
+}
+
+class Histogram {
+    constructor(name, help, buckets = DURATION_BUCKETS) {
+        this.name = name;
+        this.help = help;
+        this.buckets = buckets;
+        this.values = new Map();
+    }
+
+    observe(labels, value) {
+        const key = labelKey(labels);
+        let entry = this.values.get(key);
+        if (!entry) {
+            entry = { labels, counts: new Array(this.buckets.length).fill(0), sum: 0, count: 0 };
+            this.values.set(key, entry);
+        }
+        const index = this.buckets.findIndex(bound => value <= bound);
+        if (index >= 0) entry.counts[index]++;
+        entry.sum += value;
+        entry.count++;
+    }
+
+    render() {
+        const lines = [`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`];
+        for (const { labels, counts, sum, count } of this.values.values()) {
+            let cumulative = 0;
+            this.buckets.forEach((bound, i) => {
+                cumulative += counts[i];
+                lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: bound })} ${cumulative}`);
+            });
+            lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${count}`);
+            lines.push(`${this.name}_sum${formatLabels(labels)} ${sum}`);
+            lines.push(`${this.name}_count${formatLabels(labels)} ${count}`);
+        }
+        return lines.join('\n');
+    }
+}
+
+export class Registry {
+    constructor() {
+        this.metrics = [];
+        this.collectors = [];
+    }
+
+    counter(name, help) {
+        return this.add(new Counter(name, help));
+    }
+
+    gauge(name, help) {
+        return this.add(new Counter(name, help, 'gauge'));
+    }
+
+    histogram(name, help, buckets) {
+        return this.add(new Histogram(name, help, buckets));
+    }
+
+    add(metric) {
+        this.metrics.push(metric);
+        return metric;
+    }
+
+    // fn runs on every scrape, to copy gauges from other components (cache, queues, ...)
+    collect(fn) {
+        this.collectors.push(fn);
+    }
+
+    render() {
+        this.collectors.forEach(fn => fn());
+        return this.metrics.map(m => m.render()).join('\n') + '\n';
+    }
+}
+
+// The request being handled, so SQL timings and slow-query entries can name their route
+const requestContext = new AsyncLocalStorage();
+
+export const routeLabel = (req) => (req.route ? `${req.baseUrl}${req.route.path}` : '<unmatched>');
+
+export function httpMetrics(registry) {
+    const duration = registry.histogram(
+        'http_request_duration_seconds', 'Request latency by matched route, method and status'
+    );
+    const bytes = registry.counter('http_response_bytes_total', 'Response body bytes by route, method and status');
+    const inflight = registry.gauge('http_requests_in_flight', 'Requests currently being handled');
+    let active = 0;
+    inflight.set({}, 0);
+
+    return (req, res, next) => {
+        const started = process.hrtime.bigint();
+        let sent = 0;
+        const write = res.write;
+        const end = res.end;
+        res.write = function (chunk, ...args) {
+            if (chunk && typeof chunk !== 'function') sent += Buffer.byteLength(chunk);
+            return write.call(this, chunk, ...args);
+        };
+        res.end = function (chunk, ...args) {
+            if (chunk && typeof chunk !== 'function') sent += Buffer.byteLength(chunk);
+            return end.call(this, chunk, ...args);
+        };
+        inflight.set({}, ++active);
+
+        let recorded = false;
+        const record = () => {
+            if (recorded) return;
+            recorded = true;
+            inflight.set({}, --active);
+            const labels = { route: routeLabel(req), method: req.method, status: res.statusCode };
+            duration.observe(labels, Number(process.hrtime.bigint() - started) / 1e9);
+            bytes.inc(labels, sent);
+        };
+        res.on('finish', record);
+        res.on('close', record);
+        requestContext.run(req, next);
+    };
+}
+
+const statementLabel = (sql) => {
+    const text = sql.replace(/\s+/g, ' ').trim();
+    return text.length > 160 ? `${text.slice(0, 157)}...` : text;
+};
+
+// Observer for DataStore: begin() runs when the statement is issued, its result when it completes
+export function sqlObserver(registry, db, { slowQueryMs = null, log = line => console.warn(line) } = {}) {
+    const duration = registry.histogram('sqlite_statement_duration_seconds', 'SQL execution time per statement');
+    const rows = registry.counter('sqlite_statement_rows_total', 'Rows returned (all/get) or changed (run) per statement');
+    const errors = registry.counter('sqlite_statement_errors_total', 'Failed executions per statement and error code');
+    const slow = registry.counter('sqlite_slow_statements_total', 'Statements slower than SLOW_QUERY_MS');
+
+    const explain = (entry, sql, params) => {
+        if (!/^\s*(SELECT|WITH)\b/i.test(sql)) return log(JSON.stringify({ slowQuery: entry }));
+        db.all(`EXPLAIN QUERY PLAN ${sql}`, params || [], (err, plan) => {
+            entry.plan = err ? `error: ${err.message}` : plan.map(step => step.detail);
+            log(JSON.stringify({ slowQuery: entry }));
+        });
+    };
+
+    return {
+        begin(sql, method, params) {
+            if (/^\s*EXPLAIN\b/i.test(sql)) return () => {};
+            const req = requestContext.getStore();
+            const started = process.hrtime.bigint();
+            return (err, count) => {
+                const seconds = Number(process.hrtime.bigint() - started) / 1e9;
+                const labels = { statement: statementLabel(sql), method };
+                duration.observe(labels, seconds);
+                if (err) errors.inc({ ...labels, code: err.code || 'ERROR' });
+                else rows.inc(labels, count);
+                if (slowQueryMs !== null && seconds * 1000 >= slowQueryMs) {
+                    slow.inc(labels);
+                    explain({
+                        ms: Math.round(seconds * 1e6) / 1000,
+                        route: req ? `${req.method} ${routeLabel(req)}` : null,
+                        url: req ? req.originalUrl : null,
+                        sql: statementLabel(sql),
+                        rows: count,
+                        error: err ? err.message : undefined
+                    }, sql, params);
+                }
+            };
+        }
+    };
+}
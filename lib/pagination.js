@@ -0,0 +1,214 @@
+// Keyset (cursor) pagination and field projection for list endpoints.
+//
+// A list spec describes one endpoint:
+//   table      - source table
+//   key        - SQL expressions forming a unique sort key, backed by an index (database/migrations.py)
+//   order      - 'ASC' or 'DESC'
+//   fields     - response field -> source column (null for computed fields)
+//   filter     - optional (query) => [conditions, params]
+//   transform  - optional row -> response object
+//
+// Requests without limit/cursor/fields keep the original handler and its plain array response.
+// With limit or cursor the response is { items, nextCursor, total }; count=false skips the COUNT(*).
+// fields=a,b only affects which fields are selected and returned.
+//
+// Full (unpaginated) lists go through streamList(): rows are read STREAM_CHUNK at a time along
+// the same keyset and written as one JSON array, gzipped when the client accepts it. The next chunk
+// is only read once the socket has drained, so memory stays flat whatever the table size.
+// Chunks are separate reads: a row written mid-stream may or may not appear, none repeats.
+
+import zlib from 'zlib';
+
+export const DEFAULT_LIMIT = 50;
+export const MAX_LIMIT = 500;
+export const STREAM_CHUNK = 500;
+
+export class ListQueryError extends Error {}
+
+export const wantsListQuery = (query) =>
+    query.limit !== undefined || query.cursor !== undefined || query.fields !== undefined;
+
+export const encodeCursor = (values) => Buffer.from(JSON.stringify(values)).toString('base64url');
+
+export function decodeCursor(cursor, length) {
+    let values;
+    try {
+        values = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+    } catch {
+        throw new ListQueryError('Invalid cursor');
+    }
+    const scalar = (v) => v === null || ['string', 'number'].includes(typeof v);
+    if (!Array.isArray(values) || values.length !== length || !values.every(scalar)) {
+        throw new ListQueryError('Invalid cursor');
+    }
+    return values;
+}
+
+export const identityFields = (columns) => Object.fromEntries(columns.map(c => [c, c]));
+
+function parseFields(spec, fields) {
+    if (fields === undefined) return null;
+    const requested = [...new Set(String(fields).split(',').map(f => f.trim()).filter(Boolean))];
+    const unknown = requested.filter(f => !Object.hasOwn(spec.fields, f));
+    if (requested.length === 0 || unknown.length > 0) {
+        throw new ListQueryError(`Unknown fields: ${unknown.join(', ') || '(none requested)'}`);
+    }
+    return requested;
+}
+
+function parseLimit(limit) {
+    if (limit === undefined) return DEFAULT_LIMIT;
+    const value = Number(limit);
+    if (!Number.isInteger(value) || value < 1) throw new ListQueryError('limit must be a positive integer');
+    return Math.min(value, MAX_LIMIT);
+}
+
+const quoteColumn = (column) => `"${column.replace(/"/g, '""')}"`;
+
+export function planList(spec, query) {
+    const paginate = query.limit !== undefined || query.cursor !== undefined;
+    const limit = parseLimit(query.limit);
+    const fields = parseFields(spec, query.fields);
+    const order = spec.order || 'ASC';
+
+    // Only the columns behind the requested fields are read, plus the sort key for the cursor
+    const columns = fields
+        ? [...new Set(fields.map(f => spec.fields[f]).filter(Boolean))].map(quoteColumn)
+        : ['*'];
+    const keys = spec.key.map((expr, i) => `${expr} AS _k${i}`);
+
+    const [conditions, params] = spec.filter ? spec.filter(query) : [[], []];
+    const where = [...conditions];
+    const pageParams = [...params];
+    if (query.cursor !== undefined) {
+        const after = decodeCursor(query.cursor, spec.key.length);
+        // SQLite does not seek an expression index on a row-value comparison alone,
+        // so the leading key term is repeated as a plain range bound
+        if (spec.key.length > 1) {
+            where.push(`${spec.key[0]} ${order === 'DESC' ? '<=' : '>='} ?`);
+            pageParams.push(after[0]);
+        }
+        where.push(`(${spec.key.join(', ')}) ${order === 'DESC' ? '<' : '>'} (${after.map(() => '?').join(', ')})`);
+        pageParams.push(...after);
+    }
+    const whereSql = (list) => (list.length ? ` WHERE ${list.join(' AND ')}` : '');
+
+    // One extra row tells whether there is a next page without a second query
+    let sql = `SELECT ${[...columns, ...keys].join(', ')} FROM ${spec.table}${whereSql(where)}`
+        + ` ORDER BY ${spec.key.map(expr => `${expr} ${order}`).join(', ')}`;
+    if (paginate) sql += ` LIMIT ${limit + 1}`;
+
+    const counted = paginate && !['false', '0'].includes(String(query.count));
+    return {
+        sql,
+        params: pageParams,
+        countSql: counted ? `SELECT COUNT(*) AS total FROM ${spec.table}${whereSql(conditions)}` : null,
+        countParams: params,
+        paginate,
+        limit,
+        fields
+    };
+}
+
+function render(spec, plan, row) {
+    const source = { ...row };
+    spec.key.forEach((_, i) => { delete source[`_k${i}`]; });
+    const item = spec.transform ? spec.transform(source) : source;
+    if (!plan.fields) return item;
+    return Object.fromEntries(plan.fields.map(f => [f, item[f]]));
+}
+
+export function sendList(db, spec, req, res) {
+    let plan;
+    try {
+        plan = planList(spec, req.query);
+    } catch (err) {
+        if (err instanceof ListQueryError) return res.status(400).json({ error: err.message });
+        throw err;
+    }
+
+    if (!plan.paginate) return streamList(db, spec, req, res);
+
+    db.all(plan.sql, plan.params, (err, rows) => {
+        if (err) return res.status(500).json({ error: err.message });
+
+        const page = rows.slice(0, plan.limit);
+        const last = page[page.length - 1];
+        const body = {
+            items: page.map(row => render(spec, plan, row)),
+            nextCursor: rows.length > plan.limit ? encodeCursor(spec.key.map((_, i) => last[`_k${i}`])) : null
+        };
+        if (!plan.countSql) return res.json(body);
+        db.get(plan.countSql, plan.countParams, (err, row) => {
+            if (err) return res.status(500).json({ error: err.message });
+            body.total = row.total;
+            res.json(body);
+        });
+    });
+}
+
+// The request's own parameters (filters such as category) are kept; only the paging ones are replaced
+const chunkQuery = (query, cursor) => ({ ...query, limit: STREAM_CHUNK, cursor, count: 'false' });
+
+// SQL of the first and of the following chunks of a full list, to register with prepared()
+export function streamStatements(spec) {
+    return [
+        planList(spec, chunkQuery({})).sql,
+        planList(spec, chunkQuery({}, encodeCursor(spec.key.map(() => null)))).sql
+    ];
+}
+
+export function streamList(db, spec, req, res) {
+    let out = null;
+    let closed = false;
+    res.on('close', () => { closed = true; });
+
+    const begin = () => {
+        res.set('Content-Type', 'application/json; charset=utf-8');
+        res.vary('Accept-Encoding');
+        if (req.acceptsEncodings('gzip', 'identity') === 'gzip') {
+            res.set('Content-Encoding', 'gzip');
+            out = zlib.createGzip();
+            out.pipe(res);
+            res.on('close', () => out.destroy());
+        } else {
+            out = res;
+        }
+        res.status(200);
+    };
+
+    const read = (cursor) => {
+        let plan;
+        try {
+            plan = planList(spec, chunkQuery(req.query, cursor));
+        } catch (err) {
+            if (err instanceof ListQueryError) return res.status(400).json({ error: err.message });
+            throw err;
+        }
+        db.all(plan.sql, plan.params, (err, rows) => {
+            if (closed) return;
+            if (err) {
+                if (!out) return res.status(500).json({ error: err.message });
+                // Headers are gone: cut the response short rather than end it as valid JSON
+                console.error(`Streaming ${spec.table} failed:`, err.message);
+                return res.destroy(err);
+            }
+            const more = rows.length > STREAM_CHUNK;
+            const page = more ? rows.slice(0, STREAM_CHUNK) : rows;
+            // A list that fits in one chunk is sent as usual (and can be cached)
+            if (!out && !more) return res.json(page.map(row => render(spec, plan, row)));
+
+            const first = !out;
+            if (first) begin();
+            let chunk = page.map(row => JSON.stringify(render(spec, plan, row))).join(',');
+            chunk = (first ? '[' : page.length ? ',' : '') + chunk;
+            if (!more) return out.end(`${chunk}]`);
+
+            const last = page[page.length - 1];
+            const next = () => read(encodeCursor(spec.key.map((_, i) => last[`_k${i}`])));
+            if (out.write(chunk)) next();
+            else out.once('drain', next);
+        });
+    };
+    read(undefined);
+}
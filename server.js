@@ -1,20 +1,33 @@
+import 'dotenv/config';
 import express from 'express';
-import sqlite3 from 'sqlite3';
 import path from 'path';
 import fs from 'fs';
 import multer from 'multer';
 import { fileURLToPath } from 'url';
+import { batchRoute } from './lib/batch.js';
+import { ResponseCache } from './lib/cache.js';
+import { ChangeFeed } from './lib/changes.js';
+import { onShutdown, shareInvalidations, workerSlot } from './lib/cluster.js';
+import { ConditionalGet, TABLE_VERSIONS } from './lib/conditional.js';
+import { DataStore } from './lib/db.js';
+import { GroupCommitQueue } from './lib/ingest.js';
+import { Registry, httpMetrics, sqlObserver } from './lib/metrics.js';
+import { identityFields, sendList, streamList, streamStatements, wantsListQuery } from './lib/pagination.js';
 
 // Since we are using ES modules, __dirname is not available directly.
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
 const app = express();
-const port = 3000;
+const port = parseInt(process.env.SERVER_PORT, 10) || 3000;
 
 // Middleware to parse JSON bodies
 app.use(express.json());
 
+// Latency, status and bytes per matched route (after body parsing, so handlers keep the request context)
+const metrics = new Registry();
+app.use(httpMetrics(metrics));
+
 // CORS middleware to allow requests from frontend
 app.use((req, res, next) => {
     res.header('Access-Control-Allow-Origin', '*');
@@ -28,8 +41,167 @@ app.use((req, res, next) => {
     }
 });
 
+// Path to the database (DB_PATH lets benchmarks and tests point at a scratch copy, or ':memory:'
+// with DB_FIXTURE naming a file to load into it, see python -m database.fixtures)
+const dbPath = process.env.DB_PATH === ':memory:' ? ':memory:'
+    : process.env.DB_PATH ? path.resolve(process.env.DB_PATH) : path.resolve(__dirname, 'projects.db');
+const db = new DataStore(dbPath, {
+    readers: parseInt(process.env.DB_READERS ?? '4', 10),
+    busyTimeout: parseInt(process.env.DB_BUSY_TIMEOUT_MS ?? '5000', 10),
+    busyRetries: parseInt(process.env.DB_BUSY_RETRIES ?? '5', 10),
+    busyBackoff: parseInt(process.env.DB_BUSY_BACKOFF_MS ?? '25', 10),
+    mmapSize: parseInt(process.env.DB_MMAP_SIZE ?? '0', 10),
+    loadFrom: process.env.DB_FIXTURE ? path.resolve(process.env.DB_FIXTURE) : null
+}, (err) => {
+    if (err) console.error('Error opening database', err.message);
+    else console.log('Connected to the projects database.');
+});
+// Per-statement timings; SLOW_QUERY_MS logs slower statements with their route and query plan
+db.observer = sqlObserver(metrics, db, {
+    slowQueryMs: process.env.SLOW_QUERY_MS ? Number(process.env.SLOW_QUERY_MS) : null
+});
+
+// Tables server.js writes to directly; the full schema and indexes are owned by database/migrations.py
+const SCHEMA = [
+    `CREATE TABLE IF NOT EXISTS project_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        company_name TEXT,
+        requested_services TEXT,
+        phone TEXT,
+        email TEXT
+    )`,
+    `CREATE TABLE IF NOT EXISTS contact_requests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        other_reason TEXT,
+        message TEXT,
+        phone TEXT,
+        email TEXT
+    )`,
+    `CREATE TABLE IF NOT EXISTS packages (
+        id INTEGER PRIMARY KEY,
+        title TEXT,
+        description TEXT,
+        price REAL,
+        delivery_time TEXT,
+        features TEXT,
+        category TEXT,
+        is_active BOOLEAN,
+        display_order INTEGER
+    )`,
+    `CREATE TABLE IF NOT EXISTS packages_server (
+        id INTEGER PRIMARY KEY,
+        title TEXT,
+        description TEXT,
+        price REAL,
+        delivery_time TEXT,
+        features TEXT,
+        category TEXT,
+        is_active BOOLEAN,
+        display_order INTEGER,
+        icon_html TEXT
+    )`
+];
+
+// Every fixed SQL string a route runs is declared with prepared() next to its route;
+// startup prepares them all on the connections that run them before the port opens
+const PREPARED = new Set();
+const prepared = (sql) => {
+    PREPARED.add(sql);
+    return sql;
+};
+
+// Text ids for reviews and team members: Date.now(), bumped so rows created in the same millisecond
+// (e.g. within one batch) still get distinct ids. Under cluster.js each worker only hands out ids
+// congruent to its slot, so two workers never produce the same one
+const { slot, slots } = workerSlot();
+let lastTextId = 0;
+const newTextId = () => {
+    const next = Math.max(Date.now(), lastTextId + 1);
+    lastTextId = next + ((slot - (next % slots)) + slots) % slots;
+    return lastTextId.toString();
+};
+
+// Public form submissions are written in batches: one transaction (and fsync) per batch (lib/ingest.js)
+const ingestOptions = {
+    maxBatch: parseInt(process.env.INGEST_BATCH_SIZE ?? '100', 10),
+    maxDelayMs: parseInt(process.env.INGEST_FLUSH_MS ?? '10', 10),
+    maxQueue: parseInt(process.env.INGEST_QUEUE_LIMIT ?? '5000', 10)
+};
+const projectRequestQueue = new GroupCommitQueue(db, {
+    ...ingestOptions,
+    table: 'project_requests',
+    columns: ['name', 'company_name', 'requested_services', 'phone', 'email']
+});
+const contactRequestQueue = new GroupCommitQueue(db, {
+    ...ingestOptions,
+    table: 'contact_requests',
+    columns: ['name', 'reason', 'other_reason', 'message', 'phone', 'email']
+});
+
+const rejectBusy = (res) => {
+    res.set('Retry-After', '1');
+    res.status(429).json({ error: 'Too many submissions, please retry shortly' });
+};
+
+app.get('/api/ingest-stats', (req, res) => {
+    res.json([projectRequestQueue.metrics(), contactRequestQueue.metrics()]);
+});
+
+// Prometheus scrape endpoint; the component stats above are copied in as gauges on every scrape
+const cacheGauge = metrics.gauge('response_cache', 'Response cache counters (lib/cache.js)');
+const dbGauge = metrics.gauge('sqlite_pool', 'Reader pool and writer queue state (lib/db.js)');
+const ingestGauge = metrics.gauge('ingest_queue', 'Group-commit queue state per table (lib/ingest.js)');
+const conditionalGauge = metrics.gauge('conditional_get', 'Conditional GET outcomes (lib/conditional.js)');
+const changesGauge = metrics.gauge('change_feed', 'Change feed waiters and polls (lib/changes.js)');
+metrics.collect(() => {
+    for (const [stat, value] of Object.entries(changeFeed.stats())) changesGauge.set({ stat }, value ?? 0);
+    for (const [stat, value] of Object.entries(responseCache.stats())) cacheGauge.set({ stat }, value);
+    for (const [stat, value] of Object.entries(conditionalGet.counters)) conditionalGauge.set({ stat }, value);
+    for (const [stat, value] of Object.entries(db.metrics())) {
+        if (typeof value === 'number') dbGauge.set({ stat }, value);
+    }
+    for (const queue of [projectRequestQueue, contactRequestQueue]) {
+        const { table, ...stats } = queue.metrics();
+        for (const [stat, value] of Object.entries(stats)) ingestGauge.set({ table, stat }, value);
+    }
+});
+
+app.get('/metrics', (req, res) => {
+    res.type('text/plain; version=0.0.4').send(metrics.render());
+});
+
+// Public GET responses are cached in memory until a write route touches their table (lib/cache.js)
+const responseCache = new ResponseCache({
+    maxEntries: parseInt(process.env.RESPONSE_CACHE_ENTRIES ?? '500', 10),
+    maxBytes: parseInt(process.env.RESPONSE_CACHE_BYTES ?? String(32 * 1024 * 1024), 10),
+    compressMinBytes: parseInt(process.env.RESPONSE_COMPRESS_MIN_BYTES ?? '1024', 10)
+});
+const invalidates = (...tables) => responseCache.invalidates(...tables);
+shareInvalidations(responseCache);
+
+// ETag/Last-Modified from the table_versions counters: a matching If-None-Match gets 304 before
+// the cache or the query is touched (lib/conditional.js). CACHE_CONTROL is a JSON object of
+// route path -> Cache-Control value, e.g. {"/api/packages": "public, max-age=300"}
+const conditionalGet = new ConditionalGet(db, {
+    policies: process.env.CACHE_CONTROL ? JSON.parse(process.env.CACHE_CONTROL) : {},
+    defaultPolicy: process.env.CACHE_CONTROL_DEFAULT ?? 'no-cache'
+});
+prepared(TABLE_VERSIONS);
+const cached = (...tables) => [conditionalGet.conditional(...tables), responseCache.cached(...tables)];
+
+app.get('/api/cache-stats', (req, res) => {
+    res.json({ ...responseCache.stats(), conditional: conditionalGet.stats() });
+});
+
+app.get('/api/db-stats', (req, res) => {
+    res.json(db.metrics());
+});
+
 // Static serving for uploaded files and ensuring directory exists
-const uploadsRoot = path.join(__dirname, 'uploads');
+const uploadsRoot = process.env.UPLOADS_DIR ? path.resolve(process.env.UPLOADS_DIR) : path.join(__dirname, 'uploads');
 const projectUploadsDir = path.join(uploadsRoot, 'projects');
 if (!fs.existsSync(projectUploadsDir)) {
     fs.mkdirSync(projectUploadsDir, { recursive: true });
@@ -69,31 +241,46 @@ app.post('/api/upload', upload.single('image'), (req, res) => {
 
 // ================= Project Requests (Quotes) =================
 // Get all project requests
+// ?limit=&cursor=&fields=&count= switch to keyset pagination (see lib/pagination.js)
+const PROJECT_REQUESTS_LIST = {
+    table: 'project_requests',
+    key: ['id'],
+    order: 'DESC',
+    fields: identityFields(['id', 'name', 'company_name', 'requested_services', 'phone', 'email'])
+};
+
+streamStatements(PROJECT_REQUESTS_LIST).forEach(prepared);
+
+// The full list is streamed in chunks (lib/pagination.js), these tables grow without bound
 app.get('/api/project-requests', (req, res) => {
-    const sql = 'SELECT * FROM project_requests ORDER BY id DESC';
-    db.all(sql, [], (err, rows) => {
-        if (err) return res.status(500).json({ error: err.message });
-        res.json(rows);
-    });
+    if (wantsListQuery(req.query)) return sendList(db, PROJECT_REQUESTS_LIST, req, res);
+    streamList(db, PROJECT_REQUESTS_LIST, req, res);
 });
 
 // ================= Packages Server CRUD (Admin) =================
+// Row -> response object for packages and packages-server (also used by /api/homepage)
+const toPackage = (r) => ({
+    ...r,
+    features: (() => { try { return JSON.parse(r.features || '[]'); } catch { return []; } })(),
+    is_active: r.is_active === 1 || r.is_active === true
+});
+
+const LIST_PACKAGES_SERVER = prepared('SELECT * FROM packages_server ORDER BY COALESCE(display_order, 999999), id');
+
 // Get all packages_server (ordered by display_order then id)
-app.get('/api/packages-server', (req, res) => {
-    const sql = 'SELECT * FROM packages_server ORDER BY COALESCE(display_order, 999999), id';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/packages-server', cached('packages_server'), (req, res) => {
+    db.all(LIST_PACKAGES_SERVER, [], (err, rows) => {
         if (err) return res.status(500).json({ error: err.message });
-        const list = rows.map(r => ({
-            ...r,
-            features: (() => { try { return JSON.parse(r.features || '[]'); } catch { return []; } })(),
-            is_active: r.is_active === 1 || r.is_active === true
-        }));
-        res.json(list);
+        res.json(rows.map(toPackage));
     });
 });
 
+const INSERT_PACKAGE_SERVER = prepared(`INSERT INTO packages_server (
+        title, description, price, delivery_time, features, category, is_active, display_order, icon_html
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`);
+
 // Create a new packages_server item
-app.post('/api/packages-server', (req, res) => {
+app.post('/api/packages-server', invalidates('packages_server'), (req, res) => {
     const {
         title,
         description,
@@ -106,10 +293,6 @@ app.post('/api/packages-server', (req, res) => {
         icon_html
     } = req.body;
 
-    const sql = `INSERT INTO packages_server (
-        title, description, price, delivery_time, features, category, is_active, display_order, icon_html
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-
     const params = [
         title || '',
         description || '',
@@ -122,14 +305,26 @@ app.post('/api/packages-server', (req, res) => {
         icon_html || null
     ];
 
-    db.run(sql, params, function(err) {
+    db.run(INSERT_PACKAGE_SERVER, params, function(err) {
         if (err) return res.status(500).json({ error: err.message });
         res.status(201).json({ message: 'PackageServer created', id: this.lastID });
     });
 });
 
+const UPDATE_PACKAGE_SERVER = prepared(`UPDATE packages_server SET 
+        title = ?,
+        description = ?,
+        price = ?,
+        delivery_time = ?,
+        features = ?,
+        category = ?,
+        is_active = ?,
+        display_order = ?,
+        icon_html = ?
+        WHERE id = ?`);
+
 // Update a packages_server item
-app.put('/api/packages-server/:id', (req, res) => {
+app.put('/api/packages-server/:id', invalidates('packages_server'), (req, res) => {
     const { id } = req.params;
     const {
         title,
@@ -143,18 +338,6 @@ app.put('/api/packages-server/:id', (req, res) => {
         icon_html
     } = req.body;
 
-    const sql = `UPDATE packages_server SET 
-        title = ?,
-        description = ?,
-        price = ?,
-        delivery_time = ?,
-        features = ?,
-        category = ?,
-        is_active = ?,
-        display_order = ?,
-        icon_html = ?
-        WHERE id = ?`;
-
     const params = [
         title || '',
         description || '',
@@ -168,17 +351,19 @@ app.put('/api/packages-server/:id', (req, res) => {
         parseInt(id)
     ];
 
-    db.run(sql, params, function(err) {
+    db.run(UPDATE_PACKAGE_SERVER, params, function(err) {
         if (err) return res.status(500).json({ error: err.message });
         if (this.changes === 0) return res.status(404).json({ error: 'PackageServer not found' });
         res.json({ message: 'PackageServer updated' });
     });
 });
 
+const DELETE_PACKAGE_SERVER = prepared('DELETE FROM packages_server WHERE id = ?');
+
 // Delete a packages_server item
-app.delete('/api/packages-server/:id', (req, res) => {
+app.delete('/api/packages-server/:id', invalidates('packages_server'), (req, res) => {
     const { id } = req.params;
-    db.run('DELETE FROM packages_server WHERE id = ?', [parseInt(id)], function(err) {
+    db.run(DELETE_PACKAGE_SERVER, [parseInt(id)], function(err) {
         if (err) return res.status(500).json({ error: err.message });
         if (this.changes === 0) return res.status(404).json({ error: 'PackageServer not found' });
         res.json({ message: 'PackageServer deleted' });
@@ -186,69 +371,41 @@ app.delete('/api/packages-server/:id', (req, res) => {
 });
 
 // ================= Packages CRUD (Admin) =================
+const LIST_PACKAGES = prepared('SELECT * FROM packages ORDER BY COALESCE(display_order, 999999), id');
+
 // Get all packages (ordered by display_order then id)
-app.get('/api/packages', (req, res) => {
-    const sql = 'SELECT * FROM packages ORDER BY COALESCE(display_order, 999999), id';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/packages', cached('packages'), (req, res) => {
+    db.all(LIST_PACKAGES, [], (err, rows) => {
         if (err) return res.status(500).json({ error: err.message });
-        const list = rows.map(r => ({
-            ...r,
-            features: (() => { try { return JSON.parse(r.features || '[]'); } catch { return []; } })(),
-            is_active: r.is_active === 1 || r.is_active === true
-        }));
-        res.json(list);
+        res.json(rows.map(toPackage));
     });
 });
 
-// Create a new package
-app.post('/api/packages', (req, res) => {
-    const {
-        title,
-        description,
-        price,
-        delivery_time,
-        features,
-        category,
-        is_active,
-        display_order
-    } = req.body;
-
-    const sql = `INSERT INTO packages (
+const INSERT_PACKAGE = prepared(`INSERT INTO packages (
         title, description, price, delivery_time, features, category, is_active, display_order
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)`;
-
-    const params = [
-        title || '',
-        description || '',
-        price ?? null,
-        delivery_time || null,
-        JSON.stringify(Array.isArray(features) ? features : []),
-        category || null,
-        is_active ? 1 : 0,
-        display_order ?? null
-    ];
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)`);
+
+// Column values for INSERT_PACKAGE / UPDATE_PACKAGE, shared with the batch route
+const packageParams = (body) => [
+    body.title || '',
+    body.description || '',
+    body.price ?? null,
+    body.delivery_time || null,
+    JSON.stringify(Array.isArray(body.features) ? body.features : []),
+    body.category || null,
+    body.is_active ? 1 : 0,
+    body.display_order ?? null
+];
 
-    db.run(sql, params, function(err) {
+// Create a new package
+app.post('/api/packages', invalidates('packages'), (req, res) => {
+    db.run(INSERT_PACKAGE, packageParams(req.body), function(err) {
         if (err) return res.status(500).json({ error: err.message });
         res.status(201).json({ message: 'Package created', id: this.lastID });
     });
 });
 
-// Update a package
-app.put('/api/packages/:id', (req, res) => {
-    const { id } = req.params;
-    const {
-        title,
-        description,
-        price,
-        delivery_time,
-        features,
-        category,
-        is_active,
-        display_order
-    } = req.body;
-
-    const sql = `UPDATE packages SET 
+const UPDATE_PACKAGE = prepared(`UPDATE packages SET 
         title = ?,
         description = ?,
         price = ?,
@@ -257,42 +414,44 @@ app.put('/api/packages/:id', (req, res) => {
         category = ?,
         is_active = ?,
         display_order = ?
-        WHERE id = ?`;
-
-    const params = [
-        title || '',
-        description || '',
-        price ?? null,
-        delivery_time || null,
-        JSON.stringify(Array.isArray(features) ? features : []),
-        category || null,
-        is_active ? 1 : 0,
-        display_order ?? null,
-        parseInt(id)
-    ];
+        WHERE id = ?`);
 
-    db.run(sql, params, function(err) {
+// Update a package
+app.put('/api/packages/:id', invalidates('packages'), (req, res) => {
+    const { id } = req.params;
+    db.run(UPDATE_PACKAGE, [...packageParams(req.body), parseInt(id)], function(err) {
         if (err) return res.status(500).json({ error: err.message });
         if (this.changes === 0) return res.status(404).json({ error: 'Package not found' });
         res.json({ message: 'Package updated' });
     });
 });
 
+const DELETE_PACKAGE = prepared('DELETE FROM packages WHERE id = ?');
+
 // Delete a package
-app.delete('/api/packages/:id', (req, res) => {
+app.delete('/api/packages/:id', invalidates('packages'), (req, res) => {
     const { id } = req.params;
-    db.run('DELETE FROM packages WHERE id = ?', [parseInt(id)], function(err) {
+    db.run(DELETE_PACKAGE, [parseInt(id)], function(err) {
         if (err) return res.status(500).json({ error: err.message });
         if (this.changes === 0) return res.status(404).json({ error: 'Package not found' });
         res.json({ message: 'Package deleted' });
     });
 });
 
+// Bulk create/update/delete and reorder in one transaction (lib/batch.js)
+app.post('/api/packages/batch', invalidates('packages'), batchRoute(db, {
+    table: 'packages',
+    insert: INSERT_PACKAGE,
+    update: UPDATE_PACKAGE,
+    remove: DELETE_PACKAGE,
+    reorder: prepared('UPDATE packages SET display_order = ? WHERE id = ?'),
+    createParams: packageParams,
+    updateParams: (data, id) => [...packageParams(data), parseInt(id)]
+}));
+
 // Create a new project request
 app.post('/api/project-requests', (req, res) => {
     const { name, company_name, requested_services, phone, email } = req.body;
-    const sql = `INSERT INTO project_requests (name, company_name, requested_services, phone, email)
-                 VALUES (?, ?, ?, ?, ?)`;
     const params = [
         name || '',
         company_name || '',
@@ -300,80 +459,64 @@ app.post('/api/project-requests', (req, res) => {
         phone || '',
         email || ''
     ];
-    db.run(sql, params, function(err) {
+    // Acknowledged once the batch holding this row has committed
+    const accepted = projectRequestQueue.push(params, (err, id) => {
         if (err) return res.status(500).json({ error: err.message });
-        res.status(201).json({ message: 'Request created', id: this.lastID });
+        res.status(201).json({ message: 'Request created', id });
     });
+    if (!accepted) rejectBusy(res);
 });
 
+const DELETE_PROJECT_REQUEST = prepared('DELETE FROM project_requests WHERE id = ?');
+
 // Delete a project request
 app.delete('/api/project-requests/:id', (req, res) => {
     const { id } = req.params;
-    db.run('DELETE FROM project_requests WHERE id = ?', [id], function(err) {
+    db.run(DELETE_PROJECT_REQUEST, [id], function(err) {
         if (err) return res.status(500).json({ error: err.message });
         if (this.changes === 0) return res.status(404).json({ error: 'Not found' });
         res.json({ message: 'Deleted' });
     });
 });
 
-// Path to the database
-const dbPath = path.resolve(__dirname, 'projects.db');
-const db = new sqlite3.Database(dbPath, (err) => {
-    if (err) {
-        console.error('Error opening database', err.message);
-    } else {
-        console.log('Connected to the projects database.');
-        // Ensure project_requests table exists
-        db.run(`CREATE TABLE IF NOT EXISTS project_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            company_name TEXT,
-            requested_services TEXT,
-            phone TEXT,
-            email TEXT
-        )`);
-        // Ensure packages table exists per required schema
-        db.run(`CREATE TABLE IF NOT EXISTS packages (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            description TEXT,
-            price REAL,
-            delivery_time TEXT,
-            features TEXT,
-            category TEXT,
-            is_active BOOLEAN,
-            display_order INTEGER
-        )`);
-        // Ensure packages_server table exists
-        db.run(`CREATE TABLE IF NOT EXISTS packages_server (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            description TEXT,
-            price REAL,
-            delivery_time TEXT,
-            features TEXT,
-            category TEXT,
-            is_active BOOLEAN,
-            display_order INTEGER,
-            icon_html TEXT
-        )`);
-    }
+// ================= Contact Requests =================
+app.post('/api/contact-requests', (req, res) => {
+    const { name, reason, other_reason, message, phone, email } = req.body;
+    if (!name || !reason) return res.status(400).json({ error: 'name and reason are required' });
+    const params = [name, reason, other_reason || '', message || '', phone || '', email || ''];
+    const accepted = contactRequestQueue.push(params, (err, id) => {
+        if (err) return res.status(500).json({ error: err.message });
+        res.status(201).json({ message: 'Request created', id });
+    });
+    if (!accepted) rejectBusy(res);
 });
 
 // API endpoint to get all projects
-app.get('/api/projects', (req, res) => {
-    const sql = 'SELECT * FROM projects';
-    db.all(sql, [], (err, rows) => {
-        if (err) {
-            res.status(500).json({ error: err.message });
-            return;
-        }
-        res.json(rows);
-    });
+// Paginated in insertion (rowid) order: project ids are free-form text
+const PROJECTS_LIST = {
+    table: 'projects',
+    key: ['rowid'],
+    fields: identityFields([
+        'id', 'title', 'description', 'category', 'status', 'completion', 'value', 'duration',
+        'location', 'client', 'image', 'startDate', 'endDate'
+    ])
+};
+
+const [LIST_PROJECTS] = streamStatements(PROJECTS_LIST).map(prepared);
+
+// Streamed once the list outgrows one chunk; shorter lists are still sent (and cached) whole
+app.get('/api/projects', cached('projects'), (req, res) => {
+    if (wantsListQuery(req.query)) return sendList(db, PROJECTS_LIST, req, res);
+    streamList(db, PROJECTS_LIST, req, res);
 });
 
+const INSERT_PROJECT = prepared(`INSERT INTO projects (
+        id, title, description, category, status, completion, 
+        value, duration, location, client, image, startDate, endDate
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`);
+
 // API endpoint to create a new project
-app.post('/api/projects', (req, res) => {
+app.post('/api/projects', invalidates('projects'), (req, res) => {
     const {
         id,
         title,
@@ -390,17 +533,12 @@ app.post('/api/projects', (req, res) => {
         endDate
     } = req.body;
 
-    const sql = `INSERT INTO projects (
-        id, title, description, category, status, completion, 
-        value, duration, location, client, image, startDate, endDate
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-
     const params = [
         id, title, description, category, status, completion,
         value, duration, location, client, image, startDate, endDate
     ];
 
-    db.run(sql, params, function(err) {
+    db.run(INSERT_PROJECT, params, function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -412,8 +550,14 @@ app.post('/api/projects', (req, res) => {
     });
 });
 
+const UPDATE_PROJECT = prepared(`UPDATE projects SET 
+        title = ?, description = ?, category = ?, status = ?, completion = ?,
+        value = ?, duration = ?, location = ?, client = ?, image = ?,
+        startDate = ?, endDate = ?
+        WHERE id = ?`);
+
 // API endpoint to update a project
-app.put('/api/projects/:id', (req, res) => {
+app.put('/api/projects/:id', invalidates('projects'), (req, res) => {
     const { id } = req.params;
     const {
         title,
@@ -430,18 +574,12 @@ app.put('/api/projects/:id', (req, res) => {
         endDate
     } = req.body;
 
-    const sql = `UPDATE projects SET 
-        title = ?, description = ?, category = ?, status = ?, completion = ?,
-        value = ?, duration = ?, location = ?, client = ?, image = ?,
-        startDate = ?, endDate = ?
-        WHERE id = ?`;
-
     const params = [
         title, description, category, status, completion,
         value, duration, location, client, image, startDate, endDate, id
     ];
 
-    db.run(sql, params, function(err) {
+    db.run(UPDATE_PROJECT, params, function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -454,12 +592,13 @@ app.put('/api/projects/:id', (req, res) => {
     });
 });
 
+const DELETE_PROJECT = prepared('DELETE FROM projects WHERE id = ?');
+
 // API endpoint to delete a project
-app.delete('/api/projects/:id', (req, res) => {
+app.delete('/api/projects/:id', invalidates('projects'), (req, res) => {
     const { id } = req.params;
-    const sql = 'DELETE FROM projects WHERE id = ?';
 
-    db.run(sql, [id], function(err) {
+    db.run(DELETE_PROJECT, [id], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -472,51 +611,41 @@ app.delete('/api/projects/:id', (req, res) => {
     });
 });
 
+const LIST_SERVICES = prepared('SELECT * FROM services');
+
+// Parse JSON strings back into arrays
+const toService = (service) => ({
+    ...service,
+    features: JSON.parse(service.features || '[]'),
+    benefits: JSON.parse(service.benefits || '[]'),
+});
+
 // API endpoint to get all services
-app.get('/api/services', (req, res) => {
-    const sql = 'SELECT * FROM services';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/services', cached('services'), (req, res) => {
+    db.all(LIST_SERVICES, [], (err, rows) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
         }
-        // Parse JSON strings back into arrays
-        const services = rows.map(service => ({
-            ...service,
-            features: JSON.parse(service.features || '[]'),
-            benefits: JSON.parse(service.benefits || '[]'),
-        }));
-        res.json(services);
+        res.json(rows.map(toService));
     });
 });
 
-// API endpoint to create a new service
-app.post('/api/services', (req, res) => {
-    const {
-        title,
-        description,
-        short_description,
-        icon,
-        image,
-        features,
-        benefits,
-        category,
-        is_active,
-        display_order
-    } = req.body;
-
-    const sql = `INSERT INTO services (
+const INSERT_SERVICE = prepared(`INSERT INTO services (
         title, description, short_description, icon, image,
         features, benefits, category, is_active, display_order
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`);
 
-    const params = [
-        title, description, short_description, icon, image,
-        JSON.stringify(features || []), JSON.stringify(benefits || []),
-        category, is_active ? 1 : 0, display_order
-    ];
+// Column values for INSERT_SERVICE / UPDATE_SERVICE, shared with the batch route
+const serviceParams = (body) => [
+    body.title, body.description, body.short_description, body.icon, body.image,
+    JSON.stringify(body.features || []), JSON.stringify(body.benefits || []),
+    body.category, body.is_active ? 1 : 0, body.display_order
+];
 
-    db.run(sql, params, function(err) {
+// API endpoint to create a new service
+app.post('/api/services', invalidates('services'), (req, res) => {
+    db.run(INSERT_SERVICE, serviceParams(req.body), function(err) {
         if (err) {
             console.error('Error creating service:', err.message);
             res.status(500).json({ error: err.message });
@@ -529,137 +658,120 @@ app.post('/api/services', (req, res) => {
     });
 });
 
-// API endpoint to update a service
-app.put('/api/services/:id', (req, res) => {
-    const { id } = req.params;
-    const {
-        title,
-        description,
-        short_description,
-        icon,
-        image,
-        features,
-        benefits,
-        category,
-        is_active,
-        display_order
-    } = req.body;
-
-    console.log('Updating service with ID:', id);
-    console.log('Update data:', req.body);
-
-    const sql = `UPDATE services SET 
+const UPDATE_SERVICE = prepared(`UPDATE services SET 
         title = ?, description = ?, short_description = ?, icon = ?, image = ?,
         features = ?, benefits = ?, category = ?, is_active = ?, display_order = ?
-        WHERE id = ?`;
+        WHERE id = ?`);
 
-    const params = [
-        title, description, short_description, icon, image,
-        JSON.stringify(features || []), JSON.stringify(benefits || []),
-        category, is_active ? 1 : 0, display_order, parseInt(id)
-    ];
+// API endpoint to update a service
+app.put('/api/services/:id', invalidates('services'), (req, res) => {
+    const { id } = req.params;
 
-    db.run(sql, params, function(err) {
+    db.run(UPDATE_SERVICE, [...serviceParams(req.body), parseInt(id)], function(err) {
         if (err) {
             console.error('Error updating service:', err.message);
             res.status(500).json({ error: err.message });
             return;
         }
         if (this.changes === 0) {
-            console.log('No service found with ID:', id);
             res.status(404).json({ error: 'Service not found' });
             return;
         }
-        console.log('Service updated successfully, changes:', this.changes);
         res.json({ message: 'Service updated successfully' });
     });
 });
 
+const DELETE_SERVICE = prepared('DELETE FROM services WHERE id = ?');
+
 // API endpoint to delete a service
-app.delete('/api/services/:id', (req, res) => {
+app.delete('/api/services/:id', invalidates('services'), (req, res) => {
     const { id } = req.params;
-    console.log('Deleting service with ID:', id);
-    
-    const sql = 'DELETE FROM services WHERE id = ?';
 
-    db.run(sql, [parseInt(id)], function(err) {
+    db.run(DELETE_SERVICE, [parseInt(id)], function(err) {
         if (err) {
             console.error('Error deleting service:', err.message);
             res.status(500).json({ error: err.message });
             return;
         }
         if (this.changes === 0) {
-            console.log('No service found with ID:', id);
             res.status(404).json({ error: 'Service not found' });
             return;
         }
-        console.log('Service deleted successfully, changes:', this.changes);
         res.json({ message: 'Service deleted successfully' });
     });
 });
 
+app.post('/api/services/batch', invalidates('services'), batchRoute(db, {
+    table: 'services',
+    insert: INSERT_SERVICE,
+    update: UPDATE_SERVICE,
+    remove: DELETE_SERVICE,
+    reorder: prepared('UPDATE services SET display_order = ? WHERE id = ?'),
+    createParams: serviceParams,
+    updateParams: (data, id) => [...serviceParams(data), parseInt(id)]
+}));
+
+// Transform database rows to match frontend Testimonial interface
+const toTestimonial = (row) => ({
+    id: row.id,
+    clientName: row.name,
+    clientPosition: row.position,
+    company: row.department,
+    projectName: row.specialty,
+    projectValue: row.experience, // Using experience as project value
+    projectDuration: row.experience,
+    testimonialText: row.bio,
+    rating: 5, // Default rating since not in DB
+    date: row.joinDate,
+    clientImage: row.image,
+    projectImage: row.image, // Using same image for both
+    isActive: row.isActive === 1,
+    order: row.ordering
+});
+
+// fields= uses the Testimonial names; each maps to the column it is built from
+const REVIEWS_LIST = {
+    table: 'reviews',
+    key: ['COALESCE(ordering, 999999)', 'id'],
+    fields: {
+        id: 'id', clientName: 'name', clientPosition: 'position', company: 'department',
+        projectName: 'specialty', projectValue: 'experience', projectDuration: 'experience',
+        testimonialText: 'bio', rating: null, date: 'joinDate', clientImage: 'image',
+        projectImage: 'image', isActive: 'isActive', order: 'ordering'
+    },
+    transform: toTestimonial
+};
+
+const LIST_REVIEWS = prepared('SELECT * FROM reviews ORDER BY ordering ASC');
+
 // API endpoint to get all reviews/testimonials
-app.get('/api/reviews', (req, res) => {
-    const sql = 'SELECT * FROM reviews ORDER BY ordering ASC';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/reviews', cached('reviews'), (req, res) => {
+    if (wantsListQuery(req.query)) return sendList(db, REVIEWS_LIST, req, res);
+    db.all(LIST_REVIEWS, [], (err, rows) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
         }
-        // Transform database rows to match frontend Testimonial interface
-        const testimonials = rows.map(row => ({
-            id: row.id,
-            clientName: row.name,
-            clientPosition: row.position,
-            company: row.department,
-            projectName: row.specialty,
-            projectValue: row.experience, // Using experience as project value
-            projectDuration: row.experience,
-            testimonialText: row.bio,
-            rating: 5, // Default rating since not in DB
-            date: row.joinDate,
-            clientImage: row.image,
-            projectImage: row.image, // Using same image for both
-            isActive: row.isActive === 1,
-            order: row.ordering
-        }));
-        res.json(testimonials);
+        res.json(rows.map(toTestimonial));
     });
 });
 
-// API endpoint to create a new review/testimonial
-app.post('/api/reviews', (req, res) => {
-    const {
-        name,
-        position,
-        department,
-        bio,
-        email,
-        phone,
-        linkedin,
-        image,
-        experience,
-        specialty,
-        achievements,
-        skills,
-        isActive,
-        ordering,
-        joinDate
-    } = req.body;
-
-    const sql = `INSERT INTO reviews (
+const INSERT_REVIEW = prepared(`INSERT INTO reviews (
         id, name, position, department, bio, email, phone, linkedin,
         image, experience, specialty, achievements, skills, isActive, ordering, joinDate
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`);
 
-    const id = Date.now().toString();
-    const params = [
-        id, name, position, department, bio, email, phone, linkedin,
-        image, experience, specialty, achievements, skills,
-        isActive ? 1 : 0, ordering, joinDate
-    ];
+// Column values for INSERT_REVIEW (after the id) / UPDATE_REVIEW, shared with the batch route
+const reviewParams = (body) => [
+    body.name, body.position, body.department, body.bio, body.email, body.phone, body.linkedin,
+    body.image, body.experience, body.specialty, body.achievements, body.skills,
+    body.isActive ? 1 : 0, body.ordering, body.joinDate
+];
 
-    db.run(sql, params, function(err) {
+// API endpoint to create a new review/testimonial
+app.post('/api/reviews', invalidates('reviews'), (req, res) => {
+    const id = newTextId();
+    db.run(INSERT_REVIEW, [id, ...reviewParams(req.body)], function(err) {
         if (err) {
             console.error('Error creating review:', err.message);
             res.status(500).json({ error: err.message });
@@ -672,141 +784,128 @@ app.post('/api/reviews', (req, res) => {
     });
 });
 
-// API endpoint to update a review/testimonial
-app.put('/api/reviews/:id', (req, res) => {
-    const { id } = req.params;
-    const {
-        name,
-        position,
-        department,
-        bio,
-        email,
-        phone,
-        linkedin,
-        image,
-        experience,
-        specialty,
-        achievements,
-        skills,
-        isActive,
-        ordering,
-        joinDate
-    } = req.body;
-
-    console.log('Updating review with ID:', id);
-    console.log('Update data:', req.body);
-
-    const sql = `UPDATE reviews SET 
+const UPDATE_REVIEW = prepared(`UPDATE reviews SET 
         name = ?, position = ?, department = ?, bio = ?, email = ?, phone = ?, linkedin = ?,
         image = ?, experience = ?, specialty = ?, achievements = ?, skills = ?, isActive = ?, ordering = ?, joinDate = ?
-        WHERE id = ?`;
+        WHERE id = ?`);
 
-    const params = [
-        name, position, department, bio, email, phone, linkedin,
-        image, experience, specialty, achievements, skills,
-        isActive ? 1 : 0, ordering, joinDate, id
-    ];
+// API endpoint to update a review/testimonial
+app.put('/api/reviews/:id', invalidates('reviews'), (req, res) => {
+    const { id } = req.params;
 
-    db.run(sql, params, function(err) {
+    db.run(UPDATE_REVIEW, [...reviewParams(req.body), id], function(err) {
         if (err) {
             console.error('Error updating review:', err.message);
             res.status(500).json({ error: err.message });
             return;
         }
         if (this.changes === 0) {
-            console.log('No review found with ID:', id);
             res.status(404).json({ error: 'Review not found' });
             return;
         }
-        console.log('Review updated successfully, changes:', this.changes);
         res.json({ message: 'Review updated successfully' });
     });
 });
 
+const DELETE_REVIEW = prepared('DELETE FROM reviews WHERE id = ?');
+
 // API endpoint to delete a review/testimonial
-app.delete('/api/reviews/:id', (req, res) => {
+app.delete('/api/reviews/:id', invalidates('reviews'), (req, res) => {
     const { id } = req.params;
-    console.log('Deleting review with ID:', id);
-    
-    const sql = 'DELETE FROM reviews WHERE id = ?';
 
-    db.run(sql, [id], function(err) {
+    db.run(DELETE_REVIEW, [id], function(err) {
         if (err) {
             console.error('Error deleting review:', err.message);
             res.status(500).json({ error: err.message });
             return;
         }
         if (this.changes === 0) {
-            console.log('No review found with ID:', id);
             res.status(404).json({ error: 'Review not found' });
             return;
         }
-        console.log('Review deleted successfully, changes:', this.changes);
         res.json({ message: 'Review deleted successfully' });
     });
 });
 
+app.post('/api/reviews/batch', invalidates('reviews'), batchRoute(db, {
+    table: 'reviews',
+    insert: INSERT_REVIEW,
+    update: UPDATE_REVIEW,
+    remove: DELETE_REVIEW,
+    reorder: prepared('UPDATE reviews SET ordering = ? WHERE id = ?'),
+    newId: newTextId,
+    createParams: (data, id) => [id, ...reviewParams(data)],
+    updateParams: (data, id) => [...reviewParams(data), id]
+}));
+
+const LIST_FAQ_CATEGORIES = prepared('SELECT * FROM faq_categories ORDER BY key');
+
+// Add 'all' category at the beginning
+const withAllCategory = (rows) => [
+    { key: 'all', label: 'جميع الأسئلة' },
+    ...rows
+];
+
 // API endpoint to get FAQ categories
-app.get('/api/faq-categories', (req, res) => {
-    const sql = 'SELECT * FROM faq_categories ORDER BY key';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/faq-categories', cached('faq_categories'), (req, res) => {
+    db.all(LIST_FAQ_CATEGORIES, [], (err, rows) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
         }
-        // Add 'all' category at the beginning
-        const categories = [
-            { key: 'all', label: 'جميع الأسئلة' },
-            ...rows
-        ];
-        res.json(categories);
+        res.json(withAllCategory(rows));
     });
 });
 
+const LIST_ACTIVE_TEAM_MEMBERS = prepared('SELECT * FROM team_members WHERE isActive = 1 ORDER BY "order" ASC');
+const LIST_TEAM_MEMBERS = prepared('SELECT * FROM team_members ORDER BY "order" ASC');
+
+const toTeamMember = (member) => ({
+    ...member,
+    achievements: JSON.parse(member.achievements || '[]'),
+    skills: JSON.parse(member.skills || '[]'),
+    isActive: Boolean(member.isActive)
+});
+
 // API endpoint to get all FAQs
 // API endpoint to get team members
-app.get('/api/team-members', (req, res) => {
+app.get('/api/team-members', cached('team_members'), (req, res) => {
     // For admin panel, return all members; for public, filter by isActive
     const { activeOnly } = req.query;
     const sql = activeOnly === 'true' 
-        ? 'SELECT * FROM team_members WHERE isActive = 1 ORDER BY "order" ASC'
-        : 'SELECT * FROM team_members ORDER BY "order" ASC';
-    
+        ? LIST_ACTIVE_TEAM_MEMBERS
+        : LIST_TEAM_MEMBERS;
+
     db.all(sql, [], (err, rows) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
         }
-        const teamMembers = rows.map(member => ({
-            ...member,
-            achievements: JSON.parse(member.achievements || '[]'),
-            skills: JSON.parse(member.skills || '[]'),
-            isActive: Boolean(member.isActive)
-        }));
-        res.json(teamMembers);
+        res.json(rows.map(toTeamMember));
     });
 });
 
+const INSERT_TEAM_MEMBER = prepared(`INSERT INTO team_members (
+        id, name, position, department, bio, email, phone, linkedin, image,
+        experience, specialty, achievements, skills, isActive, "order", joinDate
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`);
+
+// Column values for INSERT_TEAM_MEMBER (after the id) / UPDATE_TEAM_MEMBER, shared with the batch route
+const teamMemberParams = (body) => [
+    body.name, body.position, body.department, body.bio, body.email, body.phone, body.linkedin, body.image,
+    body.experience, body.specialty, JSON.stringify(body.achievements || []), JSON.stringify(body.skills || []),
+    body.isActive ? 1 : 0, body.order || 1, body.joinDate
+];
+
 // API endpoint to create a new team member
-app.post('/api/team-members', (req, res) => {
+app.post('/api/team-members', invalidates('team_members'), (req, res) => {
     const {
         name, position, department, bio, email, phone, linkedin, image,
         experience, specialty, achievements, skills, isActive, order, joinDate
     } = req.body;
     
-    const sql = `INSERT INTO team_members (
-        id, name, position, department, bio, email, phone, linkedin, image,
-        experience, specialty, achievements, skills, isActive, "order", joinDate
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-    
-    const id = Date.now().toString();
-    const achievementsJson = JSON.stringify(achievements || []);
-    const skillsJson = JSON.stringify(skills || []);
-    
-    db.run(sql, [
-        id, name, position, department, bio, email, phone, linkedin, image,
-        experience, specialty, achievementsJson, skillsJson, isActive ? 1 : 0, order || 1, joinDate
-    ], function(err) {
+    const id = newTextId();
+    db.run(INSERT_TEAM_MEMBER, [id, ...teamMemberParams(req.body)], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -819,27 +918,21 @@ app.post('/api/team-members', (req, res) => {
     });
 });
 
+const UPDATE_TEAM_MEMBER = prepared(`UPDATE team_members SET 
+        name = ?, position = ?, department = ?, bio = ?, email = ?, phone = ?, 
+        linkedin = ?, image = ?, experience = ?, specialty = ?, achievements = ?, 
+        skills = ?, isActive = ?, "order" = ?, joinDate = ?
+        WHERE id = ?`);
+
 // API endpoint to update a team member
-app.put('/api/team-members/:id', (req, res) => {
+app.put('/api/team-members/:id', invalidates('team_members'), (req, res) => {
     const { id } = req.params;
     const {
         name, position, department, bio, email, phone, linkedin, image,
         experience, specialty, achievements, skills, isActive, order, joinDate
     } = req.body;
     
-    const sql = `UPDATE team_members SET 
-        name = ?, position = ?, department = ?, bio = ?, email = ?, phone = ?, 
-        linkedin = ?, image = ?, experience = ?, specialty = ?, achievements = ?, 
-        skills = ?, isActive = ?, "order" = ?, joinDate = ?
-        WHERE id = ?`;
-    
-    const achievementsJson = JSON.stringify(achievements || []);
-    const skillsJson = JSON.stringify(skills || []);
-    
-    db.run(sql, [
-        name, position, department, bio, email, phone, linkedin, image,
-        experience, specialty, achievementsJson, skillsJson, isActive ? 1 : 0, order || 1, joinDate, id
-    ], function(err) {
+    db.run(UPDATE_TEAM_MEMBER, [...teamMemberParams(req.body), id], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -856,12 +949,13 @@ app.put('/api/team-members/:id', (req, res) => {
     });
 });
 
+const DELETE_TEAM_MEMBER = prepared('DELETE FROM team_members WHERE id = ?');
+
 // API endpoint to delete a team member
-app.delete('/api/team-members/:id', (req, res) => {
+app.delete('/api/team-members/:id', invalidates('team_members'), (req, res) => {
     const { id } = req.params;
-    const sql = 'DELETE FROM team_members WHERE id = ?';
     
-    db.run(sql, [id], function(err) {
+    db.run(DELETE_TEAM_MEMBER, [id], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -874,10 +968,20 @@ app.delete('/api/team-members/:id', (req, res) => {
     });
 });
 
+app.post('/api/team-members/batch', invalidates('team_members'), batchRoute(db, {
+    table: 'team_members',
+    insert: INSERT_TEAM_MEMBER,
+    update: UPDATE_TEAM_MEMBER,
+    remove: DELETE_TEAM_MEMBER,
+    reorder: prepared('UPDATE team_members SET "order" = ? WHERE id = ?'),
+    newId: newTextId,
+    createParams: (data, id) => [id, ...teamMemberParams(data)],
+    updateParams: (data, id) => [...teamMemberParams(data), id]
+}));
+
 // API endpoints for FAQ Categories
-app.get('/api/faq-categories', (req, res) => {
-    const sql = 'SELECT * FROM faq_categories ORDER BY key';
-    db.all(sql, [], (err, rows) => {
+app.get('/api/faq-categories', cached('faq_categories'), (req, res) => {
+    db.all(LIST_FAQ_CATEGORIES, [], (err, rows) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -886,10 +990,11 @@ app.get('/api/faq-categories', (req, res) => {
     });
 });
 
-app.post('/api/faq-categories', (req, res) => {
+const INSERT_FAQ_CATEGORY = prepared('INSERT INTO faq_categories (key, label) VALUES (?, ?)');
+
+app.post('/api/faq-categories', invalidates('faq_categories'), (req, res) => {
     const { key, label } = req.body;
-    const sql = 'INSERT INTO faq_categories (key, label) VALUES (?, ?)';
-    db.run(sql, [key, label], function(err) {
+    db.run(INSERT_FAQ_CATEGORY, [key, label], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -898,11 +1003,12 @@ app.post('/api/faq-categories', (req, res) => {
     });
 });
 
-app.put('/api/faq-categories/:key', (req, res) => {
+const UPDATE_FAQ_CATEGORY = prepared('UPDATE faq_categories SET label = ? WHERE key = ?');
+
+app.put('/api/faq-categories/:key', invalidates('faq_categories'), (req, res) => {
     const { key } = req.params;
     const { label } = req.body;
-    const sql = 'UPDATE faq_categories SET label = ? WHERE key = ?';
-    db.run(sql, [label, key], function(err) {
+    db.run(UPDATE_FAQ_CATEGORY, [label, key], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -915,10 +1021,13 @@ app.put('/api/faq-categories/:key', (req, res) => {
     });
 });
 
-app.delete('/api/faq-categories/:key', (req, res) => {
+const COUNT_FAQS_IN_CATEGORY = prepared('SELECT COUNT(*) as count FROM faqs WHERE category = ?');
+const DELETE_FAQ_CATEGORY = prepared('DELETE FROM faq_categories WHERE key = ?');
+
+app.delete('/api/faq-categories/:key', invalidates('faq_categories'), (req, res) => {
     const { key } = req.params;
     // First check if there are FAQs using this category
-    db.get('SELECT COUNT(*) as count FROM faqs WHERE category = ?', [key], (err, row) => {
+    db.get(COUNT_FAQS_IN_CATEGORY, [key], (err, row) => {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -928,8 +1037,7 @@ app.delete('/api/faq-categories/:key', (req, res) => {
             return;
         }
         
-        const sql = 'DELETE FROM faq_categories WHERE key = ?';
-        db.run(sql, [key], function(err) {
+        db.run(DELETE_FAQ_CATEGORY, [key], function(err) {
             if (err) {
                 res.status(500).json({ error: err.message });
                 return;
@@ -944,13 +1052,24 @@ app.delete('/api/faq-categories/:key', (req, res) => {
 });
 
 // API endpoints for FAQs
-app.get('/api/faqs', (req, res) => {
+const FAQS_LIST = {
+    table: 'faqs',
+    key: ['id'],
+    fields: identityFields(['id', 'category', 'question', 'answer']),
+    filter: ({ category }) => (category && category !== 'all' ? [['category = ?'], [category]] : [[], []])
+};
+
+const LIST_FAQS = prepared('SELECT * FROM faqs ORDER BY id');
+const LIST_FAQS_BY_CATEGORY = prepared('SELECT * FROM faqs WHERE category = ? ORDER BY id');
+
+app.get('/api/faqs', cached('faqs'), (req, res) => {
+    if (wantsListQuery(req.query)) return sendList(db, FAQS_LIST, req, res);
     const { category } = req.query;
-    let sql = 'SELECT * FROM faqs ORDER BY id';
+    let sql = LIST_FAQS;
     let params = [];
     
     if (category && category !== 'all') {
-        sql = 'SELECT * FROM faqs WHERE category = ? ORDER BY id';
+        sql = LIST_FAQS_BY_CATEGORY;
         params = [category];
     }
     
@@ -963,10 +1082,11 @@ app.get('/api/faqs', (req, res) => {
     });
 });
 
-app.post('/api/faqs', (req, res) => {
+const INSERT_FAQ = prepared('INSERT INTO faqs (category, question, answer) VALUES (?, ?, ?)');
+
+app.post('/api/faqs', invalidates('faqs'), (req, res) => {
     const { category, question, answer } = req.body;
-    const sql = 'INSERT INTO faqs (category, question, answer) VALUES (?, ?, ?)';
-    db.run(sql, [category, question, answer], function(err) {
+    db.run(INSERT_FAQ, [category, question, answer], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -975,11 +1095,12 @@ app.post('/api/faqs', (req, res) => {
     });
 });
 
-app.put('/api/faqs/:id', (req, res) => {
+const UPDATE_FAQ = prepared('UPDATE faqs SET category = ?, question = ?, answer = ? WHERE id = ?');
+
+app.put('/api/faqs/:id', invalidates('faqs'), (req, res) => {
     const { id } = req.params;
     const { category, question, answer } = req.body;
-    const sql = 'UPDATE faqs SET category = ?, question = ?, answer = ? WHERE id = ?';
-    db.run(sql, [category, question, answer, id], function(err) {
+    db.run(UPDATE_FAQ, [category, question, answer, id], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -992,10 +1113,11 @@ app.put('/api/faqs/:id', (req, res) => {
     });
 });
 
-app.delete('/api/faqs/:id', (req, res) => {
+const DELETE_FAQ = prepared('DELETE FROM faqs WHERE id = ?');
+
+app.delete('/api/faqs/:id', invalidates('faqs'), (req, res) => {
     const { id } = req.params;
-    const sql = 'DELETE FROM faqs WHERE id = ?';
-    db.run(sql, [id], function(err) {
+    db.run(DELETE_FAQ, [id], function(err) {
         if (err) {
             res.status(500).json({ error: err.message });
             return;
@@ -1008,9 +1130,144 @@ app.delete('/api/faqs/:id', (req, res) => {
     });
 });
 
+// ================= Homepage =================
+// Every landing-page section in one response: the queries run concurrently on the reader pool
+// and the combined body is cached, versioned and compressed as one unit.
+// Each section renders exactly like its own endpoint (team-members as with activeOnly=true).
+const HOMEPAGE_SECTIONS = {
+    services: { sql: LIST_SERVICES, render: rows => rows.map(toService) },
+    packages: { sql: LIST_PACKAGES, render: rows => rows.map(toPackage) },
+    'packages-server': { sql: LIST_PACKAGES_SERVER, render: rows => rows.map(toPackage) },
+    'team-members': { sql: LIST_ACTIVE_TEAM_MEMBERS, render: rows => rows.map(toTeamMember) },
+    reviews: { sql: LIST_REVIEWS, render: rows => rows.map(toTestimonial) },
+    'faq-categories': { sql: LIST_FAQ_CATEGORIES, render: withAllCategory },
+    faqs: { sql: LIST_FAQS, render: rows => rows }
+};
+
+app.get('/api/homepage',
+    cached('services', 'packages', 'packages_server', 'team_members', 'reviews', 'faq_categories', 'faqs'),
+    (req, res) => {
+        const names = req.query.sections
+            ? [...new Set(String(req.query.sections).split(',').filter(Boolean))]
+            : Object.keys(HOMEPAGE_SECTIONS);
+        const unknown = names.filter(name => !Object.hasOwn(HOMEPAGE_SECTIONS, name));
+        if (names.length === 0 || unknown.length) {
+            return res.status(400).json({ error: `Unknown sections: ${unknown.join(', ') || '(none requested)'}` });
+        }
+
+        Promise.all(names.map(name => new Promise((resolve, reject) => {
+            const { sql, render } = HOMEPAGE_SECTIONS[name];
+            db.all(sql, [], (err, rows) => {
+                if (err) return reject(err);
+                try {
+                    resolve([name, render(rows)]);
+                } catch (renderErr) {
+                    reject(renderErr);
+                }
+            });
+        })))
+            .then(sections => res.json(Object.fromEntries(sections)))
+            .catch(err => res.status(500).json({ error: err.message }));
+    }
+);
+
+// ================= Change feed =================
+// change_log is filled by triggers (python -m database.migrations, migration 8) whoever writes;
+// consumers tail it by long-poll or SSE instead of re-reading whole tables (lib/changes.js)
+const changeFeed = new ChangeFeed(db, { pollMs: parseInt(process.env.CHANGES_POLL_MS ?? '250', 10) });
+ChangeFeed.statements().forEach(prepared);
+
+app.get('/api/changes', changeFeed.route());
+
+// ================= Search =================
+// FTS5 tables (fts_<table>) are built by `python -m database.migrations` and kept in sync by triggers.
+// Indexed text is stored normalized, so the query must be normalized the same way (database/search.py).
+const ARABIC_FOLDS = { 'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي', 'ؤ': 'و', 'ئ': 'ي' };
+const normalizeArabic = (text) => String(text || '')
+    .replace(/[\u064B-\u0652\u0670\u0640]/g, '')
+    .replace(/[أإآٱةىؤئ]/g, ch => ARABIC_FOLDS[ch]);
+
+const SEARCH_SOURCES = {
+    faqs: 'question',
+    services: 'title',
+    projects: 'title',
+    team_members: 'name'
+};
+
+app.get('/api/search', cached('faqs', 'services', 'projects', 'team_members'), (req, res) => {
+    const { q, sources } = req.query;
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
+    const terms = normalizeArabic(q).match(/[\p{L}\p{N}_]+/gu) || [];
+    if (terms.length === 0) return res.json([]);
+    const match = terms.map(t => `"${t}"*`).join(' ');
+
+    // Source names end up in the SQL, so only the table's own keys pass (not constructor, __proto__, ...)
+    const tables = sources
+        ? [...new Set(String(sources).split(',').filter(Boolean))]
+        : Object.keys(SEARCH_SOURCES);
+    const unknown = tables.filter(t => !Object.hasOwn(SEARCH_SOURCES, t));
+    if (tables.length === 0 || unknown.length) {
+        return res.status(400).json({ error: `Unknown search sources: ${unknown.join(', ') || '(none requested)'}` });
+    }
+
+    const sql = tables.map(t => `SELECT '${t}' AS source, s.id AS id, s.${SEARCH_SOURCES[t]} AS title,
+            -bm25(fts_${t}) AS score, snippet(fts_${t}, -1, '[', ']', '…', 12) AS snippet
+        FROM fts_${t} JOIN ${t} s ON s.rowid = fts_${t}.rowid
+        WHERE fts_${t} MATCH ?`).join(' UNION ALL ') + ' ORDER BY score DESC LIMIT ?';
+
+    db.all(sql, [...tables.map(() => match), limit], (err, rows) => {
+        if (err) {
+            if (/no such table: fts_/.test(err.message)) {
+                return res.status(503).json({ error: 'Search index not built' });
+            }
+            return res.status(500).json({ error: err.message });
+        }
+        res.json(rows);
+    });
+});
+
 // Serve static files from the root directory
 app.use(express.static(__dirname));
 
-app.listen(port, () => {
+// Schema, prepared statements and a warm page cache are in place before the port opens
+try {
+    const { statements, failed, ms } = await db.bootstrap({
+        schema: SCHEMA,
+        statements: [...PREPARED, projectRequestQueue.sql, contactRequestQueue.sql],
+        warm: [LIST_PACKAGES, LIST_PACKAGES_SERVER, LIST_SERVICES, LIST_REVIEWS, LIST_TEAM_MEMBERS,
+            LIST_FAQ_CATEGORIES, LIST_FAQS, LIST_PROJECTS]
+    });
+    console.log(`Database ready: ${statements} statements prepared in ${ms}ms`);
+    changeFeed.start();
+    // Long-lived connections should run PRAGMA optimize now and then (python -m database.maintenance does the rest)
+    const optimizeEvery = parseInt(process.env.DB_OPTIMIZE_INTERVAL_MS ?? '3600000', 10);
+    if (optimizeEvery > 0 && slot === 0) {
+        const optimize = () => db.optimize(err => err && console.warn('PRAGMA optimize failed:', err.message));
+        optimize();
+        setInterval(optimize, optimizeEvery).unref();
+    }
+    for (const { sql, error } of failed) {
+        console.warn(`Not prepared (${error}): ${sql} - run python -m database.migrations`);
+    }
+} catch (err) {
+    console.error('Database startup failed:', err.message);
+    process.exit(1);
+}
+
+const server = app.listen(port, () => {
     console.log(`Server running at http://localhost:${port}/`);
 });
+
+// Graceful shutdown (SIGTERM/SIGINT, or a drain request from cluster.js): stop accepting connections,
+// let in-flight requests finish (their queued submissions commit first), then close the database.
+// Long-poll and SSE clients are cut after SHUTDOWN_GRACE_MS and reconnect elsewhere.
+onShutdown(() => {
+    setTimeout(() => server.closeAllConnections(), parseInt(process.env.SHUTDOWN_GRACE_MS ?? '5000', 10)).unref();
+    server.close(() => {
+        const finish = () => {
+            if (projectRequestQueue.depth || contactRequestQueue.depth) return setTimeout(finish, 10);
+            db.close(() => process.exit(0));
+        };
+        finish();
+    });
+});
@@ -0,0 +1,35 @@
+import http.client
+import json
+import sqlite3
+
+
+class Api:
+    def __init__(self, server):
+        self.server = server
+        self.db_path = server.db_path
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection('127.0.0.1', self.server.port, timeout=10)
+        try:
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            payload = json.dumps(body, ensure_ascii=False).encode() if body is not None else None
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, json.loads(data) if data else None
+        finally:
+            conn.close()
+
+    def get(self, path):
+        return self.request('GET', path)
+
+    def post(self, path, body):
+        return self.request('POST', path, body)
+
+    def row(self, sql, params=()):
+        # قراءة من اتصال مستقل: ترى ما التُزم به فقط
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchone()
+        finally:
+            conn.close()
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmarks.server import ServerProcess, node_available
+from database import fixtures
+from tests.client import Api
+
+# اختبارات بايثون تعمل على نسخة في الذاكرة من القاعدة المبذورة (fixtures.memory)، واختبارات HTTP
+# تشغّل server.js على ملف مؤقت من نفس الصورة (fixtures.write) أو في ذاكرته (DB_FIXTURE)
+
+
+@pytest.fixture
+def db():
+    conn = fixtures.memory()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    if not node_available():
+        pytest.skip('node is required for the HTTP tests')
+    workdir = tmp_path_factory.mktemp('server')
+    path = fixtures.write(workdir / 'projects.db')
+    # نافذة تجميع واسعة حتى تقع الطلبات المتزامنة في دفعة واحدة
+    env = {'INGEST_FLUSH_MS': '50', 'INGEST_BATCH_SIZE': '100', 'DB_OPTIMIZE_INTERVAL_MS': '0'}
+    with ServerProcess(path, workdir, env=env) as server:
+        yield Api(server)
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+from benchmarks.server import ServerProcess, node_available
+from database import fixtures
+from tests.client import Api
+
+
+def walk(api, path):
+    # يتبع nextCursor حتى null ويعيد كل الصفوف بالترتيب
+    items, cursor, pages = [], None, 0
+    while True:
+        status, body = api.get(path + (f'&cursor={cursor}' if cursor else ''))
+        assert status == 200
+        items += body['items']
+        pages += 1
+        cursor = body['nextCursor']
+        if cursor is None:
+            return items, body['total'], pages
+
+
+@pytest.mark.parametrize('path, full', [
+    ('/api/faqs?limit=3', '/api/faqs'),
+    ('/api/faqs?category=general&limit=1', '/api/faqs?category=general'),
+    ('/api/reviews?limit=1&fields=id', '/api/reviews'),
+])
+def test_keyset_pages_round_trip_to_the_full_list(api, path, full):
+    items, total, pages = walk(api, path)
+    status, everything = api.get(full)
+
+    assert status == 200
+    assert [item['id'] for item in items] == [row['id'] for row in everything]
+    assert total == len(everything)
+    assert pages > 1
+
+
+def test_filtered_field_list_without_limit_keeps_the_filter(api):
+    # بلا limit تُقرأ القائمة على دفعات (streamList)؛ كل دفعة يجب أن تطبّق category
+    status, everything = api.get('/api/faqs?category=general')
+    assert status == 200
+    status, projected = api.get('/api/faqs?category=general&fields=id,category')
+
+    assert status == 200
+    assert projected == [{'id': row['id'], 'category': 'general'} for row in everything]
+
+
+@pytest.mark.parametrize('sources', ['constructor', '__proto__', 'faqs,toString', 'nope'])
+def test_search_rejects_unknown_sources_before_they_reach_sql(api, sources):
+    status, body = api.get(f'/api/search?q=test&sources={sources}')
+    assert status == 400
+    assert body['error'].startswith('Unknown search sources')
+
+
+def test_search_accepts_known_sources(api):
+    status, body = api.get('/api/search?q=test&sources=faqs,services')
+    assert status == 200
+    assert isinstance(body, list)
+
+
+def test_invalid_cursor_is_rejected(api):
+    status, body = api.get('/api/faqs?limit=3&cursor=not-a-cursor')
+    assert status == 400
+    assert body['error'] == 'Invalid cursor'
+
+
+def test_atomic_batch_failure_rolls_back_every_operation(api):
+    row = api.row('SELECT * FROM packages WHERE id = 1')
+    version = api.row("SELECT version FROM table_versions WHERE name = 'packages'")
+
+    status, body = api.post('/api/packages/batch?atomic=true', {'operations': [
+        {'op': 'update', 'id': 1, 'data': {'title': 'changed'}},
+        {'op': 'reorder', 'ids': [3, 1, 2]},
+        {'op': 'delete', 'id': 999999},
+    ]})
+
+    assert status == 409
+    assert body['committed'] is False
+    assert [result['status'] for result in body['results']] == [200, 200, 404]
+    assert api.row('SELECT * FROM packages WHERE id = 1') == row
+    assert api.row("SELECT version FROM table_versions WHERE name = 'packages'") == version
+    status, packages = api.get('/api/packages')
+    assert next(p for p in packages if p['id'] == 1)['title'] == row[1]
+
+
+def test_submissions_are_acknowledged_only_after_their_batch_commits(api):
+    _, before = api.get('/api/ingest-stats')
+    results, errors = [], []
+
+    def submit(i):
+        try:
+            status, body = api.post('/api/project-requests', {'name': f'client {i}', 'email': f'c{i}@example.com'})
+            # قراءة من اتصال آخر فور الرد: الصف يجب أن يكون ملتزمًا
+            results.append((status, api.row('SELECT name FROM project_requests WHERE id = ?', (body['id'],))))
+        except Exception as e:  # يُعرض في التأكيد أدناه بدل أن يضيع في الخيط
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(status for status, _ in results) == [201] * 20
+    assert all(row is not None for _, row in results)
+    _, after = api.get('/api/ingest-stats')
+    committed = after[0]['committed'] - before[0]['committed']
+    batches = after[0]['batches'] - before[0]['batches']
+    assert committed == 20
+    assert batches < committed
+
+
+@pytest.mark.skipif(not node_available(), reason='node is required for the HTTP tests')
+def test_server_runs_on_an_in_memory_copy_of_a_fixture(tmp_path):
+    fixture = fixtures.write(tmp_path / 'fixture.db')
+    env = {'DB_PATH': ':memory:', 'DB_FIXTURE': str(fixture), 'DB_OPTIMIZE_INTERVAL_MS': '0'}
+    with ServerProcess(tmp_path / 'unused.db', tmp_path, env=env) as server:
+        status, packages = Api(server).get('/api/packages')
+
+    conn = fixtures.memory()
+    try:
+        assert status == 200
+        assert len(packages) == conn.execute('SELECT COUNT(*) FROM packages').fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,48 @@
+import pytest
+
+from database import bulk, fixtures
+from database.core import connect
+
+
+def indexes(path, table):
+    conn = connect(path)
+    try:
+        return sorted(row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_schema WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        ))
+    finally:
+        conn.close()
+
+
+def faqs(ids):
+    return [{'id': i, 'category': 'general', 'question': f'q{i}', 'answer': 'a'} for i in ids]
+
+
+def test_failed_load_keeps_the_indexes_and_reports_the_committed_rows(tmp_path):
+    path = fixtures.write(tmp_path / 'projects.db')
+    before = indexes(path, 'faqs')
+    assert 'idx_faqs_category' in before
+    # الدفعات الثلاث الأولى تلتزم، والرابعة تفشل بمفتاح مكرر
+    records = faqs(range(1000, 1030)) + faqs([1000])
+
+    with pytest.raises(bulk.LoadError) as failure:
+        bulk.load(records, 'faqs', path, batch_size=10)
+
+    assert failure.value.committed == 30
+    assert indexes(path, 'faqs') == before
+    conn = connect(path)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM faqs WHERE id >= 1000').fetchone()[0] == 30
+        assert conn.execute("SELECT COUNT(*) FROM change_log_state WHERE name LIKE 'paused:%'").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_successful_load_rebuilds_the_indexes(tmp_path):
+    path = fixtures.write(tmp_path / 'projects.db')
+    before = indexes(path, 'faqs')
+
+    stats = bulk.load(faqs(range(1000, 1100)), 'faqs', path, batch_size=25)
+
+    assert stats.rows == 100
+    assert indexes(path, 'faqs') == before
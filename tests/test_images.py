@@ -0,0 +1,34 @@
+import pytest
+
+from database import images
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'UPLOADS_ROOT', tmp_path)
+    directory = tmp_path / 'projects'
+    directory.mkdir()
+    return directory
+
+
+def test_uploads_still_being_written_are_left_for_the_next_poll(db, uploads):
+    upload = uploads / 'new.png'
+    upload.write_bytes(b'partial')
+
+    assert list(images.pending_uploads(db, uploads, settle=60)) == []
+    assert list(images.pending_uploads(db, uploads)) == [upload]
+
+
+def test_failed_upload_is_retried_once_the_file_changes(db, uploads, capsys):
+    upload = uploads / 'upload.png'
+    upload.write_bytes(b'not an image yet')
+    failed = set()
+
+    # بايتات ليست صورة (أو Pillow غير مثبت): تفشل المعالجة ويُسجل الملف بحالته الحالية
+    images.run(db, list(images.pending_uploads(db, uploads, failed)), failed)
+
+    assert images.fingerprint(upload) in failed
+    assert list(images.pending_uploads(db, uploads, failed)) == []
+    upload.write_bytes(b'the complete upload, now longer')
+    assert list(images.pending_uploads(db, uploads, failed)) == [upload]
+    assert '❌' in capsys.readouterr().err
@@ -0,0 +1,69 @@
+import shutil
+
+import pytest
+
+from database import bulk, changes, versions
+from database.core import ROOT_DIR, connect, quote
+from database.migrations import MIGRATIONS, current_version, migrate
+
+LATEST = MIGRATIONS[-1].version
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    # projects.db في المستودع بشكله الأصلي: جداول سكربتات البذر بلا schema_migrations
+    path = shutil.copy(ROOT_DIR / 'projects.db', tmp_path / 'projects.db')
+    conn = connect(path)
+    yield conn
+    conn.close()
+
+
+def counts(conn):
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    return {table: conn.execute(f'SELECT COUNT(*) FROM {quote(table)}').fetchone()[0] for table in tables}
+
+
+def test_baseline_database_upgrades_to_the_latest_version_in_place(baseline):
+    rows = counts(baseline)
+    assert current_version(baseline) == 0
+
+    applied = migrate(baseline)
+
+    assert [m.version for m in applied] == list(range(1, LATEST + 1))
+    assert current_version(baseline) == LATEST
+    after = counts(baseline)
+    assert {table: after[table] for table in rows} == rows
+    assert set(versions.TABLES) <= {row[0] for row in baseline.execute('SELECT name FROM table_versions')}
+    assert baseline.execute('SELECT COUNT(*) FROM change_log').fetchone()[0] == 0
+    assert baseline.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    assert migrate(baseline) == []
+
+
+def test_writes_after_the_upgrade_are_versioned_and_logged(baseline):
+    migrate(baseline)
+    (version,) = baseline.execute("SELECT version FROM table_versions WHERE name = 'faqs'").fetchone()
+    rowid = baseline.execute('SELECT MIN(rowid) FROM faqs').fetchone()[0]
+
+    baseline.execute("UPDATE faqs SET answer = 'updated' WHERE rowid = ?", (rowid,))
+
+    assert baseline.execute("SELECT version FROM table_versions WHERE name = 'faqs'").fetchone()[0] == version + 1
+    assert baseline.execute('SELECT tbl, row_id, op, version FROM change_log').fetchall() == [
+        ('faqs', rowid, 'update', version + 1)
+    ]
+
+
+def test_bulk_load_logs_one_reload_entry_instead_of_one_per_row(baseline, tmp_path):
+    migrate(baseline)
+    baseline.execute("UPDATE faqs SET answer = 'before the load' WHERE rowid = (SELECT MIN(rowid) FROM faqs)")
+    records = [{'id': 1000 + i, 'category': 'general', 'question': f'q{i}', 'answer': 'a'} for i in range(500)]
+
+    bulk.load(records, 'faqs', tmp_path / 'projects.db', batch_size=100)
+
+    entries = baseline.execute('SELECT tbl, row_id, op FROM change_log ORDER BY seq').fetchall()
+    assert entries[-1] == ('faqs', changes.RELOAD_ROW, 'reload')
+    assert len(entries) == 2
+    assert baseline.execute("SELECT COUNT(*) FROM change_log_state WHERE name LIKE 'paused:%'").fetchone()[0] == 0
+    # الضغط يحذف ما سبق reload للجدول نفسه
+    assert changes.compact(baseline)['superseded'] == 1
@@ -0,0 +1,61 @@
+from database.core import transaction
+from database.registry import all_tables, get_tables
+from database.seed import canonical, diff_table, seed_tables
+
+
+def head(conn):
+    return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+
+
+def test_reseeding_a_seeded_database_writes_nothing(db):
+    before = head(db)
+    with transaction(db):
+        diffs = seed_tables(db, all_tables())
+    assert diffs and not any(diff.changed for diff in diffs.values())
+    assert head(db) == before
+
+
+def test_diff_finds_updated_inserted_and_deleted_rows(db):
+    packages = get_tables(['packages'])[0]
+    title = db.execute('SELECT title FROM packages WHERE id = 1').fetchone()[0]
+    db.execute("UPDATE packages SET title = 'edited' WHERE id = 1")
+    db.execute('DELETE FROM packages WHERE id = 2')
+    db.execute("INSERT INTO packages (id, title) VALUES (999, 'not seeded')")
+
+    diff = diff_table(db, packages)
+
+    assert [row[0] for row in diff.inserts] == [2]
+    assert diff.updates == [(1, {'title': ('edited', title)})]
+    assert diff.deletes == [999]
+    assert diff.unchanged == len(packages.rows) - 2
+
+
+def test_values_sqlite_stores_differently_are_not_changes():
+    # True تُخزَّن 1، و4900 في عمود REAL تُقرأ 4900.0
+    assert canonical(True) == canonical(1)
+    assert canonical(4900.0) == canonical(4900)
+    assert canonical(4900.5) != canonical(4900)
+
+
+def test_dry_run_reports_the_diff_and_leaves_rows_alone(db):
+    db.execute("UPDATE packages SET title = 'edited' WHERE id = 1")
+    before = head(db)
+    with transaction(db):
+        diffs = seed_tables(db, get_tables(['packages']), dry_run=True)
+
+    assert [key for key, _ in diffs['packages'].updates] == [1]
+    assert db.execute('SELECT title FROM packages WHERE id = 1').fetchone()[0] == 'edited'
+    assert head(db) == before
+
+
+def test_seed_applies_only_the_changed_rows(db):
+    db.execute("UPDATE packages SET title = 'edited' WHERE id = 1")
+    before = head(db)
+    with transaction(db):
+        seed_tables(db, get_tables(['packages']))
+
+    assert db.execute('SELECT title FROM packages WHERE id = 1').fetchone()[0] != 'edited'
+    assert db.execute('SELECT tbl, row_id, op FROM change_log WHERE seq > ?', (before,)).fetchall() == [
+        ('packages', 1, 'update')
+    ]
+    assert not diff_table(db, get_tables(['packages'])[0]).changed